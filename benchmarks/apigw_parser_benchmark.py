@@ -0,0 +1,57 @@
+""" per call CPU time of the API Gateway event parsing: full APIGatewayProxyEventModel validation against the fast path
+
+The events are the API Gateway samples in data_samples/, logged by a deployed create order lambda. The header and query string
+cases use the same events with the get order header or list orders query string added.
+Run with: python -m benchmarks.apigw_parser_benchmark
+"""
+import copy
+import json
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from unittest import mock
+
+from benchmarks.utils import cpu_time_per_call
+from service.handlers.utils import apigw_parser
+from service.schemas.input import CreateOrderRequest, GetOrderRequest, ListOrdersRequest
+
+ITERATIONS = 5000
+SAMPLES_FOLDER = Path(__file__).parent.parent / 'data_samples'
+
+
+def _sample_events() -> List[Tuple[str, Dict[str, Any]]]:
+    return [(path.stem, json.loads(path.read_text())['event']) for path in sorted(SAMPLES_FOLDER.glob('apigw_envelope_event*.json'))]
+
+
+def _cases(event: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    get_event = copy.deepcopy(event)
+    get_event['headers'] = {**(event['headers'] or {}), 'order_id': str(uuid.uuid4())}
+    list_event = copy.deepcopy(event)
+    list_event['queryStringParameters'] = {'customer_name': 'kk', 'limit': '10'}
+    return {
+        'body': lambda: apigw_parser.parse_body(event=event, model=CreateOrderRequest),
+        'headers': lambda: apigw_parser.parse_headers(event=get_event, model=GetOrderRequest),
+        'query string': lambda: apigw_parser.parse_query_string(event=list_event, model=ListOrdersRequest),
+    }
+
+
+def _time(case: Callable[[], Any]) -> str:
+    try:
+        return f'{cpu_time_per_call(case, ITERATIONS) * 1e6:.1f}'
+    except (ValueError, TypeError):  # pydantic ValidationError is a ValueError
+        return 'invalid'
+
+
+def main() -> None:
+    print(f'{"sample":<36}{"field":<14}{"full us/call":>14}{"fast us/call":>14}')
+    for sample, event in _sample_events():
+        for field, case in _cases(event).items():
+            with mock.patch.object(apigw_parser, '_full_validation', return_value=True):
+                full = _time(case)
+            with mock.patch.object(apigw_parser, '_full_validation', return_value=False):
+                fast = _time(case)
+            print(f'{sample:<36}{field:<14}{full:>14}{fast:>14}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+""" per call CPU time of the orders DAL handlers: DynamoDB resource and low-level client paths, SQLite and in-memory
+
+DynamoDB responses are served from a botocore 'before-send' hook, so every call still goes through request serialization,
+signing and response parsing but never reaches the network. The SQLite database lives in a temporary directory.
+Run with: python -m benchmarks.dal_benchmark
+"""
+import os
+import tempfile
+import uuid
+from typing import Any, Dict, List
+
+from benchmarks.utils import cpu_time_per_call, serve_json_responses, set_fake_aws_environment
+
+set_fake_aws_environment()
+
+from service.dal.dynamo_orders_dal_handler import DynamoClientOrdersDalHandler, DynamoOrdersDalHandler  # noqa: E402
+from service.dal.memory_orders_dal_handler import MemoryOrdersDalHandler  # noqa: E402
+from service.dal.orders_db_handler import OrdersDalHandler  # noqa: E402
+from service.dal.schemas.orders_db import OrderEntry  # noqa: E402
+from service.dal.sqlite_connections import get_sqlite_connections  # noqa: E402
+from service.dal.sqlite_orders_dal_handler import SqliteOrdersDalHandler  # noqa: E402
+from service.handlers.utils.observability import logger  # noqa: E402
+
+ITERATIONS = 2000
+BATCH_SIZE = 100
+TABLE_NAME = 'benchmark'
+
+
+def _order_item(order_id: str) -> Dict[str, Any]:
+    return {'order_id': {'S': order_id}, 'customer_name': {'S': 'customer'}, 'order_item_count': {'N': '3'}}
+
+
+def main() -> None:
+    logger.setLevel('WARNING')  # measure the DAL, not the log formatting
+    order_id = str(uuid.uuid4())
+    batch_ids = [str(uuid.uuid4()) for _ in range(BATCH_SIZE)]
+    responses = {
+        'GetItem': {
+            'Item': _order_item(order_id)
+        },
+        'PutItem': {},
+        'BatchGetItem': {
+            'Responses': {
+                TABLE_NAME: [_order_item(batch_id) for batch_id in batch_ids]
+            },
+            'UnprocessedKeys': {}
+        },
+    }
+
+    resource_handler = DynamoOrdersDalHandler(TABLE_NAME)
+    client_handler = DynamoClientOrdersDalHandler(TABLE_NAME)
+    serve_json_responses(resource_handler._get_db_handler().meta.client, responses)
+    serve_json_responses(client_handler._get_db_client(), responses)
+    sqlite_handler = SqliteOrdersDalHandler(TABLE_NAME, get_sqlite_connections(os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')))
+    memory_handler = MemoryOrdersDalHandler(TABLE_NAME)
+    for local_handler in (sqlite_handler, memory_handler):
+        _seed(local_handler, [order_id] + batch_ids)
+    handlers: Dict[str, OrdersDalHandler] = {
+        'resource': resource_handler,
+        'client': client_handler,
+        'sqlite': sqlite_handler,
+        'memory': memory_handler,
+    }
+
+    cases = {
+        'get_order_in_db':
+            lambda handler: handler.get_order_in_db(order_id),
+        'create_order_in_db':
+            lambda handler: handler.create_order_in_db(customer_name='customer', order_item_count=3),
+        'create_order_with_id_in_db':
+            lambda handler: handler.create_order_with_id_in_db(str(uuid.uuid4()), customer_name='customer', order_item_count=3),
+        f'get_orders_in_db ({BATCH_SIZE} ids)':
+            lambda handler: handler.get_orders_in_db(batch_ids),
+    }
+    print('us/call'.ljust(28) + ''.join(f'{name:>12}' for name in handlers))
+    for name, case in cases.items():
+        iterations = ITERATIONS // 10 if 'ids' in name else ITERATIONS
+        times = [cpu_time_per_call(lambda: case(handler), iterations) for handler in handlers.values()]
+        print(f'{name:<28}' + ''.join(f'{cpu_time * 1e6:>12.1f}' for cpu_time in times))
+
+
+def _seed(handler: OrdersDalHandler, order_ids: List[str]) -> None:
+    """ store fixed ids so the local backends find the same orders the canned DynamoDB responses return """
+    entries = [OrderEntry(order_id=order_id, customer_name='customer', order_item_count=3, created_at=0) for order_id in order_ids]
+    if isinstance(handler, SqliteOrdersDalHandler):
+        with handler.connections.get() as connection:
+            connection.executemany(handler._insert_sql, [handler._to_row(entry) for entry in entries])
+    elif isinstance(handler, MemoryOrdersDalHandler):
+        handler._orders.update((entry.order_id, entry) for entry in entries)
+
+
+if __name__ == '__main__':
+    main()
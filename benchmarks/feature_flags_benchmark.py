@@ -0,0 +1,57 @@
+""" per call CPU time of the create order feature flags: two powertools FeatureFlags.evaluate calls against one compiled evaluation
+
+The configuration is cdk/service/configuration/json/dev_configuration.json served from the AppConfig provider cache, as it is
+between two fetches. 'distinct customers' uses a new customer name on every call, every premium_features lookup misses the memo.
+Run with: python -m benchmarks.feature_flags_benchmark
+"""
+import itertools
+import json
+import os
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict
+from unittest import mock
+
+from benchmarks.utils import HANDLER_ENVIRONMENT, cpu_time_per_call, set_fake_aws_environment
+
+ITERATIONS = 20000
+CONFIGURATION_FILE = Path(__file__).parent.parent / 'cdk' / 'service' / 'configuration' / 'json' / 'dev_configuration.json'
+DEFAULTS = {'ten_percent_off_campaign': False, 'premium_features': False}
+
+
+def _cases(customer_name: Callable[[], str]) -> Dict[str, Callable[[], Any]]:
+    from service.handlers.utils.dynamic_configuration import get_dynamic_configuration_store
+    from service.handlers.utils.feature_flags import evaluate_feature_flags
+
+    def powertools() -> Any:
+        store = get_dynamic_configuration_store()
+        store.evaluate(name='ten_percent_off_campaign', context={}, default=False)
+        return store.evaluate(name='premium_features', context={'customer_name': customer_name()}, default=False)
+
+    def compiled() -> Any:
+        return evaluate_feature_flags(context={'customer_name': customer_name()}, defaults=DEFAULTS)
+
+    return {'powertools': powertools, 'compiled': compiled}
+
+
+def main() -> None:
+    set_fake_aws_environment()
+    os.environ.update(HANDLER_ENVIRONMENT)
+    configuration = json.loads(CONFIGURATION_FILE.read_text())
+    counter = itertools.count()
+    customers = {
+        'same customer': lambda: 'RanTheBuilder',
+        'distinct customers': lambda: f'customer-{next(counter)}',
+    }
+    results = {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), \
+            mock.patch('aws_lambda_powertools.utilities.parameters.AppConfigProvider.get', return_value=configuration):  # EMF metrics are printed
+        for name, customer_name in customers.items():
+            results[name] = {case: cpu_time_per_call(func, ITERATIONS) * 1e6 for case, func in _cases(customer_name).items()}
+    print(f'{"customers":<22}{"powertools us/call":>20}{"compiled us/call":>20}')
+    for name, times in results.items():
+        print(f'{name:<22}{times["powertools"]:>20.1f}{times["compiled"]:>20.1f}')
+
+
+if __name__ == '__main__':
+    main()
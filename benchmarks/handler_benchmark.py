@@ -0,0 +1,117 @@
+""" per call CPU time of the orders handlers on the in-memory DAL backend
+
+Only the pure-Python work is left: event parsing, validation, logging, metrics, feature flags and response serialization.
+AppConfig is replaced with a fixed configuration, idempotency is disabled and SNS publish gets a canned response.
+Every handler runs with each of the LOGGING settings of the configuration, the difference to 'CRITICAL' is the logging cost
+of an invocation.
+Run with: python -m benchmarks.handler_benchmark [--profile]
+"""
+import cProfile
+import json
+import os
+import pstats
+import sys
+import warnings
+from contextlib import redirect_stdout
+from typing import Dict
+from unittest import mock
+
+from benchmarks.utils import HANDLER_ENVIRONMENT, api_gateway_event, cpu_time_per_call, serve_canned_response, set_fake_aws_environment
+
+set_fake_aws_environment()
+os.environ.update({
+    **HANDLER_ENVIRONMENT,
+    'DAL_BACKEND': 'memory',
+    'POWERTOOLS_IDEMPOTENCY_DISABLED': 'true',
+    'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'INFO'),
+})
+
+from aws_lambda_powertools.utilities.typing import LambdaContext  # noqa: E402
+
+ITERATIONS = 1000
+CONFIGURATION = {
+    'features': {
+        'premium_features': {
+            'default': False,
+            'rules': {
+                'enable premium features for this specific customer name': {
+                    'when_match': True,
+                    'conditions': [{
+                        'action': 'EQUALS',
+                        'key': 'customer_name',
+                        'value': 'RanTheBuilder'
+                    }]
+                }
+            }
+        },
+        'ten_percent_off_campaign': {
+            'default': True
+        }
+    },
+    'countries': ['ISRAEL', 'USA']
+}
+# the dynamic configuration 'logging' section, records are formatted and written to os.devnull
+LOGGING = {
+    'CRITICAL': {
+        'log_level': 'CRITICAL'
+    },
+    'INFO': {
+        'log_level': 'INFO'
+    },
+    'DEBUG 10%': {
+        'log_level': 'DEBUG',
+        'debug_sample_rate': 0.1
+    },
+    'DEBUG': {
+        'log_level': 'DEBUG'
+    },
+}
+PUBLISH_RESPONSE = b'<PublishResponse><PublishResult><MessageId>1</MessageId></PublishResult></PublishResponse>'
+
+
+def _context() -> LambdaContext:
+    context = LambdaContext()
+    context._aws_request_id = 'benchmark'
+    return context
+
+
+def main(profile: bool) -> None:
+    warnings.simplefilter('ignore')  # idempotency disabled warning
+    devnull = open(os.devnull, 'w')
+    with mock.patch('aws_lambda_powertools.utilities.parameters.AppConfigProvider.get', return_value=CONFIGURATION) as get_configuration:
+        from service.handlers.create_order import create_order
+        from service.handlers.get_order import get_order
+        from service.handlers.utils.aws_clients import get_client
+        from service.handlers.utils.observability import logger
+        logger.registered_handler.setStream(devnull)  # keep the formatting cost, drop the output
+        serve_canned_response(get_client('sns'), 'Publish', PUBLISH_RESPONSE)
+
+        context = _context()
+        create_event = api_gateway_event(body={'customer_name': 'customer', 'order_item_count': 5})
+        with redirect_stdout(devnull):  # EMF metrics are printed
+            response = create_order(create_event, context)
+        order_id = json.loads(response['body'])['order_id']
+        get_event = api_gateway_event(headers={'order_id': order_id})
+        cases = {
+            'create_order': lambda: create_order(create_event, context),
+            'get_order': lambda: get_order(get_event, context),
+        }
+        if profile:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        results: Dict[str, Dict[str, float]] = {name: {} for name in cases}
+        with redirect_stdout(devnull):
+            for logging_name, logging_settings in LOGGING.items():
+                get_configuration.return_value = {**CONFIGURATION, 'logging': logging_settings}
+                for name, case in cases.items():
+                    results[name][logging_name] = cpu_time_per_call(case, ITERATIONS)
+        if profile:
+            profiler.disable()
+            pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(30)
+        print(f'{"handler us/call":<16}' + ''.join(f'{logging_name:>12}' for logging_name in LOGGING))
+        for name, cpu_times in results.items():
+            print(f'{name:<16}' + ''.join(f'{cpu_times[logging_name] * 1e6:>12.1f}' for logging_name in LOGGING))
+
+
+if __name__ == '__main__':
+    main(profile='--profile' in sys.argv[1:])
@@ -0,0 +1,89 @@
+""" import time of every Lambda handler entry point, checked against a stored budget
+
+Each handler module is imported in a fresh interpreter with 'python -X importtime', which is the module loading part
+of the Lambda INIT phase. The cost is reported per top-level package so a new heavy import shows up by name.
+Run with: python -m benchmarks.import_budget [--update] [--top N]
+    --update   store the measured times plus BUDGET_HEADROOM as the new budget
+    --top N    packages to list per handler, default 8
+Exits with 1 when a handler is over its budget.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.utils import HANDLER_ENVIRONMENT
+
+HANDLERS_FOLDER = Path(__file__).parent.parent / 'service' / 'handlers'
+BUDGET_FILE = Path(__file__).parent / 'import_budget.json'
+BUDGET_HEADROOM = 1.25  # measurements are noisy, --update stores the measured time plus 25%
+REPEATS = 5  # the fastest run is kept, slower ones measure the machine rather than the imports
+
+
+def handler_modules() -> List[str]:
+    """ every module of service/handlers is a lambda entry point """
+    return sorted(f'service.handlers.{path.stem}' for path in HANDLERS_FOLDER.glob('*.py') if path.stem != '__init__')
+
+
+def _import_times(module: str) -> List[Tuple[str, int, int]]:
+    """ (module, self us, cumulative us) of every module imported by 'import module' in a new interpreter """
+    env = {
+        **os.environ,
+        **HANDLER_ENVIRONMENT,
+        'LOG_LEVEL': 'INFO',
+        'AWS_DEFAULT_REGION': os.environ.get('AWS_DEFAULT_REGION', 'us-east-1'),
+    }
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], env=env, capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """ Returns the import time of the module in ms and the self time in ms of every top-level package it loaded """
+    _import_times(module)  # compiles the .pyc files, every measured run reads them like a deployed lambda does
+    fastest = min((_import_times(module) for _ in range(REPEATS)),
+                  key=lambda times: next(cumulative for name, _, cumulative in times if name == module))
+    packages: Dict[str, float] = defaultdict(float)
+    for name, self_us, _ in fastest:
+        packages[name.split('.')[0]] += self_us / 1000
+    total_ms = next(cumulative for name, _, cumulative in fastest if name == module) / 1000
+    return total_ms, dict(packages)
+
+
+def main(update: bool, top: int) -> int:
+    budget: Dict[str, float] = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    measured: Dict[str, float] = {}
+    over_budget = []
+    print(f'{"handler":<45}{"ms":>10}{"budget":>10}')
+    for module in handler_modules():
+        total_ms, packages = measure(module)
+        measured[module] = total_ms
+        limit = budget.get(module)
+        status = '' if limit is None else ('  OVER' if total_ms > limit else '')
+        if status:
+            over_budget.append(module)
+        print(f'{module:<45}{total_ms:>10.1f}{"-" if limit is None else f"{limit:.0f}":>10}{status}')
+        for package, package_ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+            print(f'    {package:<41}{package_ms:>10.1f}')
+
+    if update:
+        BUDGET_FILE.write_text(json.dumps({module: round(total_ms * BUDGET_HEADROOM) for module, total_ms in measured.items()}, indent=4) + '\n')
+        print(f'stored the budget in {BUDGET_FILE}')
+        return 0
+    if over_budget:
+        print(f'over the import time budget: {", ".join(over_budget)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    sys.exit(main(update='--update' in arguments, top=int(arguments[arguments.index('--top') + 1]) if '--top' in arguments else 8))
@@ -0,0 +1,97 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from botocore.awsrequest import AWSResponse
+
+# the handlers environment variables, names and topics are never resolved
+HANDLER_ENVIRONMENT = {
+    'POWERTOOLS_SERVICE_NAME': 'benchmark',
+    'POWERTOOLS_METRICS_NAMESPACE': 'benchmark',
+    'REST_API': 'https://www.example.com/api',
+    'ROLE_ARN': 'arn:partition:service:region:account-id:resource-type:resource-id',
+    'CONFIGURATION_APP': 'benchmark',
+    'CONFIGURATION_ENV': 'benchmark',
+    'CONFIGURATION_NAME': 'benchmark',
+    'CONFIGURATION_MAX_AGE_MINUTES': '5',
+    'TABLE_NAME': 'orders',
+    'IDEMPOTENCY_TABLE_NAME': 'idempotency',
+    'ORDER_CREATED_TOPIC_ARN': 'arn:aws:sns:us-east-1:123456789012:order-created',
+}
+
+
+def set_fake_aws_environment() -> None:
+    """ botocore signs every request, give it credentials and a region even though nothing reaches AWS """
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+
+
+class _RawBody:
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def stream(self, **kwargs):
+        yield self._body
+
+
+def serve_canned_response(client: Any, operation: str, body: bytes) -> None:
+    """ answer an operation of a botocore client with a fixed response instead of sending the request
+
+        Request serialization, signing and response parsing still run, only the network round trip is skipped.
+    """
+
+    def before_send(request, **kwargs):
+        return AWSResponse(request.url, 200, {}, _RawBody(body))
+
+    client.meta.events.register(f'before-send.{client.meta.service_model.service_id.hyphenize()}.{operation}', before_send)
+
+
+def serve_json_responses(client: Any, responses: Dict[str, Dict[str, Any]]) -> None:
+    """ serve_canned_response for JSON protocol services such as DynamoDB, responses are keyed by operation name """
+    for operation, response in responses.items():
+        serve_canned_response(client, operation, json.dumps(response).encode())
+
+
+def cpu_time_per_call(func: Callable[[], Any], iterations: int) -> float:
+    """ CPU seconds per call, after one warm up call that loads models and builds the clients """
+    func()
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations
+
+
+def api_gateway_event(body: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                      query_string: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """ minimal API Gateway REST proxy event accepted by the powertools APIGatewayProxyEventModel """
+    return {
+        'resource': '/api/orders',
+        'path': '/api/orders',
+        'httpMethod': 'POST',
+        'headers': headers or {},
+        'multiValueHeaders': {},
+        'queryStringParameters': query_string,
+        'multiValueQueryStringParameters': None,
+        'pathParameters': None,
+        'stageVariables': None,
+        'requestContext': {
+            'accountId': '123456789012',
+            'apiId': 'id',
+            'stage': 'prod',
+            'protocol': 'HTTP/1.1',
+            'identity': {
+                'sourceIp': '192.168.0.1'
+            },
+            'requestId': 'id',
+            'requestTime': '04/Mar/2020:19:15:17 +0000',
+            'requestTimeEpoch': 1583349317135,
+            'resourcePath': '/api/orders',
+            'httpMethod': 'POST',
+            'path': '/prod/api/orders',
+        },
+        'body': None if body is None else json.dumps(body),
+        'isBase64Encoded': False,
+    }
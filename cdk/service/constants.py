@@ -1,13 +1,23 @@
 # Orders Service
 ORDERS_CREATE_LAMBDA = 'CreateOrder'
+ORDERS_CREATE_BATCH_LAMBDA = 'CreateOrdersBatch'
 ORDERS_DELETE_LAMBDA = 'DeleteOrder'
 ORDERS_GET_LAMBDA = 'GetOrder'
+ORDERS_UPDATE_LAMBDA = 'UpdateOrder'
+ORDERS_GET_BATCH_LAMBDA = 'GetOrdersBatch'
+ORDERS_OUTBOX_RELAY_LAMBDA = 'OrdersOutboxRelay'
+ORDERS_ROUTER_LAMBDA = 'OrdersRouter'
 ORDERS_TABLE_NAME = 'orders'
+ORDERS_BY_CUSTOMER_INDEX = 'customer_name-created_at'  # same name as service.dal.dynamo_orders_dal_handler.ORDERS_BY_CUSTOMER_INDEX
 ORDERS_TABLE_NAME_OUTPUT = 'OrdersDbOutput'
 ORDERS_IDEMPOTENCY_TABLE_NAME = 'OrdersIdempotencyTable'
 ORDERS_IDEMPOTENCY_TABLE_NAME_OUTPUT = 'OrdersIdempotencyDbOutput'
+ORDERS_OUTBOX_TABLE_NAME = 'OrdersOutboxTable'
+ORDERS_OUTBOX_TABLE_NAME_OUTPUT = 'OrdersOutboxDbOutput'
+ORDERS_OUTBOX_RELAY_BATCH_SIZE = 100  # stream records per relay invocation, published 10 per PublishBatch call
 ORDERS_APIGATEWAY = 'OrdersApigateway'
 ORDERS_GW_RESOURCE = 'orders'
+ORDERS_GW_BATCH_RESOURCE = 'batch'
 ORDERS_ORDER_CREATED_TOPIC = 'NinjaOrderCreated'
 ORDERS_ORDER_CREATED_TOPIC_OUTPUT = 'NinjaOrderCreatedSnsOutput'
 ORDERS_DELAYED_ORDER_CREATE_ALARM_EMAIL_ADDRESS = 'nobody@example.com'
@@ -17,6 +27,7 @@ ORDERS_DELAYED_ORDER_CREATE_EMAIL_TOPIC_OUTPUT = 'NinjaDelayedOrderCreateEmailTo
 USERS_CREATE_LAMBDA = 'CreateUser'
 USERS_DELETE_LAMBDA = 'DeleteUser'
 USERS_GET_LAMBDA = 'GetUser'
+USERS_ROUTER_LAMBDA = 'UsersRouter'
 USERS_TABLE_NAME = 'users'
 USERS_TABLE_NAME_OUTPUT = 'UsersDbOutput'
 USERS_IDEMPOTENCY_TABLE_NAME = 'UsersIdempotencyTable'
@@ -26,6 +37,13 @@ USERS_GW_RESOURCE = 'users'
 
 # Notification Service
 NOTIFY_EMAIL_LAMBDA = 'NotifyEmail'
+NOTIFY_EMAIL_QUEUE = 'NotifyEmailQueue'
+NOTIFY_EMAIL_DLQ = 'NotifyEmailDeadLetterQueue'
+NOTIFY_EMAIL_BATCH_SIZE = 10  # SQS records per notification invocation
+NOTIFY_EMAIL_MAX_BATCHING_WINDOW = 5  # seconds to gather a batch before invoking the notification lambda
+NOTIFY_EMAIL_MAX_RECEIVE_COUNT = 3  # deliveries of a failed record before it moves to the dead letter queue
+# cdk context key, 'true' buffers OrderCreated notifications in an SQS queue that the notification lambda consumes in batches
+SQS_NOTIFICATIONS_CONTEXT = 'sqs_notifications'
 
 # Common Lambda
 SERVICE_ROLE_ARN = 'ServiceRoleArn'
@@ -34,6 +52,8 @@ SERVICE_ROLE = 'ServiceRole'
 COMMON_LAMBDA_LAYER_NAME = 'common'
 API_HANDLER_LAMBDA_MEMORY_SIZE = 128  # MB
 API_HANDLER_LAMBDA_TIMEOUT = 10  # seconds
+# cdk context key, 'true' deploys one router lambda per service for all of its API routes instead of one lambda per route
+SINGLE_FUNCTION_API_CONTEXT = 'single_function_api'
 
 # Common
 POWERTOOLS_SERVICE_NAME = 'POWERTOOLS_SERVICE_NAME'
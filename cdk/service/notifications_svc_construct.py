@@ -1,8 +1,10 @@
 from aws_cdk import Duration, RemovalPolicy
 from aws_cdk import aws_iam as iam
 from aws_cdk import aws_lambda as _lambda
+from aws_cdk import aws_lambda_event_sources as event_sources
 from aws_cdk import aws_sns as sns
 from aws_cdk import aws_sns_subscriptions as subs
+from aws_cdk import aws_sqs as sqs
 from aws_cdk.aws_lambda_python_alpha import PythonLayerVersion
 from aws_cdk.aws_logs import RetentionDays
 from constructs import Construct
@@ -13,14 +15,25 @@ from cdk.service.orders_api_construct import OrdersApiConstruct
 
 class NotificationServiceConstruct(Construct):
 
-    def __init__(self, scope: Construct, id: str, appconfig_app_name: str, orders_api_construct: OrdersApiConstruct) -> None:
+    def __init__(self, scope: Construct, id: str, appconfig_app_name: str, orders_api_construct: OrdersApiConstruct, sqs_buffered: bool = False,
+                 batch_size: int = constants.NOTIFY_EMAIL_BATCH_SIZE, max_batching_window: int = constants.NOTIFY_EMAIL_MAX_BATCHING_WINDOW) -> None:
+        """ sqs_buffered puts an SQS queue between the OrderCreated topic and the handler, which then receives up to batch_size
+            notifications gathered for up to max_batching_window seconds per invocation instead of one invocation per order
+        """
         super().__init__(scope, id)
         self.id = id
         self.common_layer = self._build_common_layer()
         role = self._build_lambda_role()
-        handler = self._order_creation_handler(role=role, appconfig_app_name=appconfig_app_name)
         topic = orders_api_construct.order_created_topic
-        self._subscribe_to_order_creation_topic(topic=topic, handler=handler)
+        if sqs_buffered:
+            handler = self._order_creation_handler(role=role, appconfig_app_name=appconfig_app_name,
+                                                   handler_path='service.handlers.notification.email_on_order_create_batch')
+            self.queue = self._build_notification_queue()
+            self._subscribe_queue_to_order_creation_topic(topic=topic, queue=self.queue, handler=handler, batch_size=batch_size,
+                                                          max_batching_window=max_batching_window)
+        else:
+            handler = self._order_creation_handler(role=role, appconfig_app_name=appconfig_app_name)
+            self._subscribe_to_order_creation_topic(topic=topic, handler=handler)
 
     def _build_common_layer(self) -> PythonLayerVersion:
         return PythonLayerVersion(
@@ -35,16 +48,50 @@ class NotificationServiceConstruct(Construct):
         # setup lambda to listen to sns topic
         topic.add_subscription(subs.LambdaSubscription(handler))
 
-    def _order_creation_handler(self, role: iam.Role, appconfig_app_name: str) -> _lambda.Function:
+    def _build_notification_queue(self) -> sqs.Queue:
+        dead_letter_queue = sqs.Queue(
+            self,
+            constants.NOTIFY_EMAIL_DLQ,
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            retention_period=Duration.days(14),
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+        return sqs.Queue(
+            self,
+            constants.NOTIFY_EMAIL_QUEUE,
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            # 6 times the function timeout, as AWS recommends for SQS event sources, so batching and retries do not redeliver in flight records
+            visibility_timeout=Duration.seconds(6 * constants.API_HANDLER_LAMBDA_TIMEOUT),
+            dead_letter_queue=sqs.DeadLetterQueue(max_receive_count=constants.NOTIFY_EMAIL_MAX_RECEIVE_COUNT, queue=dead_letter_queue),
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
+    def _subscribe_queue_to_order_creation_topic(self, topic: sns.Topic, queue: sqs.Queue, handler: _lambda.Function, batch_size: int,
+                                                 max_batching_window: int):
+        # the SNS envelope is kept (no raw delivery), the handler reads the message id and subject from it
+        topic.add_subscription(subs.SqsSubscription(queue))
+        # failed records are reported one by one and only they are delivered again, until they move to the dead letter queue
+        handler.add_event_source(
+            event_sources.SqsEventSource(
+                queue,
+                batch_size=batch_size,
+                max_batching_window=Duration.seconds(max_batching_window),
+                report_batch_item_failures=True,
+            ))
+
+    def _order_creation_handler(self, role: iam.Role, appconfig_app_name: str,
+                                handler_path: str = 'service.handlers.notification.email_on_order_create') -> _lambda.Function:
         lambda_function = _lambda.Function(
             self,
             constants.NOTIFY_EMAIL_LAMBDA,
             runtime=_lambda.Runtime.PYTHON_3_11,
             code=_lambda.Code.from_asset(constants.BUILD_FOLDER),
-            handler='service.handlers.notification.email_on_order_create',
+            handler=handler_path,
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
-                constants.POWER_TOOLS_LOG_LEVEL: 'DEBUG',  # for logger
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
                 'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
                 'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
                 'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
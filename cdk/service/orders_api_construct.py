@@ -5,6 +5,7 @@ from aws_cdk import aws_dynamodb as dynamodb
 from aws_cdk import aws_iam as iam
 from aws_cdk import aws_kms as kms
 from aws_cdk import aws_lambda as _lambda
+from aws_cdk import aws_lambda_event_sources as event_sources
 from aws_cdk import aws_sns as sns
 from aws_cdk import aws_sns_subscriptions as sns_subs
 from aws_cdk.aws_lambda_python_alpha import PythonLayerVersion
@@ -17,11 +18,11 @@ from cdk.service.orders_api_db_construct import OrdersApiDbConstruct
 
 class OrdersApiConstruct(Construct):
 
-    def __init__(self, scope: Construct, id_: str, appconfig_app_name: str) -> None:
+    def __init__(self, scope: Construct, id_: str, appconfig_app_name: str, single_function: bool = False) -> None:
         super().__init__(scope, id_)
         self.id_ = id_
         self.api_db = OrdersApiDbConstruct(self, f'{id_}db')
-        self.lambda_role = self._build_lambda_role(self.api_db.db, self.api_db.idempotency_db)
+        self.lambda_role = self._build_lambda_role(self.api_db.db, self.api_db.idempotency_db, self.api_db.outbox_db)
         self.common_layer = self._build_common_layer()
         self.sns_key = self._build_kms_managed_key(self.lambda_role)
 
@@ -30,8 +31,13 @@ class OrdersApiConstruct(Construct):
 
         self.rest_api = self._build_api_gw()
         api_resource: aws_apigateway.Resource = self.rest_api.root.add_resource('api').add_resource(constants.ORDERS_GW_RESOURCE)
-        self._add_post_lambda_integration(api_resource, self.lambda_role, self.api_db.db, appconfig_app_name, self.api_db.idempotency_db,
-                                          self.order_created_topic)
+        if single_function:
+            self._add_router_lambda_integration(api_resource, self.lambda_role, self.api_db.db, appconfig_app_name, self.api_db.idempotency_db,
+                                                self.order_created_topic)
+        else:
+            self._add_post_lambda_integration(api_resource, self.lambda_role, self.api_db.db, appconfig_app_name, self.api_db.idempotency_db,
+                                              self.order_created_topic)
+        self.outbox_relay = self._build_outbox_relay_lambda(self.lambda_role, self.api_db.outbox_db, self.order_created_topic)
 
     def _build_api_gw(self) -> aws_apigateway.RestApi:
         rest_api: aws_apigateway.RestApi = aws_apigateway.RestApi(
@@ -78,7 +84,7 @@ class OrdersApiConstruct(Construct):
         return sns_topic
 
     # shared role for Create, Get, and Delete lambdas. Better to have separate for each.
-    def _build_lambda_role(self, db: dynamodb.Table, idempotency_table: dynamodb.Table) -> iam.Role:
+    def _build_lambda_role(self, db: dynamodb.Table, idempotency_table: dynamodb.Table, outbox_table: dynamodb.Table) -> iam.Role:
         return iam.Role(
             self,
             constants.SERVICE_ROLE_ARN,
@@ -95,9 +101,25 @@ class OrdersApiConstruct(Construct):
                 'dynamodb_db':
                     iam.PolicyDocument(statements=[
                         iam.PolicyStatement(
-                            actions=['dynamodb:PutItem', 'dynamodb:GetItem', 'dynamodb:DeleteItem'],
+                            actions=[
+                                'dynamodb:PutItem', 'dynamodb:GetItem', 'dynamodb:UpdateItem', 'dynamodb:DeleteItem', 'dynamodb:BatchWriteItem',
+                                'dynamodb:BatchGetItem'
+                            ],
                             resources=[db.table_arn],
                             effect=iam.Effect.ALLOW,
+                        ),
+                        iam.PolicyStatement(
+                            actions=['dynamodb:Query'],
+                            resources=[f'{db.table_arn}/index/{constants.ORDERS_BY_CUSTOMER_INDEX}'],
+                            effect=iam.Effect.ALLOW,
+                        ),
+                    ]),
+                'outbox_table':
+                    iam.PolicyDocument(statements=[
+                        iam.PolicyStatement(
+                            actions=['dynamodb:PutItem'],  # as part of the TransactWriteItems with the order
+                            resources=[outbox_table.table_arn],
+                            effect=iam.Effect.ALLOW,
                         )
                     ]),
                 'idempotency_table':
@@ -124,7 +146,7 @@ class OrdersApiConstruct(Construct):
         )
 
     def _build_create_order_lambda(self, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str, idempotency_table: dynamodb.Table,
-                                   topic: sns.Topic):
+                                   topic: sns.Topic, outbox_table: dynamodb.Table):
         lambda_function = _lambda.Function(
             self,
             constants.ORDERS_CREATE_LAMBDA,
@@ -133,7 +155,7 @@ class OrdersApiConstruct(Construct):
             handler='service.handlers.create_order.create_order',
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
-                constants.POWER_TOOLS_LOG_LEVEL: 'DEBUG',  # for logger
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
                 'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
                 'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
                 'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
@@ -143,6 +165,7 @@ class OrdersApiConstruct(Construct):
                 'TABLE_NAME': db.table_name,
                 'IDEMPOTENCY_TABLE_NAME': idempotency_table.table_name,
                 'ORDER_CREATED_TOPIC_ARN': topic.topic_arn,
+                'OUTBOX_TABLE_NAME': outbox_table.table_name,  # OrderCreated events go through the outbox relay
             },
             tracing=_lambda.Tracing.ACTIVE,
             retry_attempts=0,
@@ -155,6 +178,103 @@ class OrdersApiConstruct(Construct):
         self._build_late_order_creation_alarm(lambda_function.function_name)
         return lambda_function
 
+    def _build_create_orders_batch_lambda(self, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str, idempotency_table: dynamodb.Table,
+                                          topic: sns.Topic):
+        lambda_function = _lambda.Function(
+            self,
+            constants.ORDERS_CREATE_BATCH_LAMBDA,
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            code=_lambda.Code.from_asset(constants.BUILD_FOLDER),
+            handler='service.handlers.create_orders_batch.create_orders_batch',
+            environment={
+                constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
+                'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
+                'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
+                'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
+                'CONFIGURATION_MAX_AGE_MINUTES': constants.CONFIGURATION_MAX_AGE_MINUTES,  # for feature flags
+                'REST_API': 'https://www.ranthebuilder.cloud/api',  # for env vars example
+                'ROLE_ARN': 'arn:partition:service:region:account-id:resource-type:resource-id',  # for env vars example
+                'TABLE_NAME': db.table_name,
+                'IDEMPOTENCY_TABLE_NAME': idempotency_table.table_name,
+                'ORDER_CREATED_TOPIC_ARN': topic.topic_arn,
+            },
+            tracing=_lambda.Tracing.ACTIVE,
+            retry_attempts=0,
+            timeout=Duration.seconds(constants.API_HANDLER_LAMBDA_TIMEOUT),
+            memory_size=constants.API_HANDLER_LAMBDA_MEMORY_SIZE,
+            layers=[self.common_layer],
+            role=role,
+            log_retention=RetentionDays.ONE_DAY,
+        )
+        return lambda_function
+
+    def _build_orders_router_lambda(self, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str, idempotency_table: dynamodb.Table,
+                                    topic: sns.Topic, outbox_table: dynamodb.Table):
+        # one function for every orders route, the environment is the union of the routed handlers environments
+        lambda_function = _lambda.Function(
+            self,
+            constants.ORDERS_ROUTER_LAMBDA,
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            code=_lambda.Code.from_asset(constants.BUILD_FOLDER),
+            handler='service.handlers.router.orders_router',
+            environment={
+                constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
+                'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
+                'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
+                'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
+                'CONFIGURATION_MAX_AGE_MINUTES': constants.CONFIGURATION_MAX_AGE_MINUTES,  # for feature flags
+                'REST_API': 'https://www.ranthebuilder.cloud/api',  # for env vars example
+                'ROLE_ARN': 'arn:partition:service:region:account-id:resource-type:resource-id',  # for env vars example
+                'TABLE_NAME': db.table_name,
+                'IDEMPOTENCY_TABLE_NAME': idempotency_table.table_name,
+                'ORDER_CREATED_TOPIC_ARN': topic.topic_arn,
+                'OUTBOX_TABLE_NAME': outbox_table.table_name,  # OrderCreated events go through the outbox relay
+            },
+            tracing=_lambda.Tracing.ACTIVE,
+            retry_attempts=0,
+            timeout=Duration.seconds(constants.API_HANDLER_LAMBDA_TIMEOUT),
+            memory_size=constants.API_HANDLER_LAMBDA_MEMORY_SIZE,
+            layers=[self.common_layer],
+            role=role,
+            log_retention=RetentionDays.ONE_DAY,
+        )
+        self._build_late_order_creation_alarm(lambda_function.function_name)
+        return lambda_function
+
+    def _build_outbox_relay_lambda(self, role: iam.Role, outbox_table: dynamodb.Table, topic: sns.Topic) -> _lambda.Function:
+        lambda_function = _lambda.Function(
+            self,
+            constants.ORDERS_OUTBOX_RELAY_LAMBDA,
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            code=_lambda.Code.from_asset(constants.BUILD_FOLDER),
+            handler='service.handlers.outbox_relay.relay_order_events',
+            environment={
+                constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
+                'ORDER_CREATED_TOPIC_ARN': topic.topic_arn,
+            },
+            tracing=_lambda.Tracing.ACTIVE,
+            timeout=Duration.seconds(constants.API_HANDLER_LAMBDA_TIMEOUT),
+            memory_size=constants.API_HANDLER_LAMBDA_MEMORY_SIZE,
+            layers=[self.common_layer],
+            role=role,
+            log_retention=RetentionDays.ONE_DAY,
+        )
+        # inserts only, TTL deletes of relayed records never invoke the relay. Failed events are retried from the first failed record
+        lambda_function.add_event_source(
+            event_sources.DynamoEventSource(
+                outbox_table,
+                starting_position=_lambda.StartingPosition.TRIM_HORIZON,
+                batch_size=constants.ORDERS_OUTBOX_RELAY_BATCH_SIZE,
+                max_batching_window=Duration.seconds(1),
+                report_batch_item_failures=True,
+                retry_attempts=10,
+                filters=[_lambda.FilterCriteria.filter({'eventName': _lambda.FilterRule.is_equal('INSERT')})],
+            ))
+        return lambda_function
+
     def _build_delete_order_lambda(self, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str):
         lambda_function = _lambda.Function(
             self,
@@ -164,7 +284,35 @@ class OrdersApiConstruct(Construct):
             handler='service.handlers.delete_order.delete_order',
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
-                constants.POWER_TOOLS_LOG_LEVEL: 'DEBUG',  # for logger
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
+                'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
+                'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
+                'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
+                'CONFIGURATION_MAX_AGE_MINUTES': constants.CONFIGURATION_MAX_AGE_MINUTES,  # for feature flags
+                'REST_API': 'https://www.ranthebuilder.cloud/api',  # for env vars example
+                'ROLE_ARN': 'arn:partition:service:region:account-id:resource-type:resource-id',  # for env vars example
+                'TABLE_NAME': db.table_name,
+            },
+            tracing=_lambda.Tracing.ACTIVE,
+            retry_attempts=0,
+            timeout=Duration.seconds(constants.API_HANDLER_LAMBDA_TIMEOUT),
+            memory_size=constants.API_HANDLER_LAMBDA_MEMORY_SIZE,
+            layers=[self.common_layer],
+            role=role,
+            log_retention=RetentionDays.ONE_DAY,
+        )
+        return lambda_function
+
+    def _build_update_order_lambda(self, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str):
+        lambda_function = _lambda.Function(
+            self,
+            constants.ORDERS_UPDATE_LAMBDA,
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            code=_lambda.Code.from_asset(constants.BUILD_FOLDER),
+            handler='service.handlers.update_order.update_order',
+            environment={
+                constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
                 'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
                 'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
                 'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
@@ -192,7 +340,35 @@ class OrdersApiConstruct(Construct):
             handler='service.handlers.get_order.get_order',
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
-                constants.POWER_TOOLS_LOG_LEVEL: 'DEBUG',  # for logger
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
+                'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
+                'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
+                'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
+                'CONFIGURATION_MAX_AGE_MINUTES': constants.CONFIGURATION_MAX_AGE_MINUTES,  # for feature flags
+                'REST_API': 'https://www.ranthebuilder.cloud/api',  # for env vars example
+                'ROLE_ARN': 'arn:partition:service:region:account-id:resource-type:resource-id',  # for env vars example
+                'TABLE_NAME': db.table_name,
+            },
+            tracing=_lambda.Tracing.ACTIVE,
+            retry_attempts=0,
+            timeout=Duration.seconds(constants.API_HANDLER_LAMBDA_TIMEOUT),
+            memory_size=constants.API_HANDLER_LAMBDA_MEMORY_SIZE,
+            layers=[self.common_layer],
+            role=role,
+            log_retention=RetentionDays.ONE_DAY,
+        )
+        return lambda_function
+
+    def _build_get_orders_batch_lambda(self, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str):
+        lambda_function = _lambda.Function(
+            self,
+            constants.ORDERS_GET_BATCH_LAMBDA,
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            code=_lambda.Code.from_asset(constants.BUILD_FOLDER),
+            handler='service.handlers.get_orders_batch.get_orders_batch',
+            environment={
+                constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
                 'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
                 'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
                 'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
@@ -217,16 +393,45 @@ class OrdersApiConstruct(Construct):
         # POST /api/orders/
         api_name.add_method(
             http_method='POST', integration=aws_apigateway.LambdaIntegration(
-                handler=self._build_create_order_lambda(role, db, appconfig_app_name, idempotency_table, topic=order_created_topic)))
+                handler=self._build_create_order_lambda(role, db, appconfig_app_name, idempotency_table, topic=order_created_topic,
+                                                        outbox_table=self.api_db.outbox_db)))
+
+        batch_resource: aws_apigateway.Resource = api_name.add_resource(constants.ORDERS_GW_BATCH_RESOURCE)
+
+        # POST /api/orders/batch
+        batch_resource.add_method(
+            http_method='POST', integration=aws_apigateway.LambdaIntegration(
+                handler=self._build_create_orders_batch_lambda(role, db, appconfig_app_name, idempotency_table, topic=order_created_topic)))
+
+        # GET /api/orders/batch?order_ids=
+        batch_resource.add_method(
+            http_method='GET',
+            integration=aws_apigateway.LambdaIntegration(handler=self._build_get_orders_batch_lambda(role, db, appconfig_app_name)))
 
         # DELETE /api/orders/
         api_name.add_method(http_method='DELETE',
                             integration=aws_apigateway.LambdaIntegration(handler=self._build_delete_order_lambda(role, db, appconfig_app_name)))
 
-        # GET /api/orders/
+        # PATCH /api/orders/
+        api_name.add_method(http_method='PATCH',
+                            integration=aws_apigateway.LambdaIntegration(handler=self._build_update_order_lambda(role, db, appconfig_app_name)))
+
+        # GET /api/orders/ and GET /api/orders?customer_name=
         api_name.add_method(http_method='GET',
                             integration=aws_apigateway.LambdaIntegration(handler=self._build_get_order_lambda(role, db, appconfig_app_name)))
 
+    def _add_router_lambda_integration(self, api_name: aws_apigateway.Resource, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str,
+                                       idempotency_table: dynamodb.Table, order_created_topic: sns.Topic):
+        # all verbs share the warm containers of a single function, service.handlers.router dispatches by method and resource
+        integration = aws_apigateway.LambdaIntegration(
+            handler=self._build_orders_router_lambda(role, db, appconfig_app_name, idempotency_table, topic=order_created_topic,
+                                                     outbox_table=self.api_db.outbox_db))
+        for http_method in ('POST', 'GET', 'PATCH', 'DELETE'):  # /api/orders/
+            api_name.add_method(http_method=http_method, integration=integration)
+        batch_resource: aws_apigateway.Resource = api_name.add_resource(constants.ORDERS_GW_BATCH_RESOURCE)
+        for http_method in ('POST', 'GET'):  # /api/orders/batch
+            batch_resource.add_method(http_method=http_method, integration=integration)
+
     def _build_late_order_creation_alarm(self, lambda_function_name: str):
         # create a cloudwatch alarm for create order events taking longer than 1 minute
         duration_metric = cw.Metric(namespace='AWS/Lambda', metric_name='Duration', statistic='Maximum',
@@ -12,6 +12,24 @@ class OrdersApiDbConstruct(Construct):
 
         self.db: dynamodb.Table = self._build_db(id_)
         self.idempotency_db: dynamodb.Table = self._build_idempotency_table(id_)
+        self.outbox_db: dynamodb.Table = self._build_outbox_table(id_)
+
+    def _build_outbox_table(self, id_: str) -> dynamodb.Table:
+        # OrderCreated events written in the same transaction as the order, the stream feeds the outbox relay
+        table_id = f'{id_}{constants.ORDERS_OUTBOX_TABLE_NAME}'
+        table = dynamodb.Table(
+            self,
+            table_id,
+            table_name=table_id,
+            partition_key=dynamodb.Attribute(name='event_id', type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY,
+            time_to_live_attribute='expiration',
+            stream=dynamodb.StreamViewType.NEW_IMAGE,
+        )
+        CfnOutput(self, id=constants.ORDERS_OUTBOX_TABLE_NAME_OUTPUT,
+                  value=table.table_name).override_logical_id(constants.ORDERS_OUTBOX_TABLE_NAME_OUTPUT)
+        return table
 
     def _build_idempotency_table(self, id_: str) -> dynamodb.Table:
         table_id = f'{id_}{constants.ORDERS_IDEMPOTENCY_TABLE_NAME}'
@@ -40,5 +58,12 @@ class OrdersApiDbConstruct(Construct):
             point_in_time_recovery=True,
             removal_policy=RemovalPolicy.DESTROY,
         )
+        # list orders by customer, newest first. Sparse: orders created before created_at existed are not listed
+        table.add_global_secondary_index(
+            index_name=constants.ORDERS_BY_CUSTOMER_INDEX,
+            partition_key=dynamodb.Attribute(name='customer_name', type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name='created_at', type=dynamodb.AttributeType.NUMBER),
+            projection_type=dynamodb.ProjectionType.ALL,
+        )
         CfnOutput(self, id=constants.ORDERS_TABLE_NAME_OUTPUT, value=table.table_name).override_logical_id(constants.ORDERS_TABLE_NAME_OUTPUT)
         return table
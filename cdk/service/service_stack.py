@@ -7,7 +7,7 @@ from constructs import Construct
 from git import Repo
 
 from cdk.service.configuration.configuration_construct import ConfigurationStore
-from cdk.service.constants import CONFIGURATION_NAME, ENVIRONMENT, SERVICE_NAME
+from cdk.service.constants import CONFIGURATION_NAME, ENVIRONMENT, SERVICE_NAME, SINGLE_FUNCTION_API_CONTEXT, SQS_NOTIFICATIONS_CONTEXT
 from cdk.service.notifications_svc_construct import NotificationServiceConstruct
 from cdk.service.orders_api_construct import OrdersApiConstruct
 from cdk.service.users_api_construct import UsersApiConstruct
@@ -41,10 +41,14 @@ class ServiceStack(Stack):
         # from running the service pipeline and without redeploying the service lambdas. For the sake of this template
         # example, it is deployed as part of the service stack
         self.dynamic_configuration = ConfigurationStore(self, f'{id}dynamic_conf'[0:64], ENVIRONMENT, SERVICE_NAME, CONFIGURATION_NAME)
-        self.orders_api = OrdersApiConstruct(self, f'{id}_OrdersService'[0:64], self.dynamic_configuration.config_app.name)
-        self.users_api = UsersApiConstruct(self, f'{id}_UsersService'[0:64], self.dynamic_configuration.config_app.name)
+        # opt-in with 'cdk deploy -c single_function_api=true', one router lambda per service serves every route
+        single_function = str(self.node.try_get_context(SINGLE_FUNCTION_API_CONTEXT)).lower() == 'true'
+        self.orders_api = OrdersApiConstruct(self, f'{id}_OrdersService'[0:64], self.dynamic_configuration.config_app.name, single_function)
+        self.users_api = UsersApiConstruct(self, f'{id}_UsersService'[0:64], self.dynamic_configuration.config_app.name, single_function)
+        # opt-in with 'cdk deploy -c sqs_notifications=true', order created notifications are buffered in SQS and handled in batches
+        sqs_notifications = str(self.node.try_get_context(SQS_NOTIFICATIONS_CONTEXT)).lower() == 'true'
         self.notification_svc = NotificationServiceConstruct(self, f'{id}_NotificationService'[0:64], self.dynamic_configuration.config_app.name,
-                                                             self.orders_api)
+                                                             self.orders_api, sqs_buffered=sqs_notifications)
 
         # add security check
         self._add_security_tests()
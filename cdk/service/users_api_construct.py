@@ -12,7 +12,7 @@ from cdk.service.users_api_db_construct import UsersApiDbConstruct
 
 class UsersApiConstruct(Construct):
 
-    def __init__(self, scope: Construct, id_: str, appconfig_app_name: str) -> None:
+    def __init__(self, scope: Construct, id_: str, appconfig_app_name: str, single_function: bool = False) -> None:
         super().__init__(scope, id_)
         self.id_ = id_
         self.api_db = UsersApiDbConstruct(self, f'{id_}db')
@@ -20,7 +20,10 @@ class UsersApiConstruct(Construct):
         self.common_layer = self._build_common_layer()
         self.rest_api = self._build_api_gw()
         api_resource: aws_apigateway.Resource = self.rest_api.root.add_resource('api').add_resource(constants.USERS_GW_RESOURCE)
-        self._add_post_lambda_integration(api_resource, self.lambda_role, self.api_db.db, appconfig_app_name, self.api_db.idempotency_db)
+        if single_function:
+            self._add_router_lambda_integration(api_resource, self.lambda_role, self.api_db.db, appconfig_app_name, self.api_db.idempotency_db)
+        else:
+            self._add_post_lambda_integration(api_resource, self.lambda_role, self.api_db.db, appconfig_app_name, self.api_db.idempotency_db)
 
     def _build_api_gw(self) -> aws_apigateway.RestApi:
         rest_api: aws_apigateway.RestApi = aws_apigateway.RestApi(
@@ -90,7 +93,7 @@ class UsersApiConstruct(Construct):
             handler='service.handlers.create_user.create_user',
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
-                constants.POWER_TOOLS_LOG_LEVEL: 'DEBUG',  # for logger
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
                 'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
                 'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
                 'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
@@ -119,7 +122,7 @@ class UsersApiConstruct(Construct):
             handler='service.handlers.delete_user.delete_user',
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
-                constants.POWER_TOOLS_LOG_LEVEL: 'DEBUG',  # for logger
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
                 'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
                 'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
                 'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
@@ -147,7 +150,7 @@ class UsersApiConstruct(Construct):
             handler='service.handlers.get_user.get_user',
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
-                constants.POWER_TOOLS_LOG_LEVEL: 'DEBUG',  # for logger
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
                 'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
                 'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
                 'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
@@ -166,6 +169,43 @@ class UsersApiConstruct(Construct):
         )
         return lambda_function
 
+    def _build_users_router_lambda(self, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str, idempotency_table: dynamodb.Table):
+        # one function for every users route, the environment is the union of the routed handlers environments
+        lambda_function = _lambda.Function(
+            self,
+            constants.USERS_ROUTER_LAMBDA,
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            code=_lambda.Code.from_asset(constants.BUILD_FOLDER),
+            handler='service.handlers.router.users_router',
+            environment={
+                constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger, the AppConfig 'logging' section overrides it
+                'CONFIGURATION_APP': appconfig_app_name,  # for feature flags
+                'CONFIGURATION_ENV': constants.ENVIRONMENT,  # for feature flags
+                'CONFIGURATION_NAME': constants.CONFIGURATION_NAME,  # for feature flags
+                'CONFIGURATION_MAX_AGE_MINUTES': constants.CONFIGURATION_MAX_AGE_MINUTES,  # for feature flags
+                'REST_API': 'https://www.ranthebuilder.cloud/api',  # for env vars example
+                'ROLE_ARN': 'arn:partition:service:region:account-id:resource-type:resource-id',  # for env vars example
+                'TABLE_NAME': db.table_name,
+                'IDEMPOTENCY_TABLE_NAME': idempotency_table.table_name,
+            },
+            tracing=_lambda.Tracing.ACTIVE,
+            retry_attempts=0,
+            timeout=Duration.seconds(constants.API_HANDLER_LAMBDA_TIMEOUT),
+            memory_size=constants.API_HANDLER_LAMBDA_MEMORY_SIZE,
+            layers=[self.common_layer],
+            role=role,
+            log_retention=RetentionDays.ONE_DAY,
+        )
+        return lambda_function
+
+    def _add_router_lambda_integration(self, api_name: aws_apigateway.Resource, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str,
+                                       idempotency_table: dynamodb.Table):
+        # all verbs share the warm containers of a single function, service.handlers.router dispatches by method and resource
+        integration = aws_apigateway.LambdaIntegration(handler=self._build_users_router_lambda(role, db, appconfig_app_name, idempotency_table))
+        for http_method in ('POST', 'GET', 'DELETE'):  # /api/users/
+            api_name.add_method(http_method=http_method, integration=integration)
+
     def _add_post_lambda_integration(self, api_name: aws_apigateway.Resource, role: iam.Role, db: dynamodb.Table, appconfig_app_name: str,
                                      idempotency_table: dynamodb.Table):
 
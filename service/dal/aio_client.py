@@ -0,0 +1,40 @@
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any, Optional
+
+from aiobotocore.session import get_session
+
+
+class AioDynamoClient:
+    """ aiobotocore DynamoDB client shared by the async DAL handlers
+
+        The client is opened on first use and kept until close() is called or the 'async with' block exits.
+        Use one instance per event loop, the underlying aiohttp connection pool can not move between loops.
+    """
+
+    def __init__(self, **client_kwargs: Any) -> None:
+        self._client_kwargs = client_kwargs
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._client: Any = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> Any:
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    exit_stack = AsyncExitStack()
+                    self._client = await exit_stack.enter_async_context(get_session().create_client('dynamodb', **self._client_kwargs))
+                    self._exit_stack = exit_stack
+        return self._client
+
+    async def close(self) -> None:
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._client = None
+
+    async def __aenter__(self) -> 'AioDynamoClient':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
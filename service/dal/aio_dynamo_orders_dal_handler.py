@@ -0,0 +1,305 @@
+import asyncio
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from botocore.exceptions import ClientError
+from pydantic import ValidationError
+
+from service.dal.aio_client import AioDynamoClient
+from service.dal.batch_utils import BATCH_GET_MAX_KEYS, BATCH_WRITE_MAX_ITEMS, UNPROCESSED_MAX_ATTEMPTS, async_backoff, chunks, unique
+from service.dal.dynamo_codec import (
+    NEW_ORDER_CONDITION,
+    condition_failed_item,
+    decode_values,
+    encode_values,
+    order_from_item,
+    order_key,
+    order_to_item,
+    update_expression,
+)
+from service.dal.dynamo_orders_dal_handler import ORDERS_BY_CUSTOMER_INDEX
+from service.dal.orders_db_handler import AsyncOrdersDalHandler
+from service.dal.outbox import order_created_record
+from service.dal.pagination import epoch_ms_now
+from service.dal.schemas.orders_db import OrderBatchWriteResult, OrderChanges, OrderCreateResult, OrderEntry, OrdersBatchGetResult, OrdersPage
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger
+from service.schemas.cursor import decode_order_cursor, encode_order_cursor
+from service.schemas.exceptions import InternalServerException
+
+
+class AioDynamoOrdersDalHandler(AsyncOrdersDalHandler):
+    """ asyncio orders DAL on aiobotocore, same table layout and behaviour as DynamoClientOrdersDalHandler """
+
+    def __init__(self, table_name: str, client: AioDynamoClient):
+        self.table_name = table_name
+        self.client = client
+
+    @adaptive_tracer.capture_method
+    async def create_order_in_db(self, customer_name: str, order_item_count: int, outbox_table_name: Optional[str] = None) -> OrderEntry:
+        order_id = str(uuid.uuid4())
+        logger.info('trying to save order', extra={'order_id': order_id})
+        try:
+            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
+            await self._put_order(entry, outbox_table_name)
+        except (ClientError, ValidationError) as exc:
+            error_msg = 'failed to create order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create order', extra={'order_id': order_id, 'order_item_count': order_item_count, 'customer_name': customer_name})
+        return entry
+
+    @adaptive_tracer.capture_method
+    async def create_order_with_id_in_db(self, order_id: str, customer_name: str, order_item_count: int,
+                                         outbox_table_name: Optional[str] = None) -> OrderCreateResult:
+        logger.info('trying to save order with id', extra={'order_id': order_id})
+        try:
+            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
+            await self._put_order(entry, outbox_table_name, condition=NEW_ORDER_CONDITION)
+        except ClientError as exc:
+            existing = condition_failed_item(exc)
+            if existing is None:
+                error_msg = 'failed to create order'
+                logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+                raise InternalServerException(error_msg) from exc
+            logger.info('order already exists', extra={'order_id': order_id})
+            return OrderCreateResult(entry=order_from_item(existing), created=False)
+        except ValidationError as exc:
+            error_msg = 'failed to create order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create order', extra={'order_id': order_id, 'order_item_count': order_item_count, 'customer_name': customer_name})
+        return OrderCreateResult(entry=entry, created=True)
+
+    async def _put_order(self, entry: OrderEntry, outbox_table_name: Optional[str], condition: Optional[Dict[str, Any]] = None) -> None:
+        client = await self.client.get()
+        if outbox_table_name is None:
+            await client.put_item(TableName=self.table_name, Item=order_to_item(entry), **(condition or {}))
+            return
+        # the order and its OrderCreated outbox record are written atomically
+        await client.transact_write_items(TransactItems=[
+            {
+                'Put': {
+                    'TableName': self.table_name,
+                    'Item': order_to_item(entry),
+                    **(condition or {})
+                }
+            },
+            {
+                'Put': {
+                    'TableName': outbox_table_name,
+                    'Item': encode_values(order_created_record(entry).model_dump())
+                }
+            },
+        ])
+
+    @adaptive_tracer.capture_method
+    async def create_orders_in_db(self, orders: Sequence[Tuple[str, int]]) -> List[OrderBatchWriteResult]:
+        logger.info('trying to save orders batch', extra={'order_count': len(orders)})
+        try:
+            created_at = epoch_ms_now()  # one creation time for the whole batch
+            entries = [
+                OrderEntry(order_id=str(uuid.uuid4()), customer_name=customer_name, order_item_count=order_item_count, created_at=created_at)
+                for customer_name, order_item_count in orders
+            ]
+        except ValidationError as exc:
+            error_msg = 'failed to create orders batch'
+            logger.exception(error_msg, extra={'exception': str(exc)})
+            raise InternalServerException(error_msg) from exc
+
+        client = await self.client.get()
+        failed_order_ids: Set[str] = set()
+        for chunk in chunks(entries, BATCH_WRITE_MAX_ITEMS):
+            failed_order_ids.update(await self._batch_write_orders(client, chunk))
+
+        logger.info('finished create orders batch', extra={'order_count': len(entries), 'failed_count': len(failed_order_ids)})
+        return [OrderBatchWriteResult(entry=entry, created=entry.order_id not in failed_order_ids) for entry in entries]
+
+    async def _batch_write_orders(self, client: Any, entries: Sequence[OrderEntry]) -> List[str]:
+        """ write up to BATCH_WRITE_MAX_ITEMS orders, resubmitting UnprocessedItems with backoff
+
+            Returns:
+                List[str]: ids of the orders that were not written
+        """
+        request_items: Dict[str, Any] = {self.table_name: [{'PutRequest': {'Item': order_to_item(entry)}} for entry in entries]}
+        try:
+            for attempt in range(UNPROCESSED_MAX_ATTEMPTS):
+                if attempt:
+                    await async_backoff(attempt - 1)
+                response = await client.batch_write_item(RequestItems=request_items)
+                request_items = response.get('UnprocessedItems', {})
+                if not request_items:
+                    return []
+                lazy_logger.debug('orders batch has unprocessed items', extra={'attempt': attempt, 'count': len(request_items[self.table_name])})
+        except ClientError as exc:
+            logger.exception('failed to write orders batch', extra={'exception': str(exc)})
+
+        return [request['PutRequest']['Item']['order_id']['S'] for request in request_items.get(self.table_name, [])]
+
+    @adaptive_tracer.capture_method
+    async def update_order_in_db(self, order_id: str, customer_name: Optional[str] = None,
+                                 order_item_count: Optional[int] = None) -> Optional[OrderChanges]:
+        logger.info('trying to update order', extra={'order_id': order_id})
+        try:
+            changes = OrderChanges(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count).changes()
+            expression, names, values = update_expression(changes)
+            client = await self.client.get()
+            response = await client.update_item(
+                TableName=self.table_name,
+                Key=order_key(order_id),
+                UpdateExpression=expression,
+                ConditionExpression='attribute_exists(order_id)',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=encode_values(values),
+                ReturnValues='UPDATED_NEW',
+            )
+            lazy_logger.debug('UPDATE order ddb Response', extra={'response': response})
+            rec = OrderChanges.model_validate({'order_id': order_id, **decode_values(response['Attributes'])})
+        except ClientError as exc:
+            if exc.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                logger.info(f'Order {order_id} not found')
+                return None
+            error_msg = 'failed to update order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+        except (ValidationError, KeyError) as exc:
+            error_msg = 'failed to update order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished update order', extra={'order_id': order_id, 'changes': changes})
+        return rec
+
+    @adaptive_tracer.capture_method
+    async def delete_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        logger.info('trying to delete order', extra={'order_id': order_id})
+        try:
+            client = await self.client.get()
+            response = await client.delete_item(TableName=self.table_name, Key=order_key(order_id), ReturnValues='ALL_OLD')
+            lazy_logger.debug('DELETE order ddb Response', extra={'response': response})
+            if 'Attributes' not in response:
+                logger.info(f'Order {order_id} not found')
+                return None
+            rec = order_from_item(response['Attributes'])
+        except (ClientError, KeyError, ValueError) as exc:
+            error_msg = 'failed to delete order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished delete order', extra={'order_id': order_id})
+        return rec
+
+    @adaptive_tracer.capture_method
+    async def get_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        logger.info('trying to retrieve order', extra={'order_id': order_id})
+        try:
+            client = await self.client.get()
+            response = await client.get_item(TableName=self.table_name, Key=order_key(order_id))
+            lazy_logger.debug('GET order ddb Response', extra={'response': response})
+            if 'Item' not in response:
+                logger.info(f'Order {order_id} not found')
+                return None
+            rec = order_from_item(response['Item'])
+        except (ClientError, KeyError, ValueError) as exc:
+            error_msg = 'failed to get order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished get order', extra={
+            'order_id': rec.order_id,
+            'order_item_count': rec.order_item_count,
+            'customer_name': rec.customer_name
+        })
+        return rec
+
+    @adaptive_tracer.capture_method
+    async def get_orders_in_db(self, order_ids: Sequence[str]) -> OrdersBatchGetResult:
+        order_ids = unique(order_ids)
+        logger.info('trying to retrieve orders batch', extra={'order_count': len(order_ids)})
+        try:
+            client = await self.client.get()
+            items: Dict[str, OrderEntry] = {}
+            for chunk in chunks([order_key(order_id) for order_id in order_ids], BATCH_GET_MAX_KEYS):
+                for item in await self._batch_get_orders(client, chunk):
+                    rec = order_from_item(item)
+                    items[rec.order_id] = rec
+        except (ClientError, KeyError, ValueError) as exc:
+            error_msg = 'failed to get orders batch'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_count': len(order_ids)})
+            raise InternalServerException(error_msg) from exc
+
+        result = OrdersBatchGetResult(
+            found=[items[order_id] for order_id in order_ids if order_id in items],
+            missing_order_ids=[order_id for order_id in order_ids if order_id not in items],
+        )
+        logger.info('finished get orders batch', extra={'found_count': len(result.found), 'missing_count': len(result.missing_order_ids)})
+        return result
+
+    async def _batch_get_orders(self, client: Any, keys: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ read up to BATCH_GET_MAX_KEYS orders, resubmitting UnprocessedKeys with backoff
+
+            Raises:
+                InternalServerException: keys are still unprocessed after all attempts
+        """
+        items: List[Dict[str, Any]] = []
+        request_items: Dict[str, Any] = {self.table_name: {'Keys': list(keys)}}
+        for attempt in range(UNPROCESSED_MAX_ATTEMPTS):
+            if attempt:
+                await async_backoff(attempt - 1)
+            response = await client.batch_get_item(RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(self.table_name, []))
+            request_items = response.get('UnprocessedKeys', {})
+            if not request_items:
+                return items
+            lazy_logger.debug('orders batch has unprocessed keys', extra={'attempt': attempt, 'count': len(request_items[self.table_name]['Keys'])})
+
+        error_msg = 'orders batch keys left unprocessed'
+        logger.error(error_msg, extra={'count': len(request_items[self.table_name]['Keys'])})
+        raise InternalServerException(error_msg)
+
+    async def list_orders_by_customer(self, customer_name: str, page_size: int, cursor: Optional[str] = None,
+                                      prefetch: bool = True) -> AsyncIterator[OrdersPage]:
+        logger.info('trying to list customer orders', extra={'customer_name': customer_name, 'page_size': page_size, 'prefetch': prefetch})
+        next_page = asyncio.ensure_future(self._query_orders_page(customer_name, page_size, cursor))
+        try:
+            while True:
+                page = await next_page
+                if page.cursor is None:
+                    yield page
+                    return
+                if prefetch:
+                    next_page = asyncio.ensure_future(self._query_orders_page(customer_name, page_size, page.cursor))
+                yield page
+                if not prefetch:
+                    next_page = asyncio.ensure_future(self._query_orders_page(customer_name, page_size, page.cursor))
+        finally:
+            next_page.cancel()  # the caller stopped early, drop the prefetched page
+
+    async def _query_orders_page(self, customer_name: str, page_size: int, cursor: Optional[str]) -> OrdersPage:
+        """ one Query page of the orders by customer index, newest first """
+        query: Dict[str, Any] = {
+            'TableName': self.table_name,
+            'IndexName': ORDERS_BY_CUSTOMER_INDEX,
+            'KeyConditionExpression': 'customer_name = :customer_name',
+            'ExpressionAttributeValues': encode_values({':customer_name': customer_name}),
+            'ScanIndexForward': False,
+            'Limit': page_size,
+        }
+        if cursor is not None:
+            created_at, order_id = decode_order_cursor(cursor)
+            query['ExclusiveStartKey'] = encode_values({'customer_name': customer_name, 'created_at': created_at, 'order_id': order_id})
+        try:
+            client = await self.client.get()
+            response = await client.query(**query)
+            orders = [order_from_item(item) for item in response.get('Items', [])]
+        except (ClientError, KeyError) as exc:
+            error_msg = 'failed to list customer orders'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        last_key = response.get('LastEvaluatedKey')
+        if last_key is None:
+            return OrdersPage(orders=orders)
+        last_values = decode_values(last_key)
+        return OrdersPage(orders=orders, cursor=encode_order_cursor(last_values['created_at'], last_values['order_id']))
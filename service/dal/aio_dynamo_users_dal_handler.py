@@ -0,0 +1,97 @@
+import uuid
+from typing import Optional
+
+from botocore.exceptions import ClientError
+from pydantic import ValidationError
+
+from service.dal.aio_client import AioDynamoClient
+from service.dal.dynamo_codec import NEW_USER_CONDITION, condition_failed_item, user_from_item, user_key, user_to_item
+from service.dal.schemas.users_db import UserCreateResult, UserEntry
+from service.dal.users_db_handler import AsyncUsersDalHandler
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger
+from service.schemas.exceptions import InternalServerException
+
+
+class AioDynamoUsersDalHandler(AsyncUsersDalHandler):
+    """ asyncio users DAL on aiobotocore, same table layout and behaviour as DynamoClientUsersDalHandler """
+
+    def __init__(self, table_name: str, client: AioDynamoClient):
+        self.table_name = table_name
+        self.client = client
+
+    @adaptive_tracer.capture_method
+    async def create_user_in_db(self, user_name: str, email: str) -> UserEntry:
+        user_id = str(uuid.uuid4())
+        logger.info('trying to save user', extra={'user_id': user_id})
+        try:
+            entry = UserEntry(user_id=user_id, user_name=user_name, email=email)
+            client = await self.client.get()
+            await client.put_item(TableName=self.table_name, Item=user_to_item(entry))
+        except (ClientError, ValidationError) as exc:
+            error_msg = 'failed to create user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create user', extra={'user_id': user_id, 'user_name': user_name, 'email': email})
+        return entry
+
+    @adaptive_tracer.capture_method
+    async def create_user_with_id_in_db(self, user_id: str, user_name: str, email: str) -> UserCreateResult:
+        logger.info('trying to save user with id', extra={'user_id': user_id})
+        try:
+            entry = UserEntry(user_id=user_id, user_name=user_name, email=email)
+            client = await self.client.get()
+            await client.put_item(TableName=self.table_name, Item=user_to_item(entry), **NEW_USER_CONDITION)
+        except ClientError as exc:
+            existing = condition_failed_item(exc)
+            if existing is None:
+                error_msg = 'failed to create user'
+                logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+                raise InternalServerException(error_msg) from exc
+            logger.info('user already exists', extra={'user_id': user_id})
+            return UserCreateResult.model_construct(entry=user_from_item(existing), created=False)
+        except ValidationError as exc:
+            error_msg = 'failed to create user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create user', extra={'user_id': user_id, 'user_name': user_name, 'email': email})
+        return UserCreateResult.model_construct(entry=entry, created=True)
+
+    @adaptive_tracer.capture_method
+    async def delete_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        logger.info('trying to delete user', extra={'user_id': user_id})
+        try:
+            client = await self.client.get()
+            response = await client.delete_item(TableName=self.table_name, Key=user_key(user_id), ReturnValues='ALL_OLD')
+            lazy_logger.debug('DELETE user ddb Response', extra={'response': response})
+            if 'Attributes' not in response:
+                logger.info(f'user {user_id} not found')
+                return None
+            rec = user_from_item(response['Attributes'])
+        except (ClientError, KeyError) as exc:
+            error_msg = 'failed to delete user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_id': user_id})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished delete user', extra={'user_id': user_id})
+        return rec
+
+    @adaptive_tracer.capture_method
+    async def get_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        logger.info('trying to retrieve user', extra={'user_id': user_id})
+        try:
+            client = await self.client.get()
+            response = await client.get_item(TableName=self.table_name, Key=user_key(user_id))
+            lazy_logger.debug('GET user ddb Response', extra={'response': response})
+            if 'Item' not in response:
+                logger.info(f'user {user_id} not found')
+                return None
+            rec = user_from_item(response['Item'])
+        except (ClientError, KeyError, ValueError) as exc:
+            error_msg = 'failed to get user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_id': user_id})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished get user', extra={'user_id': rec.user_id, 'email': rec.email, 'customer_name': rec.user_name})
+        return rec
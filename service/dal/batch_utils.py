@@ -0,0 +1,40 @@
+import asyncio
+import random
+import time
+from typing import Iterable, Iterator, List, Sequence, TypeVar
+
+T = TypeVar('T')
+
+BATCH_WRITE_MAX_ITEMS = 25  # DynamoDB BatchWriteItem limit per call
+BATCH_GET_MAX_KEYS = 100  # DynamoDB BatchGetItem limit per call
+UNPROCESSED_MAX_ATTEMPTS = 5  # calls per chunk, including the first one
+_BACKOFF_BASE_SECONDS = 0.05
+_BACKOFF_MAX_SECONDS = 1.0
+
+
+def chunks(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """ split items into consecutive chunks of at most size items """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def backoff_delay(attempt: int) -> float:
+    """ exponential backoff with full jitter before resubmitting unprocessed items or keys
+
+        Args:
+            attempt (int): zero based retry number
+    """
+    return random.uniform(0, min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2**attempt))
+
+
+def backoff(attempt: int) -> None:
+    time.sleep(backoff_delay(attempt))
+
+
+async def async_backoff(attempt: int) -> None:
+    await asyncio.sleep(backoff_delay(attempt))
+
+
+def unique(items: Iterable[T]) -> List[T]:
+    """ remove duplicates and keep the original order, batch APIs reject duplicated keys """
+    return list(dict.fromkeys(items))
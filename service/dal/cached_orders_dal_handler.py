@@ -0,0 +1,78 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from service.dal.batch_utils import unique
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.read_through_cache import ReadThroughCache
+from service.dal.schemas.orders_db import OrderBatchWriteResult, OrderChanges, OrderCreateResult, OrderEntry, OrdersBatchGetResult, OrdersPage
+
+
+class CachedOrdersDalHandler(OrdersDalHandler):
+    """ read-through cache layered over another orders DAL handler, creates seed the cache and deletes invalidate it """
+
+    def __init__(self, dal_handler: OrdersDalHandler, cache: ReadThroughCache[OrderEntry]):
+        self.dal_handler = dal_handler
+        self.cache = cache
+
+    def create_order_in_db(self, customer_name: str, order_item_count: int, outbox_table_name: Optional[str] = None) -> OrderEntry:
+        entry = self.dal_handler.create_order_in_db(customer_name, order_item_count, outbox_table_name)
+        self.cache.put(entry.order_id, entry)
+        return entry
+
+    def create_order_with_id_in_db(self, order_id: str, customer_name: str, order_item_count: int,
+                                   outbox_table_name: Optional[str] = None) -> OrderCreateResult:
+        result = self.dal_handler.create_order_with_id_in_db(order_id, customer_name, order_item_count, outbox_table_name)
+        self.cache.put(order_id, result.entry)
+        return result
+
+    def create_orders_in_db(self, orders: Sequence[Tuple[str, int]]) -> List[OrderBatchWriteResult]:
+        results = self.dal_handler.create_orders_in_db(orders)
+        for result in results:
+            if result.created:
+                self.cache.put(result.entry.order_id, result.entry)
+        return results
+
+    def update_order_in_db(self, order_id: str, customer_name: Optional[str] = None,
+                           order_item_count: Optional[int] = None) -> Optional[OrderChanges]:
+        # the update returns only the changed attributes, the next get reads the whole order again
+        try:
+            return self.dal_handler.update_order_in_db(order_id, customer_name, order_item_count)
+        finally:
+            self.cache.invalidate(order_id)
+
+    def delete_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        rec = self.dal_handler.delete_order_in_db(order_id)
+        self.cache.put_missing(order_id)
+        return rec
+
+    def get_order_in_db(self, order_id: str) -> Optional[OrderEntry]:  # type: ignore[override]
+        hit, entry = self.cache.get(order_id)
+        if hit:
+            return entry
+        entry = self.dal_handler.get_order_in_db(order_id)
+        if entry is None:
+            self.cache.put_missing(order_id)
+        else:
+            self.cache.put(order_id, entry)
+        return entry
+
+    def get_orders_in_db(self, order_ids: Sequence[str]) -> OrdersBatchGetResult:
+        order_ids = unique(order_ids)
+        found: Dict[str, OrderEntry]
+        found, _, not_cached = self.cache.get_many(order_ids)
+        if not_cached:
+            result = self.dal_handler.get_orders_in_db(not_cached)
+            for entry in result.found:
+                self.cache.put(entry.order_id, entry)
+                found[entry.order_id] = entry
+            for order_id in result.missing_order_ids:
+                self.cache.put_missing(order_id)
+
+        return OrdersBatchGetResult(
+            found=[found[order_id] for order_id in order_ids if order_id in found],
+            missing_order_ids=[order_id for order_id in order_ids if order_id not in found],
+        )
+
+    def list_orders_by_customer(self, customer_name: str, page_size: int, cursor: Optional[str] = None,
+                                prefetch: bool = True) -> Iterator[OrdersPage]:
+        # listings are not cached, every create changes them
+        return self.dal_handler.list_orders_by_customer(customer_name, page_size, cursor, prefetch)
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from service.dal.read_through_cache import ReadThroughCache
+from service.dal.schemas.users_db import UserCreateResult, UserEntry
+from service.dal.users_db_handler import UsersDalHandler
+
+
+class CachedUsersDalHandler(UsersDalHandler):
+    """ read-through cache layered over another users DAL handler, creates seed the cache and deletes invalidate it """
+
+    def __init__(self, dal_handler: UsersDalHandler, cache: ReadThroughCache[UserEntry]):
+        self.dal_handler = dal_handler
+        self.cache = cache
+
+    def create_user_in_db(self, user_name: str, email: str) -> UserEntry:
+        entry = self.dal_handler.create_user_in_db(user_name=user_name, email=email)
+        self.cache.put(entry.user_id, entry)
+        return entry
+
+    def create_user_with_id_in_db(self, user_id: str, user_name: str, email: str) -> UserCreateResult:
+        result = self.dal_handler.create_user_with_id_in_db(user_id=user_id, user_name=user_name, email=email)
+        self.cache.put(user_id, result.entry)
+        return result
+
+    def delete_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        rec = self.dal_handler.delete_user_in_db(user_id)
+        self.cache.put_missing(user_id)
+        return rec
+
+    def get_user_in_db(self, user_id: str) -> Optional[UserEntry]:  # type: ignore[override]
+        hit, entry = self.cache.get(user_id)
+        if hit:
+            return entry
+        entry = self.dal_handler.get_user_in_db(user_id)
+        if entry is None:
+            self.cache.put_missing(user_id)
+        else:
+            self.cache.put(user_id, entry)
+        return entry
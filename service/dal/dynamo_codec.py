@@ -0,0 +1,113 @@
+""" hand specialised codecs between the DAL entries and DynamoDB wire JSON
+
+The low-level DynamoDB client expects and returns attribute values in wire format ({'S': ...}, {'N': ...}).
+The resource API converts every value with the generic TypeSerializer/TypeDeserializer and returns numbers as Decimal,
+which the entry models then have to coerce back. These functions know the exact shape of each entry and skip both steps.
+Items are written by the DAL only, so decoded entries are built with model_construct and are not validated again.
+"""
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from service.dal.schemas.orders_db import OrderEntry
+from service.dal.schemas.users_db import UserEntry
+
+WireItem = Dict[str, Any]
+
+# put of a new item only, a conflict returns the stored item with the error instead of needing a GET
+NEW_ORDER_CONDITION: Dict[str, Any] = {'ConditionExpression': 'attribute_not_exists(order_id)', 'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'}
+NEW_USER_CONDITION: Dict[str, Any] = {'ConditionExpression': 'attribute_not_exists(user_id)', 'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'}
+
+
+def order_key(order_id: str) -> WireItem:
+    return {'order_id': {'S': order_id}}
+
+
+def order_to_item(entry: OrderEntry) -> WireItem:
+    item: WireItem = {
+        'order_id': {
+            'S': entry.order_id
+        },
+        'customer_name': {
+            'S': entry.customer_name
+        },
+        'order_item_count': {
+            'N': str(entry.order_item_count)
+        },
+    }
+    if entry.created_at is not None:
+        item['created_at'] = {'N': str(entry.created_at)}
+    return item
+
+
+def order_from_item(item: Mapping[str, Any]) -> OrderEntry:
+    created_at = item.get('created_at')
+    return OrderEntry.model_construct(
+        order_id=item['order_id']['S'],
+        customer_name=item['customer_name']['S'],
+        order_item_count=int(item['order_item_count']['N']),
+        created_at=None if created_at is None else int(created_at['N']),
+    )
+
+
+def encode_values(values: Mapping[str, Any]) -> WireItem:
+    """ flat map of str and int values, i.e. expression attribute values and index keys """
+    return {name: {'S': value} if isinstance(value, str) else {'N': str(value)} for name, value in values.items()}
+
+
+def decode_values(item: Mapping[str, Any]) -> Dict[str, Any]:
+    """ inverse of encode_values """
+    return {name: value['S'] if 'S' in value else int(value['N']) for name, value in item.items()}
+
+
+def update_expression(changes: Mapping[str, Any]) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """ SET expression that writes only the changed attributes
+
+        Returns:
+            Tuple[str, Dict[str, str], Dict[str, Any]]: UpdateExpression, ExpressionAttributeNames and
+            ExpressionAttributeValues, the values are not wire encoded yet
+    """
+    names = {f'#n{index}': name for index, name in enumerate(changes)}
+    values = {f':v{index}': value for index, value in enumerate(changes.values())}
+    return 'SET ' + ', '.join(f'#n{index} = :v{index}' for index in range(len(changes))), names, values
+
+
+def user_key(user_id: str) -> WireItem:
+    return {'user_id': {'S': user_id}}
+
+
+def user_to_item(entry: UserEntry) -> WireItem:
+    return {
+        'user_id': {
+            'S': entry.user_id
+        },
+        'user_name': {
+            'S': entry.user_name
+        },
+        'email': {
+            'S': entry.email
+        },
+    }
+
+
+def user_from_item(item: Mapping[str, Any]) -> UserEntry:
+    return UserEntry.model_construct(
+        user_id=item['user_id']['S'],
+        user_name=item['user_name']['S'],
+        email=item['email']['S'],
+    )
+
+
+def condition_failed_item(exc: ClientError) -> Optional[WireItem]:
+    """ stored item returned by a NEW_*_CONDITION put, or the first put of a transaction, whose condition failed
+
+        The item is wire JSON for the resource API as well, error responses are not deserialized. None when the request failed
+        for another reason.
+    """
+    error = exc.response
+    if error['Error']['Code'] == 'ConditionalCheckFailedException':
+        return error.get('Item')
+    if error['Error']['Code'] == 'TransactionCanceledException':
+        reasons = error.get('CancellationReasons') or [{}]
+        return reasons[0].get('Item') if reasons[0].get('Code') == 'ConditionalCheckFailed' else None
+    return None
@@ -1,39 +1,92 @@
+from __future__ import annotations
+
 import uuid
 from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
-import boto3
+from aws_lambda_env_modeler import get_environment_variables
 from botocore.exceptions import ClientError
-from cachetools import TTLCache, cached
-from mypy_boto3_dynamodb import DynamoDBServiceResource
-from mypy_boto3_dynamodb.service_resource import Table
 from pydantic import ValidationError
 
+from service.dal.batch_utils import BATCH_GET_MAX_KEYS, BATCH_WRITE_MAX_ITEMS, UNPROCESSED_MAX_ATTEMPTS, backoff, chunks, unique
+from service.dal.cached_orders_dal_handler import CachedOrdersDalHandler
+from service.dal.dynamo_codec import (
+    NEW_ORDER_CONDITION,
+    condition_failed_item,
+    decode_values,
+    encode_values,
+    order_from_item,
+    order_key,
+    order_to_item,
+    update_expression,
+)
 from service.dal.orders_db_handler import OrdersDalHandler
-from service.dal.schemas.orders_db import OrderBase, OrderEntry
-from service.handlers.utils.observability import logger, tracer
+from service.dal.outbox import order_created_record
+from service.dal.pagination import epoch_ms_now, iterate_pages
+from service.dal.read_through_cache import build_read_through_cache
+from service.dal.schemas.orders_db import (
+    OrderBase,
+    OrderBatchWriteResult,
+    OrderChanges,
+    OrderCreateResult,
+    OrderEntry,
+    OrdersBatchGetResult,
+    OrdersPage,
+)
+from service.handlers.schemas.env_vars import DynamoDal
+from service.handlers.utils.aws_clients import get_client, get_resource
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger
+from service.schemas.cursor import decode_order_cursor, encode_order_cursor
 from service.schemas.exceptions import InternalServerException
 
+if TYPE_CHECKING:  # the stubs only matter to mypy, importing them costs ~40ms of cold start
+    from mypy_boto3_dynamodb import DynamoDBClient, DynamoDBServiceResource
+    from mypy_boto3_dynamodb.service_resource import Table
+
+ORDERS_BY_CUSTOMER_INDEX = 'customer_name-created_at'  # global secondary index, same name as in cdk/service/constants.py
+
 
 class DynamoOrdersDalHandler(OrdersDalHandler):
 
     def __init__(self, table_name: str):
         self.table_name = table_name
 
-    # cache dynamodb connection data for no longer than 5 minutes
-    @cached(cache=TTLCache(maxsize=1, ttl=300))
     def _get_db_handler(self) -> Table:
-        dynamodb: DynamoDBServiceResource = boto3.resource('dynamodb')
+        # the resource and its connection pool are shared for the life of the container
+        dynamodb: DynamoDBServiceResource = get_resource('dynamodb')
         return dynamodb.Table(self.table_name)
 
-    @tracer.capture_method(capture_response=False)
-    def create_order_in_db(self, customer_name: str, order_item_count: int) -> OrderEntry:
+    # item conversion used by the batch and query calls, overridden by the low-level client handler
+    def _get_batch_client(self) -> DynamoDBClient:
+        return self._get_db_handler().meta.client
+
+    def _to_item(self, entry: OrderEntry) -> Dict[str, Any]:
+        return entry.model_dump(exclude_none=True)
+
+    def _from_item(self, item: Dict[str, Any]) -> OrderEntry:
+        return OrderEntry.model_validate(item)
+
+    def _key(self, order_id: str) -> Dict[str, Any]:
+        return OrderBase(order_id=order_id).model_dump()
+
+    def _encode_values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        return values
+
+    def _decode_values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        return values
+
+    @adaptive_tracer.capture_method
+    def create_order_in_db(self, customer_name: str, order_item_count: int, outbox_table_name: Optional[str] = None) -> OrderEntry:
         order_id = str(uuid.uuid4())
         logger.info('trying to save order', extra={'order_id': order_id})
         try:
-            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count)
+            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
             logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
-            table: Table = self._get_db_handler()
-            table.put_item(Item=entry.model_dump())
+            if outbox_table_name is None:
+                table: Table = self._get_db_handler()
+                table.put_item(Item=self._to_item(entry))
+            else:
+                self._transact_create_order(entry, outbox_table_name)
         except (ClientError, ValidationError) as exc:
             error_msg = 'failed to create order'
             logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
@@ -42,8 +95,136 @@ class DynamoOrdersDalHandler(OrdersDalHandler):
         logger.info('finished create order', extra={'order_id': order_id, 'order_item_count': order_item_count, 'customer_name': customer_name})
         return entry
 
-    @tracer.capture_method(capture_response=False)
-    def delete_order_in_db(self, order_id: str) -> OrderBase:
+    def _transact_create_order(self, entry: OrderEntry, outbox_table_name: str, new_only: bool = False) -> None:
+        """ write the order and its OrderCreated outbox record atomically, either both exist or neither does
+
+            With new_only the transaction is cancelled when an order with the same id exists.
+        """
+        record = order_created_record(entry)
+        order_put: Dict[str, Any] = {'TableName': self.table_name, 'Item': self._to_item(entry)}
+        if new_only:
+            order_put.update(NEW_ORDER_CONDITION)
+        self._get_batch_client().transact_write_items(TransactItems=[
+            {
+                'Put': order_put  # type: ignore[typeddict-item]
+            },
+            {
+                'Put': {
+                    'TableName': outbox_table_name,
+                    'Item': self._encode_values(record.model_dump())
+                }
+            },
+        ])
+
+    @adaptive_tracer.capture_method
+    def create_order_with_id_in_db(self, order_id: str, customer_name: str, order_item_count: int,
+                                   outbox_table_name: Optional[str] = None) -> OrderCreateResult:
+        logger.info('trying to save order with id', extra={'order_id': order_id})
+        try:
+            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            if outbox_table_name is None:
+                self._get_batch_client().put_item(TableName=self.table_name, Item=self._to_item(entry), **NEW_ORDER_CONDITION)
+            else:
+                self._transact_create_order(entry, outbox_table_name, new_only=True)
+        except ClientError as exc:
+            existing = condition_failed_item(exc)
+            if existing is None:
+                error_msg = 'failed to create order'
+                logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+                raise InternalServerException(error_msg) from exc
+            logger.info('order already exists', extra={'order_id': order_id})
+            return OrderCreateResult(entry=order_from_item(existing), created=False)
+        except ValidationError as exc:
+            error_msg = 'failed to create order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create order', extra={'order_id': order_id, 'order_item_count': order_item_count, 'customer_name': customer_name})
+        return OrderCreateResult(entry=entry, created=True)
+
+    @adaptive_tracer.capture_method
+    def create_orders_in_db(self, orders: Sequence[Tuple[str, int]]) -> List[OrderBatchWriteResult]:
+        logger.info('trying to save orders batch', extra={'order_count': len(orders)})
+        try:
+            created_at = epoch_ms_now()  # one creation time for the whole batch
+            entries = [
+                OrderEntry(order_id=str(uuid.uuid4()), customer_name=customer_name, order_item_count=order_item_count, created_at=created_at)
+                for customer_name, order_item_count in orders
+            ]
+        except ValidationError as exc:
+            error_msg = 'failed to create orders batch'
+            logger.exception(error_msg, extra={'exception': str(exc)})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+        client: DynamoDBClient = self._get_batch_client()
+        failed_order_ids: Set[str] = set()
+        for chunk in chunks(entries, BATCH_WRITE_MAX_ITEMS):
+            failed_order_ids.update(self._batch_write_orders(client, chunk))
+
+        logger.info('finished create orders batch', extra={'order_count': len(entries), 'failed_count': len(failed_order_ids)})
+        return [OrderBatchWriteResult(entry=entry, created=entry.order_id not in failed_order_ids) for entry in entries]
+
+    def _batch_write_orders(self, client: DynamoDBClient, entries: Sequence[OrderEntry]) -> List[str]:
+        """ write up to BATCH_WRITE_MAX_ITEMS orders, resubmitting UnprocessedItems with backoff
+
+            Returns:
+                List[str]: ids of the orders that were not written
+        """
+        request_items: Dict[str, Any] = {self.table_name: [{'PutRequest': {'Item': self._to_item(entry)}} for entry in entries]}
+        try:
+            for attempt in range(UNPROCESSED_MAX_ATTEMPTS):
+                if attempt:
+                    backoff(attempt - 1)
+                response = client.batch_write_item(RequestItems=request_items)
+                request_items = response.get('UnprocessedItems', {})
+                if not request_items:
+                    return []
+                lazy_logger.debug('orders batch has unprocessed items', extra={'attempt': attempt, 'count': len(request_items[self.table_name])})
+        except ClientError as exc:
+            logger.exception('failed to write orders batch', extra={'exception': str(exc)})
+
+        return [self._from_item(request['PutRequest']['Item']).order_id for request in request_items.get(self.table_name, [])]
+
+    @adaptive_tracer.capture_method
+    def update_order_in_db(self, order_id: str, customer_name: Optional[str] = None,
+                           order_item_count: Optional[int] = None) -> Optional[OrderChanges]:
+        logger.info('trying to update order', extra={'order_id': order_id})
+        try:
+            changes = OrderChanges(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count).changes()
+            expression, names, values = update_expression(changes)
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            client: DynamoDBClient = self._get_batch_client()
+            # only the changed attributes travel in both directions, the condition turns a missing order into a 404 instead of an upsert
+            response = client.update_item(
+                TableName=self.table_name,
+                Key=self._key(order_id),
+                UpdateExpression=expression,
+                ConditionExpression='attribute_exists(order_id)',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=self._encode_values(values),
+                ReturnValues='UPDATED_NEW',
+            )
+            lazy_logger.debug('UPDATE order ddb Response', extra={'response': response})
+            rec = OrderChanges.model_validate({'order_id': order_id, **self._decode_values(dict(response['Attributes']))})
+        except ClientError as exc:
+            if exc.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                logger.info(f'Order {order_id} not found')
+                return None
+            error_msg = 'failed to update order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+        except (ValidationError, KeyError) as exc:
+            error_msg = 'failed to update order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished update order', extra={'order_id': order_id, 'changes': changes})
+        return rec
+
+    @adaptive_tracer.capture_method
+    def delete_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
         logger.info('trying to delete order', extra={'order_id': order_id})
         try:
             entry = OrderBase(order_id=order_id)
@@ -51,15 +232,16 @@ class DynamoOrdersDalHandler(OrdersDalHandler):
             table: Table = self._get_db_handler()
 
             key = entry.model_dump()
-            logger.debug('DDB order Key', extra={'key': key})
-            response = table.delete_item(Key=key)
-            logger.debug('DELETE order ddb Response', extra={'response': response})
-            # if 'Attributes' in response:
-            #     logger.debug('DELETE order ddb Response.Attributes', extra={'item': response['Attributes']})
-            #     rec = OrderEntry.model_validate(response['Attributes'])
-            # else:
-            # rec = OrderEntry(order_id=order_id, customer_name="???", order_item_count=1)
-            rec = OrderBase(order_id=order_id)
+            lazy_logger.debug('DDB order Key', extra={'key': key})
+            # the old item comes back in the same round trip, no GET needed to know what was deleted
+            response = table.delete_item(Key=key, ReturnValues='ALL_OLD')
+            lazy_logger.debug('DELETE order ddb Response', extra={'response': response})
+            if 'Attributes' in response:
+                lazy_logger.debug('DELETE order ddb Response.Attributes', extra={'item': response['Attributes']})
+                rec = OrderEntry.model_validate(response['Attributes'])
+            else:
+                logger.info(f'Order {order_id} not found')
+                return None
 
         except (ClientError, ValidationError) as exc:
             error_msg = 'failed to delete order'
@@ -69,7 +251,7 @@ class DynamoOrdersDalHandler(OrdersDalHandler):
         logger.info('finished delete order', extra={'order_id': order_id})
         return rec
 
-    @tracer.capture_method(capture_response=False)
+    @adaptive_tracer.capture_method
     def get_order_in_db(self, order_id: str) -> OrderEntry:
         logger.info('trying to retrieve order', extra={'order_id': order_id})
         try:
@@ -77,11 +259,11 @@ class DynamoOrdersDalHandler(OrdersDalHandler):
             logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
             table: Table = self._get_db_handler()
             key = entry.model_dump()
-            logger.debug('DDB order Key', extra={'key': key})
+            lazy_logger.debug('DDB order Key', extra={'key': key})
             response = table.get_item(Key=key)
-            logger.debug('GET order ddb Response', extra={'response': response})
+            lazy_logger.debug('GET order ddb Response', extra={'response': response})
             if 'Item' in response:
-                logger.debug('GET order ddb Response.Item', extra={'item': response['Item']})
+                lazy_logger.debug('GET order ddb Response.Item', extra={'item': response['Item']})
                 rec = OrderEntry.model_validate(response['Item'])
                 logger.info('finished get order', extra={
                     'order_id': rec.order_id,
@@ -99,7 +281,185 @@ class DynamoOrdersDalHandler(OrdersDalHandler):
 
         return rec
 
+    @adaptive_tracer.capture_method
+    def get_orders_in_db(self, order_ids: Sequence[str]) -> OrdersBatchGetResult:
+        order_ids = unique(order_ids)
+        logger.info('trying to retrieve orders batch', extra={'order_count': len(order_ids)})
+        try:
+            keys = [self._key(order_id) for order_id in order_ids]
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            client: DynamoDBClient = self._get_batch_client()
+            items: Dict[str, OrderEntry] = {}
+            for chunk in chunks(keys, BATCH_GET_MAX_KEYS):
+                for item in self._batch_get_orders(client, chunk):
+                    rec = self._from_item(item)
+                    items[rec.order_id] = rec
+        except (ClientError, ValueError, KeyError) as exc:
+            error_msg = 'failed to get orders batch'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_count': len(order_ids)})
+            raise InternalServerException(error_msg) from exc
+
+        result = OrdersBatchGetResult(
+            found=[items[order_id] for order_id in order_ids if order_id in items],
+            missing_order_ids=[order_id for order_id in order_ids if order_id not in items],
+        )
+        logger.info('finished get orders batch', extra={'found_count': len(result.found), 'missing_count': len(result.missing_order_ids)})
+        return result
+
+    def _batch_get_orders(self, client: DynamoDBClient, keys: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ read up to BATCH_GET_MAX_KEYS orders, resubmitting UnprocessedKeys with backoff
+
+            Raises:
+                InternalServerException: keys are still unprocessed after all attempts
+        """
+        items: List[Dict[str, Any]] = []
+        request_items: Dict[str, Any] = {self.table_name: {'Keys': list(keys)}}
+        for attempt in range(UNPROCESSED_MAX_ATTEMPTS):
+            if attempt:
+                backoff(attempt - 1)
+            response = client.batch_get_item(RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(self.table_name, []))
+            request_items = response.get('UnprocessedKeys', {})
+            if not request_items:
+                return items
+            lazy_logger.debug('orders batch has unprocessed keys', extra={'attempt': attempt, 'count': len(request_items[self.table_name]['Keys'])})
+
+        error_msg = 'orders batch keys left unprocessed'
+        logger.error(error_msg, extra={'count': len(request_items[self.table_name]['Keys'])})
+        raise InternalServerException(error_msg)
+
+    def list_orders_by_customer(self, customer_name: str, page_size: int, cursor: Optional[str] = None,
+                                prefetch: bool = True) -> Iterator[OrdersPage]:
+        logger.info('trying to list customer orders', extra={'customer_name': customer_name, 'page_size': page_size, 'prefetch': prefetch})
+        return iterate_pages(lambda page_cursor: self._query_orders_page(customer_name, page_size, page_cursor), cursor, prefetch)
+
+    def _query_orders_page(self, customer_name: str, page_size: int, cursor: Optional[str]) -> OrdersPage:
+        """ one Query page of the orders by customer index, newest first """
+        query: Dict[str, Any] = {
+            'TableName': self.table_name,
+            'IndexName': ORDERS_BY_CUSTOMER_INDEX,
+            'KeyConditionExpression': 'customer_name = :customer_name',
+            'ExpressionAttributeValues': self._encode_values({':customer_name': customer_name}),
+            'ScanIndexForward': False,
+            'Limit': page_size,
+        }
+        if cursor is not None:
+            created_at, order_id = decode_order_cursor(cursor)
+            query['ExclusiveStartKey'] = self._encode_values({'customer_name': customer_name, 'created_at': created_at, 'order_id': order_id})
+        try:
+            response = self._get_batch_client().query(**query)
+            orders = [self._from_item(item) for item in response.get('Items', [])]
+        except (ClientError, ValidationError, KeyError) as exc:
+            error_msg = 'failed to list customer orders'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        last_key = response.get('LastEvaluatedKey')
+        if last_key is None:
+            return OrdersPage(orders=orders)
+        last_values = self._decode_values(dict(last_key))
+        return OrdersPage(orders=orders, cursor=encode_order_cursor(int(last_values['created_at']), last_values['order_id']))
+
+
+class DynamoClientOrdersDalHandler(DynamoOrdersDalHandler):
+    """ same table and behaviour as DynamoOrdersDalHandler on the low-level client
+
+        Items are converted to and from DynamoDB wire JSON by the hand specialised codec in service.dal.dynamo_codec
+        instead of the resource TypeSerializer/TypeDeserializer and pydantic validation of every returned item.
+    """
+
+    def _get_db_client(self) -> DynamoDBClient:
+        return get_client('dynamodb')
+
+    def _get_batch_client(self) -> DynamoDBClient:
+        return self._get_db_client()
+
+    def _to_item(self, entry: OrderEntry) -> Dict[str, Any]:
+        return order_to_item(entry)
+
+    def _from_item(self, item: Dict[str, Any]) -> OrderEntry:
+        return order_from_item(item)
+
+    def _key(self, order_id: str) -> Dict[str, Any]:
+        return order_key(order_id)
+
+    def _encode_values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        return encode_values(values)
+
+    def _decode_values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        return decode_values(values)
+
+    @adaptive_tracer.capture_method
+    def create_order_in_db(self, customer_name: str, order_item_count: int, outbox_table_name: Optional[str] = None) -> OrderEntry:
+        order_id = str(uuid.uuid4())
+        logger.info('trying to save order', extra={'order_id': order_id})
+        try:
+            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            if outbox_table_name is None:
+                client: DynamoDBClient = self._get_db_client()
+                client.put_item(TableName=self.table_name, Item=order_to_item(entry))
+            else:
+                self._transact_create_order(entry, outbox_table_name)
+        except (ClientError, ValidationError) as exc:
+            error_msg = 'failed to create order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create order', extra={'order_id': order_id, 'order_item_count': order_item_count, 'customer_name': customer_name})
+        return entry
+
+    @adaptive_tracer.capture_method
+    def delete_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        logger.info('trying to delete order', extra={'order_id': order_id})
+        try:
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            client: DynamoDBClient = self._get_db_client()
+            response = client.delete_item(TableName=self.table_name, Key=order_key(order_id), ReturnValues='ALL_OLD')
+            lazy_logger.debug('DELETE order ddb Response', extra={'response': response})
+            if 'Attributes' not in response:
+                logger.info(f'Order {order_id} not found')
+                return None
+            rec = order_from_item(response['Attributes'])
+        except (ClientError, KeyError, ValueError) as exc:
+            error_msg = 'failed to delete order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished delete order', extra={'order_id': order_id})
+        return rec
+
+    @adaptive_tracer.capture_method
+    def get_order_in_db(self, order_id: str) -> Optional[OrderEntry]:  # type: ignore[override]
+        logger.info('trying to retrieve order', extra={'order_id': order_id})
+        try:
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            client: DynamoDBClient = self._get_db_client()
+            response = client.get_item(TableName=self.table_name, Key=order_key(order_id))
+            lazy_logger.debug('GET order ddb Response', extra={'response': response})
+            if 'Item' in response:
+                rec = order_from_item(response['Item'])
+                logger.info('finished get order', extra={
+                    'order_id': rec.order_id,
+                    'order_item_count': rec.order_item_count,
+                    'customer_name': rec.customer_name
+                })
+            else:
+                logger.info(f'Order {order_id} not found')
+                rec = None
+
+        except (ClientError, KeyError, ValueError) as exc:
+            error_msg = 'failed to get order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        return rec
+
 
 @lru_cache
 def get_dal_handler(table_name: str) -> OrdersDalHandler:
-    return DynamoOrdersDalHandler(table_name)
+    settings: DynamoDal = get_environment_variables(model=DynamoDal)
+    handler_class = DynamoClientOrdersDalHandler if settings.DYNAMODB_DAL_MODE == 'client' else DynamoOrdersDalHandler
+    dal_handler = handler_class(table_name)
+    cache = build_read_through_cache(name='Orders')
+    return dal_handler if cache is None else CachedOrdersDalHandler(dal_handler, cache)
@@ -1,31 +1,39 @@
+from __future__ import annotations
+
 import uuid
 from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
-import boto3
+from aws_lambda_env_modeler import get_environment_variables
 from botocore.exceptions import ClientError
-from cachetools import TTLCache, cached
-from mypy_boto3_dynamodb import DynamoDBServiceResource
-from mypy_boto3_dynamodb.service_resource import Table
 from pydantic import ValidationError
 
-from service.dal.schemas.users_db import UserBase, UserEntry
+from service.dal.cached_users_dal_handler import CachedUsersDalHandler
+from service.dal.dynamo_codec import NEW_USER_CONDITION, condition_failed_item, user_from_item, user_key, user_to_item
+from service.dal.read_through_cache import build_read_through_cache
+from service.dal.schemas.users_db import UserBase, UserCreateResult, UserEntry
 from service.dal.users_db_handler import UsersDalHandler
-from service.handlers.utils.observability import logger, tracer
+from service.handlers.schemas.env_vars import DynamoDal
+from service.handlers.utils.aws_clients import get_client, get_resource
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger
 from service.schemas.exceptions import InternalServerException
 
+if TYPE_CHECKING:  # the stubs only matter to mypy, importing them costs ~40ms of cold start
+    from mypy_boto3_dynamodb import DynamoDBClient, DynamoDBServiceResource
+    from mypy_boto3_dynamodb.service_resource import Table
+
 
 class DynamoUsersDalHandler(UsersDalHandler):
 
     def __init__(self, table_name: str):
         self.table_name = table_name
 
-    # cache dynamodb connection data for no longer than 5 minutes
-    @cached(cache=TTLCache(maxsize=1, ttl=300))
     def _get_db_handler(self) -> Table:
-        dynamodb: DynamoDBServiceResource = boto3.resource('dynamodb')
+        # the resource and its connection pool are shared for the life of the container
+        dynamodb: DynamoDBServiceResource = get_resource('dynamodb')
         return dynamodb.Table(self.table_name)
 
-    @tracer.capture_method(capture_response=False)
+    @adaptive_tracer.capture_method
     def create_user_in_db(self, user_name: str, email: str) -> UserEntry:
         user_id = str(uuid.uuid4())
         logger.info('trying to save user', extra={'user_id': user_id})
@@ -42,8 +50,35 @@ class DynamoUsersDalHandler(UsersDalHandler):
         logger.info('finished create user', extra={'user_id': user_id, 'user_name': user_name, 'email': email})
         return entry
 
-    @tracer.capture_method(capture_response=False)
-    def delete_user_in_db(self, user_id: str) -> UserBase:
+    def _put_new_user(self, entry: UserEntry) -> None:
+        table: Table = self._get_db_handler()
+        table.put_item(Item=entry.model_dump(), **NEW_USER_CONDITION)
+
+    @adaptive_tracer.capture_method
+    def create_user_with_id_in_db(self, user_id: str, user_name: str, email: str) -> UserCreateResult:
+        logger.info('trying to save user with id', extra={'user_id': user_id})
+        try:
+            entry = UserEntry(user_id=user_id, user_name=user_name, email=email)
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            self._put_new_user(entry)
+        except ClientError as exc:
+            existing = condition_failed_item(exc)
+            if existing is None:
+                error_msg = 'failed to create user'
+                logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+                raise InternalServerException(error_msg) from exc
+            logger.info('user already exists', extra={'user_id': user_id})
+            return UserCreateResult.model_construct(entry=user_from_item(existing), created=False)
+        except ValidationError as exc:
+            error_msg = 'failed to create user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create user', extra={'user_id': user_id, 'user_name': user_name, 'email': email})
+        return UserCreateResult.model_construct(entry=entry, created=True)
+
+    @adaptive_tracer.capture_method
+    def delete_user_in_db(self, user_id: str) -> Optional[UserEntry]:
         logger.info('trying to delete user', extra={'user_id': user_id})
         try:
             entry = UserBase(user_id=user_id)
@@ -51,10 +86,14 @@ class DynamoUsersDalHandler(UsersDalHandler):
             table: Table = self._get_db_handler()
 
             key = entry.model_dump()
-            logger.debug('DDB user Key', extra={'key': key})
-            response = table.delete_item(Key=key)
-            logger.debug('DELETE user ddb Response', extra={'response': response})
-            rec = UserBase(user_id=user_id)
+            lazy_logger.debug('DDB user Key', extra={'key': key})
+            # the old item comes back in the same round trip, no GET needed to know what was deleted
+            response = table.delete_item(Key=key, ReturnValues='ALL_OLD')
+            lazy_logger.debug('DELETE user ddb Response', extra={'response': response})
+            if 'Attributes' not in response:
+                logger.info(f'user {user_id} not found')
+                return None
+            rec = UserEntry.model_validate(response['Attributes'])
 
         except (ClientError, ValidationError) as exc:
             error_msg = 'failed to delete user'
@@ -64,7 +103,7 @@ class DynamoUsersDalHandler(UsersDalHandler):
         logger.info('finished delete user', extra={'user_id': user_id})
         return rec
 
-    @tracer.capture_method(capture_response=False)
+    @adaptive_tracer.capture_method
     def get_user_in_db(self, user_id: str) -> UserEntry:
         logger.info('trying to retrieve user', extra={'user_id': user_id})
         try:
@@ -72,11 +111,11 @@ class DynamoUsersDalHandler(UsersDalHandler):
             logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
             table: Table = self._get_db_handler()
             key = entry.model_dump()
-            logger.debug('DDB user Key', extra={'key': key})
+            lazy_logger.debug('DDB user Key', extra={'key': key})
             response = table.get_item(Key=key)
-            logger.debug('GET user ddb Response', extra={'response': response})
+            lazy_logger.debug('GET user ddb Response', extra={'response': response})
             if 'Item' in response:
-                logger.debug('GET user ddb Response.Item', extra={'item': response['Item']})
+                lazy_logger.debug('GET user ddb Response.Item', extra={'item': response['Item']})
                 rec = UserEntry.model_validate(response['Item'])
                 logger.info('finished get user', extra={'user_id': rec.user_id, 'email': rec.email, 'customer_name': rec.user_name})
             else:
@@ -91,6 +130,84 @@ class DynamoUsersDalHandler(UsersDalHandler):
         return rec
 
 
+class DynamoClientUsersDalHandler(DynamoUsersDalHandler):
+    """ same table and behaviour as DynamoUsersDalHandler on the low-level client
+
+        Items are converted to and from DynamoDB wire JSON by the hand specialised codec in service.dal.dynamo_codec
+        instead of the resource TypeSerializer/TypeDeserializer and pydantic validation of every returned item.
+    """
+
+    def _get_db_client(self) -> DynamoDBClient:
+        return get_client('dynamodb')
+
+    @adaptive_tracer.capture_method
+    def create_user_in_db(self, user_name: str, email: str) -> UserEntry:
+        user_id = str(uuid.uuid4())
+        logger.info('trying to save user', extra={'user_id': user_id})
+        try:
+            entry = UserEntry(user_id=user_id, user_name=user_name, email=email)
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            client: DynamoDBClient = self._get_db_client()
+            client.put_item(TableName=self.table_name, Item=user_to_item(entry))
+        except (ClientError, ValidationError) as exc:
+            error_msg = 'failed to create user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create user', extra={'user_id': user_id, 'user_name': user_name, 'email': email})
+        return entry
+
+    def _put_new_user(self, entry: UserEntry) -> None:
+        client: DynamoDBClient = self._get_db_client()
+        client.put_item(TableName=self.table_name, Item=user_to_item(entry), **NEW_USER_CONDITION)
+
+    @adaptive_tracer.capture_method
+    def delete_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        logger.info('trying to delete user', extra={'user_id': user_id})
+        try:
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            client: DynamoDBClient = self._get_db_client()
+            response = client.delete_item(TableName=self.table_name, Key=user_key(user_id), ReturnValues='ALL_OLD')
+            lazy_logger.debug('DELETE user ddb Response', extra={'response': response})
+            if 'Attributes' not in response:
+                logger.info(f'user {user_id} not found')
+                return None
+            rec = user_from_item(response['Attributes'])
+        except (ClientError, KeyError) as exc:
+            error_msg = 'failed to delete user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_id': user_id})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished delete user', extra={'user_id': user_id})
+        return rec
+
+    @adaptive_tracer.capture_method
+    def get_user_in_db(self, user_id: str) -> Optional[UserEntry]:  # type: ignore[override]
+        logger.info('trying to retrieve user', extra={'user_id': user_id})
+        try:
+            logger.info('opening connection to dynamodb table', extra={'table_name': self.table_name})
+            client: DynamoDBClient = self._get_db_client()
+            response = client.get_item(TableName=self.table_name, Key=user_key(user_id))
+            lazy_logger.debug('GET user ddb Response', extra={'response': response})
+            if 'Item' in response:
+                rec = user_from_item(response['Item'])
+                logger.info('finished get user', extra={'user_id': rec.user_id, 'email': rec.email, 'customer_name': rec.user_name})
+            else:
+                logger.info(f'user {user_id} not found')
+                rec = None
+
+        except (ClientError, KeyError, ValueError) as exc:
+            error_msg = 'failed to get user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_id': user_id})
+            raise InternalServerException(error_msg) from exc
+
+        return rec
+
+
 @lru_cache
 def get_dal_handler(table_name: str) -> UsersDalHandler:
-    return DynamoUsersDalHandler(table_name)
+    settings: DynamoDal = get_environment_variables(model=DynamoDal)
+    handler_class = DynamoClientUsersDalHandler if settings.DYNAMODB_DAL_MODE == 'client' else DynamoUsersDalHandler
+    dal_handler = handler_class(table_name)
+    cache = build_read_through_cache(name='Users')
+    return dal_handler if cache is None else CachedUsersDalHandler(dal_handler, cache)
@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from aws_lambda_env_modeler import get_environment_variables
+
+from service.dal import dynamo_orders_dal_handler, dynamo_users_dal_handler
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.users_db_handler import UsersDalHandler
+from service.handlers.schemas.env_vars import DalBackend
+
+# the memory and sqlite backends are imported by the branch that selects them, deployed lambdas only load the dynamodb ones
+
+
+@lru_cache
+def get_orders_dal_handler(table_name: str) -> OrdersDalHandler:
+    """ orders DAL handler of the backend selected by the DAL_BACKEND environment variable """
+    settings: DalBackend = get_environment_variables(model=DalBackend)
+    if settings.DAL_BACKEND == 'memory':
+        from service.dal.memory_orders_dal_handler import MemoryOrdersDalHandler
+        return MemoryOrdersDalHandler(table_name)
+    if settings.DAL_BACKEND == 'sqlite':
+        from service.dal.sqlite_connections import get_sqlite_connections
+        from service.dal.sqlite_orders_dal_handler import SqliteOrdersDalHandler
+        return SqliteOrdersDalHandler(table_name, get_sqlite_connections(settings.SQLITE_DB_PATH))
+    return dynamo_orders_dal_handler.get_dal_handler(table_name)
+
+
+@lru_cache
+def get_users_dal_handler(table_name: str) -> UsersDalHandler:
+    """ users DAL handler of the backend selected by the DAL_BACKEND environment variable """
+    settings: DalBackend = get_environment_variables(model=DalBackend)
+    if settings.DAL_BACKEND == 'memory':
+        from service.dal.memory_users_dal_handler import MemoryUsersDalHandler
+        return MemoryUsersDalHandler(table_name)
+    if settings.DAL_BACKEND == 'sqlite':
+        from service.dal.sqlite_connections import get_sqlite_connections
+        from service.dal.sqlite_users_dal_handler import SqliteUsersDalHandler
+        return SqliteUsersDalHandler(table_name, get_sqlite_connections(settings.SQLITE_DB_PATH))
+    return dynamo_users_dal_handler.get_dal_handler(table_name)
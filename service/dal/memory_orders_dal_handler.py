@@ -0,0 +1,120 @@
+import threading
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from service.dal.batch_utils import unique
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.pagination import epoch_ms_now, iterate_pages
+from service.dal.schemas.orders_db import OrderBatchWriteResult, OrderChanges, OrderCreateResult, OrderEntry, OrdersBatchGetResult, OrdersPage
+from service.handlers.utils.observability import logger
+from service.schemas.cursor import decode_order_cursor, encode_order_cursor
+from service.schemas.exceptions import InternalServerException
+
+
+class MemoryOrdersDalHandler(OrdersDalHandler):
+    """ thread safe in-process orders store with the DynamoDB handler semantics, for benchmarks and local load tests
+
+        Nothing is persisted, the orders live as long as the process.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self._orders: Dict[str, OrderEntry] = {}
+        self._lock = threading.RLock()
+
+    def create_order_in_db(self, customer_name: str, order_item_count: int, outbox_table_name: Optional[str] = None) -> OrderEntry:
+        if outbox_table_name is not None:
+            error_msg = 'the transactional outbox needs the dynamodb backend'
+            logger.error(error_msg, extra={'outbox_table_name': outbox_table_name})
+            raise InternalServerException(error_msg)
+        try:
+            entry = OrderEntry(order_id=str(uuid.uuid4()), customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
+        except ValidationError as exc:
+            error_msg = 'failed to create order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+        with self._lock:
+            self._orders[entry.order_id] = entry
+        return entry
+
+    def create_order_with_id_in_db(self, order_id: str, customer_name: str, order_item_count: int,
+                                   outbox_table_name: Optional[str] = None) -> OrderCreateResult:
+        if outbox_table_name is not None:
+            error_msg = 'the transactional outbox needs the dynamodb backend'
+            logger.error(error_msg, extra={'outbox_table_name': outbox_table_name})
+            raise InternalServerException(error_msg)
+        try:
+            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
+        except ValidationError as exc:
+            error_msg = 'failed to create order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+        with self._lock:
+            stored = self._orders.setdefault(order_id, entry)
+        return OrderCreateResult(entry=stored, created=stored is entry)
+
+    def create_orders_in_db(self, orders: Sequence[Tuple[str, int]]) -> List[OrderBatchWriteResult]:
+        try:
+            created_at = epoch_ms_now()  # one creation time for the whole batch
+            entries = [
+                OrderEntry(order_id=str(uuid.uuid4()), customer_name=customer_name, order_item_count=order_item_count, created_at=created_at)
+                for customer_name, order_item_count in orders
+            ]
+        except ValidationError as exc:
+            error_msg = 'failed to create orders batch'
+            logger.exception(error_msg, extra={'exception': str(exc)})
+            raise InternalServerException(error_msg) from exc
+        with self._lock:
+            self._orders.update((entry.order_id, entry) for entry in entries)
+        return [OrderBatchWriteResult(entry=entry, created=True) for entry in entries]
+
+    def update_order_in_db(self, order_id: str, customer_name: Optional[str] = None,
+                           order_item_count: Optional[int] = None) -> Optional[OrderChanges]:
+        try:
+            rec = OrderChanges(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count)
+        except ValidationError as exc:
+            error_msg = 'failed to update order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+        with self._lock:
+            entry = self._orders.get(order_id)
+            if entry is None:
+                return None
+            self._orders[order_id] = entry.model_copy(update=rec.changes())
+        return rec
+
+    def delete_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        with self._lock:
+            return self._orders.pop(order_id, None)
+
+    def get_order_in_db(self, order_id: str) -> Optional[OrderEntry]:  # type: ignore[override]
+        with self._lock:
+            return self._orders.get(order_id)
+
+    def get_orders_in_db(self, order_ids: Sequence[str]) -> OrdersBatchGetResult:
+        order_ids = unique(order_ids)
+        with self._lock:
+            items = {order_id: self._orders[order_id] for order_id in order_ids if order_id in self._orders}
+        return OrdersBatchGetResult(
+            found=[items[order_id] for order_id in order_ids if order_id in items],
+            missing_order_ids=[order_id for order_id in order_ids if order_id not in items],
+        )
+
+    def list_orders_by_customer(self, customer_name: str, page_size: int, cursor: Optional[str] = None,
+                                prefetch: bool = True) -> Iterator[OrdersPage]:
+        return iterate_pages(lambda page_cursor: self._orders_page(customer_name, page_size, page_cursor), cursor, prefetch)
+
+    def _orders_page(self, customer_name: str, page_size: int, cursor: Optional[str]) -> OrdersPage:
+        start = None if cursor is None else decode_order_cursor(cursor)
+        with self._lock:
+            orders = [entry for entry in self._orders.values() if entry.customer_name == customer_name]
+        # newest first, the order id gives orders created in the same millisecond a stable cursor position
+        orders.sort(key=lambda entry: (entry.created_at or 0, entry.order_id), reverse=True)
+        if start is not None:
+            orders = [entry for entry in orders if (entry.created_at or 0, entry.order_id) < start]
+        page = orders[:page_size]
+        if len(orders) <= page_size:
+            return OrdersPage(orders=page)
+        return OrdersPage(orders=page, cursor=encode_order_cursor(page[-1].created_at or 0, page[-1].order_id))
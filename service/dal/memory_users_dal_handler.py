@@ -0,0 +1,52 @@
+import threading
+import uuid
+from typing import Dict, Optional
+
+from pydantic import ValidationError
+
+from service.dal.schemas.users_db import UserCreateResult, UserEntry
+from service.dal.users_db_handler import UsersDalHandler
+from service.handlers.utils.observability import logger
+from service.schemas.exceptions import InternalServerException
+
+
+class MemoryUsersDalHandler(UsersDalHandler):
+    """ thread safe in-process users store with the DynamoDB handler semantics, for benchmarks and local load tests
+
+        Nothing is persisted, the users live as long as the process.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self._users: Dict[str, UserEntry] = {}
+        self._lock = threading.RLock()
+
+    def create_user_in_db(self, user_name: str, email: str) -> UserEntry:
+        try:
+            entry = UserEntry(user_id=str(uuid.uuid4()), user_name=user_name, email=email)
+        except ValidationError as exc:
+            error_msg = 'failed to create user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+            raise InternalServerException(error_msg) from exc
+        with self._lock:
+            self._users[entry.user_id] = entry
+        return entry
+
+    def create_user_with_id_in_db(self, user_id: str, user_name: str, email: str) -> UserCreateResult:
+        try:
+            entry = UserEntry(user_id=user_id, user_name=user_name, email=email)
+        except ValidationError as exc:
+            error_msg = 'failed to create user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+            raise InternalServerException(error_msg) from exc
+        with self._lock:
+            stored = self._users.setdefault(user_id, entry)
+        return UserCreateResult.model_construct(entry=stored, created=stored is entry)
+
+    def delete_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        with self._lock:
+            return self._users.pop(user_id, None)
+
+    def get_user_in_db(self, user_id: str) -> Optional[UserEntry]:  # type: ignore[override]
+        with self._lock:
+            return self._users.get(user_id)
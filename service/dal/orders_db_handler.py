@@ -1,6 +1,7 @@
 from abc import ABC, ABCMeta, abstractmethod
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
 
-from service.dal.schemas.orders_db import OrderBase, OrderEntry
+from service.dal.schemas.orders_db import OrderBatchWriteResult, OrderChanges, OrderCreateResult, OrderEntry, OrdersBatchGetResult, OrdersPage
 
 
 class _SingletonMeta(ABCMeta):
@@ -15,13 +16,94 @@ class _SingletonMeta(ABCMeta):
 class OrdersDalHandler(ABC, metaclass=_SingletonMeta):
 
     @abstractmethod
-    def create_order_in_db(self, customer_name: str, order_item_count: int) -> OrderEntry:
+    def create_order_in_db(self, customer_name: str, order_item_count: int, outbox_table_name: Optional[str] = None) -> OrderEntry:
+        """ with outbox_table_name the order and its OrderCreated outbox record are written in one transaction, see service.dal.outbox
+
+            Raises:
+                InternalServerException: the backend has no outbox support
+        """
+        ...  # pragma: no cover
+
+    @abstractmethod
+    def create_order_with_id_in_db(self, order_id: str, customer_name: str, order_item_count: int,
+                                   outbox_table_name: Optional[str] = None) -> OrderCreateResult:
+        """ create_order_in_db with a caller chosen id in one conditional write, an existing order with the id is returned instead
+
+            Retries of a request carrying the same idempotency key derive the same id and create the order once.
+        """
+        ...  # pragma: no cover
+
+    @abstractmethod
+    def create_orders_in_db(self, orders: Sequence[Tuple[str, int]]) -> List[OrderBatchWriteResult]:
+        """ orders are (customer_name, order_item_count) pairs, results are returned in the same order """
+        ...  # pragma: no cover
+
+    @abstractmethod
+    def update_order_in_db(self, order_id: str, customer_name: Optional[str] = None,
+                           order_item_count: Optional[int] = None) -> Optional[OrderChanges]:
+        """ write only the given attributes of an existing order, returns the updated attributes or None when the order does not exist """
         ...  # pragma: no cover
 
     @abstractmethod
-    def delete_order_in_db(self, order_id: str) -> OrderBase:
+    def delete_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        """ returns the deleted order, None when there was no such order """
         ...  # pragma: no cover
 
     @abstractmethod
     def get_order_in_db(self, order_id: str) -> OrderEntry:
         ...  # pragma: no cover
+
+    @abstractmethod
+    def get_orders_in_db(self, order_ids: Sequence[str]) -> OrdersBatchGetResult:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    def list_orders_by_customer(self, customer_name: str, page_size: int, cursor: Optional[str] = None,
+                                prefetch: bool = True) -> Iterator[OrdersPage]:
+        """ pages of the customer orders newest first, starting after cursor, the next page is fetched in the background with prefetch
+
+            Raises:
+                ValueError: the cursor is malformed, raised by the first next()
+        """
+        ...  # pragma: no cover
+
+
+class AsyncOrdersDalHandler(ABC):
+    """ asyncio counterpart of OrdersDalHandler, not a singleton since its client is bound to an event loop """
+
+    @abstractmethod
+    async def create_order_in_db(self, customer_name: str, order_item_count: int, outbox_table_name: Optional[str] = None) -> OrderEntry:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def create_order_with_id_in_db(self, order_id: str, customer_name: str, order_item_count: int,
+                                         outbox_table_name: Optional[str] = None) -> OrderCreateResult:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def create_orders_in_db(self, orders: Sequence[Tuple[str, int]]) -> List[OrderBatchWriteResult]:
+        """ orders are (customer_name, order_item_count) pairs, results are returned in the same order """
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def update_order_in_db(self, order_id: str, customer_name: Optional[str] = None,
+                                 order_item_count: Optional[int] = None) -> Optional[OrderChanges]:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def delete_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def get_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def get_orders_in_db(self, order_ids: Sequence[str]) -> OrdersBatchGetResult:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    def list_orders_by_customer(self, customer_name: str, page_size: int, cursor: Optional[str] = None,
+                                prefetch: bool = True) -> AsyncIterator[OrdersPage]:
+        """ async generator of the customer orders pages, see OrdersDalHandler.list_orders_by_customer """
+        ...  # pragma: no cover
@@ -0,0 +1,21 @@
+""" transactional outbox for OrderCreated events
+
+An order and its outbox record are written in one DynamoDB transaction, so an event exists exactly when the order does.
+The outbox table stream triggers service.handlers.outbox_relay, which publishes the events to SNS off the request path.
+"""
+import time
+
+from service.dal.schemas.orders_db import OrderEntry
+from service.dal.schemas.outbox_db import OrderCreatedOutboxRecord
+
+OUTBOX_TTL_SECONDS = 24 * 60 * 60
+
+
+def order_created_record(entry: OrderEntry) -> OrderCreatedOutboxRecord:
+    return OrderCreatedOutboxRecord(
+        event_id=f'OrderCreated#{entry.order_id}',
+        order_id=entry.order_id,
+        customer_name=entry.customer_name,
+        order_item_count=entry.order_item_count,
+        expiration=int(time.time()) + OUTBOX_TTL_SECONDS,
+    )
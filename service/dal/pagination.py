@@ -0,0 +1,35 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+from service.dal.schemas.orders_db import OrdersPage
+
+
+def epoch_ms_now() -> int:
+    """ creation time of new orders, the sort key of the orders by customer listing """
+    return time.time_ns() // 1_000_000
+
+
+def iterate_pages(fetch_page: Callable[[Optional[str]], OrdersPage], cursor: Optional[str], prefetch: bool) -> Iterator[OrdersPage]:
+    """ yield pages starting at cursor until a page without a cursor
+
+        With prefetch the next page is requested on a background thread as soon as the current page is known,
+        so its round trip overlaps with the caller's work on the current page.
+    """
+    if not prefetch:
+        while True:
+            page = fetch_page(cursor)
+            yield page
+            if page.cursor is None:
+                return
+            cursor = page.cursor
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='orders-prefetch') as executor:
+        future = executor.submit(fetch_page, cursor)
+        while True:
+            page = future.result()
+            if page.cursor is not None:
+                future = executor.submit(fetch_page, page.cursor)
+            yield page
+            if page.cursor is None:
+                return
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from aws_lambda_env_modeler import get_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
+from cachetools import TTLCache
+
+from service.handlers.schemas.env_vars import DalCache
+from service.handlers.utils.observability import lazy_logger, metrics
+
+T = TypeVar('T')
+
+
+class ReadThroughCache(Generic[T]):
+    """ bounded LRU + TTL cache of DAL entries that lives as long as the container
+
+        Entries that were looked up and not found are cached separately with a shorter TTL so a hot missing id
+        does not hit the database on every call. Hits and misses are emitted as '{name}CacheHit' and '{name}CacheMiss' metrics.
+    """
+
+    def __init__(self, name: str, max_items: int, ttl_seconds: float, negative_ttl_seconds: float, timer: Callable[[],
+                                                                                                                   float] = time.monotonic) -> None:
+        self.name = name
+        self._entries: TTLCache = TTLCache(maxsize=max_items, ttl=ttl_seconds, timer=timer)
+        self._missing: TTLCache = TTLCache(maxsize=max_items, ttl=negative_ttl_seconds, timer=timer)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Optional[T]]:
+        """ Returns (True, entry) on a hit, (True, None) on a cached miss and (False, None) when the key is not cached """
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None or key in self._missing
+        self.record(hits=int(hit), misses=int(not hit))
+        return hit, entry
+
+    def get_many(self, keys: Sequence[str]) -> Tuple[Dict[str, T], List[str], List[str]]:
+        """ Returns (cached entries by key, keys cached as missing, keys not cached) """
+        found: Dict[str, T] = {}
+        missing: List[str] = []
+        not_cached: List[str] = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    found[key] = entry
+                elif key in self._missing:
+                    missing.append(key)
+                else:
+                    not_cached.append(key)
+        self.record(hits=len(found) + len(missing), misses=len(not_cached))
+        return found, missing, not_cached
+
+    def put(self, key: str, entry: T) -> None:
+        with self._lock:
+            self._missing.pop(key, None)
+            self._entries[key] = entry
+
+    def put_missing(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._missing[key] = True
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._missing.pop(key, None)
+
+    def record(self, hits: int, misses: int) -> None:
+        if hits:
+            metrics.add_metric(name=f'{self.name}CacheHit', unit=MetricUnit.Count, value=hits)
+        if misses:
+            metrics.add_metric(name=f'{self.name}CacheMiss', unit=MetricUnit.Count, value=misses)
+
+
+def build_read_through_cache(name: str) -> Optional[ReadThroughCache]:
+    """ build a cache from the DAL_CACHE_* environment variables, returns None when caching is disabled """
+    settings: DalCache = get_environment_variables(model=DalCache)
+    if not settings.DAL_CACHE_MAX_ITEMS:
+        return None
+    lazy_logger.debug('DAL read-through cache enabled', extra={'cache': name, **settings.model_dump()})
+    return ReadThroughCache(
+        name=name,
+        max_items=settings.DAL_CACHE_MAX_ITEMS,
+        ttl_seconds=settings.DAL_CACHE_TTL_SECONDS,
+        negative_ttl_seconds=settings.DAL_CACHE_NEGATIVE_TTL_SECONDS,
+    )
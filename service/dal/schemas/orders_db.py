@@ -1,7 +1,7 @@
-from typing import Annotated
+from typing import Annotated, Any, Dict, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, PositiveInt, field_validator
+from pydantic import BaseModel, Field, PositiveInt, field_validator, model_validator
 
 
 class OrderBase(BaseModel):
@@ -19,3 +19,40 @@ class OrderBase(BaseModel):
 class OrderEntry(OrderBase):
     order_item_count: PositiveInt
     customer_name: Annotated[str, Field(min_length=1, max_length=20)]
+    created_at: Optional[int] = None  # epoch milliseconds, sort key of the orders by customer index, missing on older orders
+
+
+class OrderChanges(OrderBase):
+    """ attributes of an existing order to update, fields left None are not changed """
+    customer_name: Optional[Annotated[str, Field(min_length=1, max_length=20)]] = None
+    order_item_count: Optional[PositiveInt] = None
+
+    @model_validator(mode='after')
+    def has_changes(self):
+        if not self.changes():
+            raise ValueError('at least one attribute must change')
+        return self
+
+    def changes(self) -> Dict[str, Any]:
+        """ changed attributes by name, without the key """
+        return self.model_dump(exclude={'order_id'}, exclude_none=True)
+
+
+class OrderBatchWriteResult(BaseModel):
+    entry: OrderEntry
+    created: bool  # False when the entry was still unprocessed after all retries
+
+
+class OrderCreateResult(BaseModel):
+    entry: OrderEntry
+    created: bool  # False when an order with the same id already existed, entry is that order
+
+
+class OrdersBatchGetResult(BaseModel):
+    found: List[OrderEntry]  # in the order of the requested ids
+    missing_order_ids: List[str]
+
+
+class OrdersPage(BaseModel):
+    orders: List[OrderEntry]  # newest first
+    cursor: Optional[str] = None  # opaque position after the last order, None on the last page
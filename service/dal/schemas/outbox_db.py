@@ -0,0 +1,12 @@
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, PositiveInt
+
+
+class OrderCreatedOutboxRecord(BaseModel):
+    event_id: str  # primary key, 'OrderCreated#<order_id>' so a replayed write cannot queue a second event
+    event_type: Literal['OrderCreated'] = 'OrderCreated'
+    order_id: str
+    customer_name: Annotated[str, Field(min_length=1, max_length=20)]
+    order_item_count: PositiveInt
+    expiration: int  # epoch seconds, the table TTL removes records once the relay had time to publish them
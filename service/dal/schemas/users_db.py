@@ -1,7 +1,7 @@
 from typing import Annotated
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 
 class UserBase(BaseModel):
@@ -17,5 +17,14 @@ class UserBase(BaseModel):
 
 
 class UserEntry(UserBase):
+    model_config = ConfigDict(defer_build=True)  # email_validator is imported on first validation, not with the dynamo codec
+
     user_name: Annotated[str, Field(min_length=1, max_length=20)]
     email: EmailStr
+
+
+class UserCreateResult(BaseModel):
+    model_config = ConfigDict(defer_build=True)  # like UserEntry, not built on import
+
+    entry: UserEntry
+    created: bool  # False when a user with the same id already existed, entry is that user
@@ -0,0 +1,49 @@
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import List
+
+
+class SqliteConnections:
+    """ one SQLite connection per thread to a single database file
+
+        Connections run in WAL mode, so readers never block the writer and a point read does not take a file lock.
+        Each connection keeps its own compiled statement cache, the handlers reuse constant SQL strings to hit it.
+        The database must be a file, an in-memory database is private to the connection that opened it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def get(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # connections never move between threads, check_same_thread is off only so close() can run anywhere
+            connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')  # durable across process crashes, WAL is synced at checkpoints
+            connection.execute('PRAGMA busy_timeout=5000')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+@lru_cache
+def get_sqlite_connections(path: str) -> SqliteConnections:
+    return SqliteConnections(path)
+
+
+def quote_identifier(name: str) -> str:
+    """ table names come from configuration, quote them since they can not be bound as statement parameters """
+    return '"' + name.replace('"', '""') + '"'
@@ -0,0 +1,236 @@
+import sqlite3
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from service.dal.batch_utils import chunks, unique
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.pagination import epoch_ms_now, iterate_pages
+from service.dal.schemas.orders_db import OrderBatchWriteResult, OrderChanges, OrderCreateResult, OrderEntry, OrdersBatchGetResult, OrdersPage
+from service.dal.sqlite_connections import SqliteConnections, quote_identifier
+from service.handlers.utils.observability import adaptive_tracer, logger
+from service.schemas.cursor import decode_order_cursor, encode_order_cursor
+from service.schemas.exceptions import InternalServerException
+
+SQLITE_MAX_BATCH_KEYS = 500  # below the SQLite bound parameters limit
+
+
+class SqliteOrdersDalHandler(OrdersDalHandler):
+    """ orders DAL on a local SQLite database for single node deployments, same behaviour as the DynamoDB handlers """
+
+    def __init__(self, table_name: str, connections: SqliteConnections):
+        self.table_name = table_name
+        self.connections = connections
+        table = quote_identifier(table_name)
+        columns = 'order_id, customer_name, order_item_count, created_at'
+        self._insert_sql = f'INSERT INTO {table} ({columns}) VALUES (?, ?, ?, ?)'
+        self._insert_new_sql = f'{self._insert_sql} ON CONFLICT (order_id) DO NOTHING'
+        self._delete_sql = f'DELETE FROM {table} WHERE order_id = ? RETURNING {columns}'  # RETURNING needs SQLite 3.35
+        self._update_sql = f'UPDATE {table} SET {{}} WHERE order_id = ?'  # SET list of the changed columns only
+        self._select_sql = f'SELECT {columns} FROM {table} WHERE order_id = ?'
+        self._select_many_sql = f'SELECT {columns} FROM {table} WHERE order_id IN ({{}})'
+        # newest first, the order id gives orders created in the same millisecond a stable cursor position
+        # orders of a table migrated from before created_at existed have none and are not listed, same as the sparse DynamoDB index
+        self._list_first_sql = (f'SELECT {columns} FROM {table} WHERE customer_name = ? AND created_at IS NOT NULL '
+                                'ORDER BY created_at DESC, order_id DESC LIMIT ?')
+        self._list_after_sql = (f'SELECT {columns} FROM {table} WHERE customer_name = ? AND (created_at, order_id) < (?, ?) '
+                                'ORDER BY created_at DESC, order_id DESC LIMIT ?')
+        with self.connections.get() as connection:
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {table} (order_id TEXT PRIMARY KEY, customer_name TEXT NOT NULL, '
+                               'order_item_count INTEGER NOT NULL, created_at INTEGER NOT NULL)')
+            self._migrate(connection)
+            connection.execute(f'CREATE INDEX IF NOT EXISTS {quote_identifier(table_name + "_customer_name_created_at")} ON {table} '
+                               '(customer_name, created_at, order_id)')
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        """ upgrade a table created before orders had a creation time, its existing orders keep a NULL created_at """
+        table = quote_identifier(self.table_name)
+        if 'created_at' not in {row[1] for row in connection.execute(f'PRAGMA table_info({table})')}:
+            logger.info('adding created_at to the orders table', extra={'table_name': self.table_name})
+            connection.execute(f'ALTER TABLE {table} ADD COLUMN created_at INTEGER')
+        # the customer_name index without the creation time, replaced by the customer_name_created_at index
+        connection.execute(f'DROP INDEX IF EXISTS {quote_identifier(self.table_name + "_customer_name")}')
+
+    @staticmethod
+    def _to_entry(row: Tuple[str, str, int, int]) -> OrderEntry:
+        # rows are written by this handler only, no need to validate them again
+        return OrderEntry.model_construct(order_id=row[0], customer_name=row[1], order_item_count=row[2], created_at=row[3])
+
+    @staticmethod
+    def _to_row(entry: OrderEntry) -> Tuple[Any, ...]:
+        return entry.order_id, entry.customer_name, entry.order_item_count, entry.created_at
+
+    @adaptive_tracer.capture_method
+    def create_order_in_db(self, customer_name: str, order_item_count: int, outbox_table_name: Optional[str] = None) -> OrderEntry:
+        if outbox_table_name is not None:
+            error_msg = 'the transactional outbox needs the dynamodb backend'
+            logger.error(error_msg, extra={'outbox_table_name': outbox_table_name})
+            raise InternalServerException(error_msg)
+        order_id = str(uuid.uuid4())
+        logger.info('trying to save order', extra={'order_id': order_id})
+        try:
+            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
+            with self.connections.get() as connection:
+                connection.execute(self._insert_sql, self._to_row(entry))
+        except (sqlite3.Error, ValidationError) as exc:
+            error_msg = 'failed to create order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create order', extra={'order_id': order_id, 'order_item_count': order_item_count, 'customer_name': customer_name})
+        return entry
+
+    @adaptive_tracer.capture_method
+    def create_order_with_id_in_db(self, order_id: str, customer_name: str, order_item_count: int,
+                                   outbox_table_name: Optional[str] = None) -> OrderCreateResult:
+        if outbox_table_name is not None:
+            error_msg = 'the transactional outbox needs the dynamodb backend'
+            logger.error(error_msg, extra={'outbox_table_name': outbox_table_name})
+            raise InternalServerException(error_msg)
+        logger.info('trying to save order with id', extra={'order_id': order_id})
+        try:
+            entry = OrderEntry(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count, created_at=epoch_ms_now())
+            with self.connections.get() as connection:
+                # the insert and the read of a conflicting order are one transaction
+                if connection.execute(self._insert_new_sql, self._to_row(entry)).rowcount:
+                    existing = None
+                else:
+                    existing = connection.execute(self._select_sql, (order_id,)).fetchone()
+        except (sqlite3.Error, ValidationError) as exc:
+            error_msg = 'failed to create order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        if existing is not None:
+            logger.info('order already exists', extra={'order_id': order_id})
+            return OrderCreateResult(entry=self._to_entry(existing), created=False)
+        logger.info('finished create order', extra={'order_id': order_id, 'order_item_count': order_item_count, 'customer_name': customer_name})
+        return OrderCreateResult(entry=entry, created=True)
+
+    @adaptive_tracer.capture_method
+    def create_orders_in_db(self, orders: Sequence[Tuple[str, int]]) -> List[OrderBatchWriteResult]:
+        logger.info('trying to save orders batch', extra={'order_count': len(orders)})
+        try:
+            created_at = epoch_ms_now()  # one creation time for the whole batch
+            entries = [
+                OrderEntry(order_id=str(uuid.uuid4()), customer_name=customer_name, order_item_count=order_item_count, created_at=created_at)
+                for customer_name, order_item_count in orders
+            ]
+        except ValidationError as exc:
+            error_msg = 'failed to create orders batch'
+            logger.exception(error_msg, extra={'exception': str(exc)})
+            raise InternalServerException(error_msg) from exc
+
+        created = True
+        try:
+            # a single transaction, the whole batch is written or none of it
+            with self.connections.get() as connection:
+                connection.executemany(self._insert_sql, [self._to_row(entry) for entry in entries])
+        except sqlite3.Error as exc:
+            logger.exception('failed to write orders batch', extra={'exception': str(exc)})
+            created = False
+
+        logger.info('finished create orders batch', extra={'order_count': len(entries), 'batch_created': created})
+        return [OrderBatchWriteResult(entry=entry, created=created) for entry in entries]
+
+    @adaptive_tracer.capture_method
+    def update_order_in_db(self, order_id: str, customer_name: Optional[str] = None,
+                           order_item_count: Optional[int] = None) -> Optional[OrderChanges]:
+        logger.info('trying to update order', extra={'order_id': order_id})
+        try:
+            rec = OrderChanges(order_id=order_id, customer_name=customer_name, order_item_count=order_item_count)
+            changes = rec.changes()
+            # column names come from the OrderChanges fields, never from the caller
+            sql = self._update_sql.format(', '.join(f'{column} = ?' for column in changes))
+            with self.connections.get() as connection:
+                updated = connection.execute(sql, (*changes.values(), order_id)).rowcount
+        except (sqlite3.Error, ValidationError) as exc:
+            error_msg = 'failed to update order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        if not updated:
+            logger.info(f'Order {order_id} not found')
+            return None
+        logger.info('finished update order', extra={'order_id': order_id, 'changes': changes})
+        return rec
+
+    @adaptive_tracer.capture_method
+    def delete_order_in_db(self, order_id: str) -> Optional[OrderEntry]:
+        logger.info('trying to delete order', extra={'order_id': order_id})
+        try:
+            with self.connections.get() as connection:
+                row = connection.execute(self._delete_sql, (order_id,)).fetchone()
+        except sqlite3.Error as exc:
+            error_msg = 'failed to delete order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        if row is None:
+            logger.info(f'Order {order_id} not found')
+            return None
+        logger.info('finished delete order', extra={'order_id': order_id})
+        return self._to_entry(row)
+
+    @adaptive_tracer.capture_method
+    def get_order_in_db(self, order_id: str) -> Optional[OrderEntry]:  # type: ignore[override]
+        logger.info('trying to retrieve order', extra={'order_id': order_id})
+        try:
+            row = self.connections.get().execute(self._select_sql, (order_id,)).fetchone()
+        except sqlite3.Error as exc:
+            error_msg = 'failed to get order'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_id': order_id})
+            raise InternalServerException(error_msg) from exc
+
+        if row is None:
+            logger.info(f'Order {order_id} not found')
+            return None
+        return self._to_entry(row)
+
+    @adaptive_tracer.capture_method
+    def get_orders_in_db(self, order_ids: Sequence[str]) -> OrdersBatchGetResult:
+        order_ids = unique(order_ids)
+        logger.info('trying to retrieve orders batch', extra={'order_count': len(order_ids)})
+        items: Dict[str, OrderEntry] = {}
+        try:
+            connection = self.connections.get()
+            for chunk in chunks(order_ids, SQLITE_MAX_BATCH_KEYS):
+                sql = self._select_many_sql.format(', '.join('?' * len(chunk)))
+                for row in connection.execute(sql, tuple(chunk)):
+                    items[row[0]] = self._to_entry(row)
+        except sqlite3.Error as exc:
+            error_msg = 'failed to get orders batch'
+            logger.exception(error_msg, extra={'exception': str(exc), 'order_count': len(order_ids)})
+            raise InternalServerException(error_msg) from exc
+
+        result = OrdersBatchGetResult(
+            found=[items[order_id] for order_id in order_ids if order_id in items],
+            missing_order_ids=[order_id for order_id in order_ids if order_id not in items],
+        )
+        logger.info('finished get orders batch', extra={'found_count': len(result.found), 'missing_count': len(result.missing_order_ids)})
+        return result
+
+    def list_orders_by_customer(self, customer_name: str, page_size: int, cursor: Optional[str] = None,
+                                prefetch: bool = True) -> Iterator[OrdersPage]:
+        logger.info('trying to list customer orders', extra={'customer_name': customer_name, 'page_size': page_size, 'prefetch': prefetch})
+        return iterate_pages(lambda page_cursor: self._orders_page(customer_name, page_size, page_cursor), cursor, prefetch)
+
+    def _orders_page(self, customer_name: str, page_size: int, cursor: Optional[str]) -> OrdersPage:
+        try:
+            connection = self.connections.get()
+            # one extra row tells whether there is a next page
+            if cursor is None:
+                rows = connection.execute(self._list_first_sql, (customer_name, page_size + 1)).fetchall()
+            else:
+                created_at, order_id = decode_order_cursor(cursor)
+                rows = connection.execute(self._list_after_sql, (customer_name, created_at, order_id, page_size + 1)).fetchall()
+        except sqlite3.Error as exc:
+            error_msg = 'failed to list customer orders'
+            logger.exception(error_msg, extra={'exception': str(exc), 'customer_name': customer_name})
+            raise InternalServerException(error_msg) from exc
+
+        orders = [self._to_entry(row) for row in rows[:page_size]]
+        if len(rows) <= page_size:
+            return OrdersPage(orders=orders)
+        return OrdersPage(orders=orders, cursor=encode_order_cursor(rows[page_size - 1][3], rows[page_size - 1][0]))
@@ -0,0 +1,98 @@
+import sqlite3
+import uuid
+from typing import Optional
+
+from pydantic import ValidationError
+
+from service.dal.schemas.users_db import UserCreateResult, UserEntry
+from service.dal.sqlite_connections import SqliteConnections, quote_identifier
+from service.dal.users_db_handler import UsersDalHandler
+from service.handlers.utils.observability import adaptive_tracer, logger
+from service.schemas.exceptions import InternalServerException
+
+
+class SqliteUsersDalHandler(UsersDalHandler):
+    """ users DAL on a local SQLite database for single node deployments, same behaviour as the DynamoDB handlers """
+
+    def __init__(self, table_name: str, connections: SqliteConnections):
+        self.table_name = table_name
+        self.connections = connections
+        table = quote_identifier(table_name)
+        self._insert_sql = f'INSERT INTO {table} (user_id, user_name, email) VALUES (?, ?, ?)'
+        self._insert_new_sql = f'{self._insert_sql} ON CONFLICT (user_id) DO NOTHING'
+        self._delete_sql = f'DELETE FROM {table} WHERE user_id = ? RETURNING user_id, user_name, email'  # RETURNING needs SQLite 3.35
+        self._select_sql = f'SELECT user_id, user_name, email FROM {table} WHERE user_id = ?'
+        with self.connections.get() as connection:
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {table} (user_id TEXT PRIMARY KEY, user_name TEXT NOT NULL, email TEXT NOT NULL)')
+
+    @adaptive_tracer.capture_method
+    def create_user_in_db(self, user_name: str, email: str) -> UserEntry:
+        user_id = str(uuid.uuid4())
+        logger.info('trying to save user', extra={'user_id': user_id})
+        try:
+            entry = UserEntry(user_id=user_id, user_name=user_name, email=email)
+            with self.connections.get() as connection:
+                connection.execute(self._insert_sql, (entry.user_id, entry.user_name, entry.email))
+        except (sqlite3.Error, ValidationError) as exc:
+            error_msg = 'failed to create user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+            raise InternalServerException(error_msg) from exc
+
+        logger.info('finished create user', extra={'user_id': user_id, 'user_name': user_name, 'email': email})
+        return entry
+
+    @adaptive_tracer.capture_method
+    def create_user_with_id_in_db(self, user_id: str, user_name: str, email: str) -> UserCreateResult:
+        logger.info('trying to save user with id', extra={'user_id': user_id})
+        try:
+            entry = UserEntry(user_id=user_id, user_name=user_name, email=email)
+            with self.connections.get() as connection:
+                # the insert and the read of a conflicting user are one transaction
+                if connection.execute(self._insert_new_sql, (entry.user_id, entry.user_name, entry.email)).rowcount:
+                    existing = None
+                else:
+                    existing = connection.execute(self._select_sql, (user_id,)).fetchone()
+        except (sqlite3.Error, ValidationError) as exc:
+            error_msg = 'failed to create user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_name': user_name})
+            raise InternalServerException(error_msg) from exc
+
+        if existing is not None:
+            logger.info('user already exists', extra={'user_id': user_id})
+            return UserCreateResult.model_construct(
+                entry=UserEntry.model_construct(user_id=existing[0], user_name=existing[1], email=existing[2]), created=False)
+        logger.info('finished create user', extra={'user_id': user_id, 'user_name': user_name, 'email': email})
+        return UserCreateResult.model_construct(entry=entry, created=True)
+
+    @adaptive_tracer.capture_method
+    def delete_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        logger.info('trying to delete user', extra={'user_id': user_id})
+        try:
+            with self.connections.get() as connection:
+                row = connection.execute(self._delete_sql, (user_id,)).fetchone()
+        except sqlite3.Error as exc:
+            error_msg = 'failed to delete user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_id': user_id})
+            raise InternalServerException(error_msg) from exc
+
+        if row is None:
+            logger.info(f'user {user_id} not found')
+            return None
+        logger.info('finished delete user', extra={'user_id': user_id})
+        return UserEntry.model_construct(user_id=row[0], user_name=row[1], email=row[2])
+
+    @adaptive_tracer.capture_method
+    def get_user_in_db(self, user_id: str) -> Optional[UserEntry]:  # type: ignore[override]
+        logger.info('trying to retrieve user', extra={'user_id': user_id})
+        try:
+            row = self.connections.get().execute(self._select_sql, (user_id,)).fetchone()
+        except sqlite3.Error as exc:
+            error_msg = 'failed to get user'
+            logger.exception(error_msg, extra={'exception': str(exc), 'user_id': user_id})
+            raise InternalServerException(error_msg) from exc
+
+        if row is None:
+            logger.info(f'user {user_id} not found')
+            return None
+        # rows are written by this handler only, no need to validate them again
+        return UserEntry.model_construct(user_id=row[0], user_name=row[1], email=row[2])
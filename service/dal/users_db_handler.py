@@ -1,6 +1,7 @@
 from abc import ABC, ABCMeta, abstractmethod
+from typing import Optional
 
-from service.dal.schemas.users_db import UserBase, UserEntry
+from service.dal.schemas.users_db import UserCreateResult, UserEntry
 
 
 class _SingletonMeta(ABCMeta):
@@ -19,9 +20,35 @@ class UsersDalHandler(ABC, metaclass=_SingletonMeta):
         ...  # pragma: no cover
 
     @abstractmethod
-    def delete_user_in_db(self, user_id: str) -> UserBase:
+    def create_user_with_id_in_db(self, user_id: str, user_name: str, email: str) -> UserCreateResult:
+        """ create_user_in_db with a caller chosen id in one conditional write, an existing user with the id is returned instead """
+        ...  # pragma: no cover
+
+    @abstractmethod
+    def delete_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        """ returns the deleted user, None when there was no such user """
         ...  # pragma: no cover
 
     @abstractmethod
     def get_user_in_db(self, user_id: str) -> UserEntry:
         ...  # pragma: no cover
+
+
+class AsyncUsersDalHandler(ABC):
+    """ asyncio counterpart of UsersDalHandler, not a singleton since its client is bound to an event loop """
+
+    @abstractmethod
+    async def create_user_in_db(self, user_name: str, email: str) -> UserEntry:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def create_user_with_id_in_db(self, user_id: str, user_name: str, email: str) -> UserCreateResult:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def delete_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        ...  # pragma: no cover
+
+    @abstractmethod
+    async def get_user_in_db(self, user_id: str) -> Optional[UserEntry]:
+        ...  # pragma: no cover
@@ -1,49 +1,51 @@
 from http import HTTPStatus
 from typing import Any, Dict
 
-import boto3
 from aws_lambda_env_modeler import get_environment_variables, init_environment_variables
 from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.feature_flags.exceptions import ConfigurationStoreError, SchemaValidationError
-from aws_lambda_powertools.utilities.idempotency import idempotent
-from aws_lambda_powertools.utilities.parser import ValidationError, parse
-from aws_lambda_powertools.utilities.parser.envelopes import ApiGatewayEnvelope
+from aws_lambda_powertools.utilities.parser import ValidationError
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from service.handlers.schemas.dynamic_configuration import MyConfiguration
 from service.handlers.schemas.env_vars import OrderCreateHandlerEnvVars
+from service.handlers.utils.apigw_parser import parse_body
+from service.handlers.utils.aws_clients import get_client
 from service.handlers.utils.dynamic_configuration import parse_configuration
-from service.handlers.utils.http_responses import build_response
-from service.handlers.utils.idempotency import IDEMPOTENCY_LAYER, IDEMPOTENCY_ORDERS_CONFIG
-from service.handlers.utils.observability import logger, metrics, tracer
+from service.handlers.utils.http_responses import build_model_response, build_response
+from service.handlers.utils.idempotency import IDEMPOTENCY_ORDERS_CONFIG, get_idempotency_key, idempotent_handler
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, metrics, stage_timer
+from service.handlers.utils.order_events import order_created_message, order_created_subject
 from service.logic.orders.handle_create_request import handle_create_request
-from service.schemas.exceptions import InternalServerException
+from service.schemas.exceptions import IdempotencyKeyReusedException, InternalServerException
 from service.schemas.input import CreateOrderRequest
 from service.schemas.output import CreateOrderOutput
 
-client = boto3.client('sns')
-
 
 @init_environment_variables(model=OrderCreateHandlerEnvVars)
 @metrics.log_metrics
-@idempotent(persistence_store=IDEMPOTENCY_LAYER, config=IDEMPOTENCY_ORDERS_CONFIG)
-@tracer.capture_lambda_handler(capture_response=False)
+@idempotent_handler(config=IDEMPOTENCY_ORDERS_CONFIG, model=CreateOrderRequest, key_mode=True)
+@adaptive_tracer.capture_lambda_handler
 def create_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     logger.set_correlation_id(context.aws_request_id)
 
     env_vars: OrderCreateHandlerEnvVars = get_environment_variables(model=OrderCreateHandlerEnvVars)
-    logger.debug('environment variables', extra=env_vars.model_dump())
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
 
     try:
-        my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
-        logger.debug('fetched dynamic configuration', extra={'configuration': my_configuration.model_dump()})
+        with stage_timer.stage('AppConfig'):
+            my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
+        lazy_logger.apply_settings(my_configuration.logging)
+        adaptive_tracer.apply_settings(my_configuration.tracing)
+        lazy_logger.debug('fetched dynamic configuration', extra=lambda: {'configuration': my_configuration.model_dump()})
     except (SchemaValidationError, ConfigurationStoreError) as exc:  # pragma: no cover
         logger.exception(f'dynamic configuration error, error={str(exc)}')
         return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
 
     try:
         # we want to extract and parse the HTTP body from the api gw envelope
-        create_input: CreateOrderRequest = parse(event=event, model=CreateOrderRequest, envelope=ApiGatewayEnvelope)
+        with stage_timer.stage('ParseEvent'):
+            create_input: CreateOrderRequest = parse_body(event=event, model=CreateOrderRequest)
         logger.info('got create order request', extra={'order_item_count': create_input.order_item_count})
     except (ValidationError, TypeError) as exc:
         logger.error('event failed input validation', extra={'error': str(exc)})
@@ -54,26 +56,28 @@ def create_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
         response: CreateOrderOutput = handle_create_request(
             order_request=create_input,
             table_name=env_vars.TABLE_NAME,
+            outbox_table_name=env_vars.OUTBOX_TABLE_NAME,
+            idempotency_key=get_idempotency_key(event),
         )
+    except IdempotencyKeyReusedException as exc:
+        logger.error('idempotency key reused', extra={'error': str(exc)})
+        return build_response(http_status=HTTPStatus.UNPROCESSABLE_ENTITY, body={})
     except InternalServerException:  # pragma: no cover
         logger.error('finished handling create order request with internal error')
         return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
 
     logger.info('finished handling create order request')
-    logger.info('sending order created event messages')
-
-    topic_arn = env_vars.ORDER_CREATED_TOPIC_ARN
-    _msg_order_created(topic_arn=topic_arn, created_order=response)
+    if env_vars.OUTBOX_TABLE_NAME is None:
+        logger.info('sending order created event messages')
+        _msg_order_created(topic_arn=env_vars.ORDER_CREATED_TOPIC_ARN, created_order=response)
 
-    return build_response(http_status=HTTPStatus.OK, body=response.model_dump())
+    return build_model_response(http_status=HTTPStatus.OK, model=response)
 
 
 def _msg_order_created(topic_arn: str, created_order: CreateOrderOutput):
-    msg = f"""
-Order Id: [{created_order.order_id}]
-Customer Name: [{created_order.customer_name}]
-Qty: [{created_order.order_item_count}]
-    """
-    client.publish(TopicArn=topic_arn, Subject=f'Order {created_order.order_id} created', Message=msg)
+    msg = order_created_message(created_order.order_id, created_order.customer_name, created_order.order_item_count)
+    # the shared client is created on the first publish, a create lambda that relays through the outbox never builds it
+    with stage_timer.stage('SnsPublish'):
+        get_client('sns').publish(TopicArn=topic_arn, Subject=order_created_subject(created_order.order_id), Message=msg)
 
     logger.info('finished messaging to topic')
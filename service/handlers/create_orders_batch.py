@@ -0,0 +1,76 @@
+from http import HTTPStatus
+from typing import Any, Dict
+
+from aws_lambda_env_modeler import get_environment_variables, init_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.feature_flags.exceptions import ConfigurationStoreError, SchemaValidationError
+from aws_lambda_powertools.utilities.parser import ValidationError
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from service.handlers.schemas.dynamic_configuration import MyConfiguration
+from service.handlers.schemas.env_vars import OrderCreateHandlerEnvVars
+from service.handlers.utils.apigw_parser import parse_body
+from service.handlers.utils.aws_clients import get_client
+from service.handlers.utils.dynamic_configuration import parse_configuration
+from service.handlers.utils.http_responses import build_model_response, build_response
+from service.handlers.utils.idempotency import IDEMPOTENCY_ORDERS_BATCH_CONFIG, idempotent_handler
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, metrics, stage_timer
+from service.handlers.utils.order_events import publish_orders_created
+from service.logic.orders.handle_create_batch_request import handle_create_batch_request
+from service.schemas.exceptions import InternalServerException
+from service.schemas.input import CreateOrdersBatchRequest
+from service.schemas.output import CreateOrdersBatchOutput
+
+
+@init_environment_variables(model=OrderCreateHandlerEnvVars)
+@metrics.log_metrics
+@idempotent_handler(config=IDEMPOTENCY_ORDERS_BATCH_CONFIG, model=CreateOrdersBatchRequest)
+@adaptive_tracer.capture_lambda_handler
+def create_orders_batch(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    logger.set_correlation_id(context.aws_request_id)
+
+    env_vars: OrderCreateHandlerEnvVars = get_environment_variables(model=OrderCreateHandlerEnvVars)
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
+
+    try:
+        with stage_timer.stage('AppConfig'):
+            my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
+        lazy_logger.apply_settings(my_configuration.logging)
+        adaptive_tracer.apply_settings(my_configuration.tracing)
+        lazy_logger.debug('fetched dynamic configuration', extra=lambda: {'configuration': my_configuration.model_dump()})
+    except (SchemaValidationError, ConfigurationStoreError) as exc:  # pragma: no cover
+        logger.exception(f'dynamic configuration error, error={str(exc)}')
+        return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
+
+    try:
+        # we want to extract and parse the HTTP body from the api gw envelope
+        with stage_timer.stage('ParseEvent'):
+            batch_input: CreateOrdersBatchRequest = parse_body(event=event, model=CreateOrdersBatchRequest)
+        logger.info('got create orders batch request', extra={'order_count': len(batch_input.orders)})
+    except (ValidationError, TypeError) as exc:
+        logger.error('event failed input validation', extra={'error': str(exc)})
+        return build_response(http_status=HTTPStatus.BAD_REQUEST, body={})
+
+    metrics.add_metric(name='ValidCreateOrdersBatchEvents', unit=MetricUnit.Count, value=1)
+    try:
+        response: CreateOrdersBatchOutput = handle_create_batch_request(
+            batch_request=batch_input,
+            table_name=env_vars.TABLE_NAME,
+        )
+    except InternalServerException:  # pragma: no cover
+        logger.error('finished handling create orders batch request with internal error')
+        return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
+
+    created_orders = [order.model_dump() for order in response.orders if order.created]
+    metrics.add_metric(name='BatchCreatedOrders', unit=MetricUnit.Count, value=len(created_orders))
+    metrics.add_metric(name='BatchFailedOrders', unit=MetricUnit.Count, value=len(response.orders) - len(created_orders))
+    logger.info('finished handling create orders batch request')
+    logger.info('sending order created event messages', extra={'order_count': len(created_orders)})
+
+    with stage_timer.stage('SnsPublish'):
+        failed_order_ids = publish_orders_created(client=get_client('sns'), topic_arn=env_vars.ORDER_CREATED_TOPIC_ARN, orders=created_orders)
+    # the orders are stored, failing the request would make a client retry write them again
+    if failed_order_ids:
+        metrics.add_metric(name='FailedOrderCreatedEvents', unit=MetricUnit.Count, value=len(failed_order_ids))
+
+    return build_model_response(http_status=HTTPStatus.OK, model=response)
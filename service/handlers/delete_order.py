@@ -1,18 +1,18 @@
 from http import HTTPStatus
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from aws_lambda_env_modeler import get_environment_variables, init_environment_variables
 from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.feature_flags.exceptions import ConfigurationStoreError, SchemaValidationError
-from aws_lambda_powertools.utilities.parser import ValidationError, parse
-from aws_lambda_powertools.utilities.parser.envelopes import ApiGatewayEnvelope
+from aws_lambda_powertools.utilities.parser import ValidationError
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from service.handlers.schemas.dynamic_configuration import MyConfiguration
 from service.handlers.schemas.env_vars import OrderGetHandlerEnvVars
+from service.handlers.utils.apigw_parser import parse_body
 from service.handlers.utils.dynamic_configuration import parse_configuration
-from service.handlers.utils.http_responses import build_response
-from service.handlers.utils.observability import logger, metrics, tracer
+from service.handlers.utils.http_responses import build_model_response, build_response
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, metrics, stage_timer
 from service.logic.orders.handle_delete_request import handle_delete_request
 from service.schemas.exceptions import InternalServerException
 from service.schemas.input import DeleteOrderRequest
@@ -21,23 +21,27 @@ from service.schemas.output import DeleteOrderOutput
 
 @init_environment_variables(model=OrderGetHandlerEnvVars)
 @metrics.log_metrics
-@tracer.capture_lambda_handler(capture_response=False)
+@adaptive_tracer.capture_lambda_handler
 def delete_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     logger.set_correlation_id(context.aws_request_id)
 
     env_vars: OrderGetHandlerEnvVars = get_environment_variables(model=OrderGetHandlerEnvVars)
-    logger.debug('environment variables', extra=env_vars.model_dump())
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
 
     try:
-        my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
-        logger.debug('fetched dynamic configuration', extra={'configuration': my_configuration.model_dump()})
+        with stage_timer.stage('AppConfig'):
+            my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
+        lazy_logger.apply_settings(my_configuration.logging)
+        adaptive_tracer.apply_settings(my_configuration.tracing)
+        lazy_logger.debug('fetched dynamic configuration', extra=lambda: {'configuration': my_configuration.model_dump()})
     except (SchemaValidationError, ConfigurationStoreError) as exc:  # pragma: no cover
         logger.exception(f'dynamic configuration error, error={str(exc)}')
         return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
 
     try:
         # we want to extract and parse the HTTP body from the api gw envelope
-        delete_input: DeleteOrderRequest = parse(event=event, model=DeleteOrderRequest, envelope=ApiGatewayEnvelope)
+        with stage_timer.stage('ParseEvent'):
+            delete_input: DeleteOrderRequest = parse_body(event=event, model=DeleteOrderRequest)
         logger.info('got delete order request', extra={'order_id': delete_input.order_id})
     except (ValidationError, TypeError) as exc:
         logger.error('event failed input validation', extra={'error': str(exc)})
@@ -45,7 +49,7 @@ def delete_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
 
     metrics.add_metric(name='ValidDeleteOrderEvents', unit=MetricUnit.Count, value=1)
     try:
-        response: DeleteOrderOutput = handle_delete_request(
+        response: Optional[DeleteOrderOutput] = handle_delete_request(
             delete_request=delete_input,
             table_name=env_vars.TABLE_NAME,
         )
@@ -54,4 +58,7 @@ def delete_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
         return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
 
     logger.info('finished handling delete order request')
-    return build_response(http_status=HTTPStatus.OK, body=response.model_dump())
+    if response is not None:
+        return build_model_response(http_status=HTTPStatus.OK, model=response)
+    else:
+        return build_response(http_status=HTTPStatus.NOT_FOUND, body={})
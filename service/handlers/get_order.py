@@ -9,36 +9,44 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from service.handlers.schemas.dynamic_configuration import MyConfiguration
 from service.handlers.schemas.env_vars import OrderGetHandlerEnvVars
-from service.handlers.utils.apigw_parser import ApiGatewayEnvelopeExt
+from service.handlers.utils.apigw_parser import parse_headers, parse_query_string
 from service.handlers.utils.dynamic_configuration import parse_configuration
-from service.handlers.utils.http_responses import build_response
-from service.handlers.utils.observability import logger, metrics, tracer
+from service.handlers.utils.http_responses import build_model_response, build_response
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, metrics, stage_timer
 from service.logic.orders.handle_get_request import handle_get_request
+from service.logic.orders.handle_list_request import handle_list_request
 from service.schemas.exceptions import InternalServerException
-from service.schemas.input import GetOrderRequest
-from service.schemas.output import GetOrderOutput
+from service.schemas.input import GetOrderRequest, ListOrdersRequest
+from service.schemas.output import GetOrderOutput, ListOrdersOutput
 
 
 @init_environment_variables(model=OrderGetHandlerEnvVars)
 @metrics.log_metrics
-@tracer.capture_lambda_handler(capture_response=False)
+@adaptive_tracer.capture_lambda_handler
 def get_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     logger.set_correlation_id(context.aws_request_id)
 
     env_vars: OrderGetHandlerEnvVars = get_environment_variables(model=OrderGetHandlerEnvVars)
-    logger.debug('environment variables', extra=env_vars.model_dump())
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
 
     try:
-        my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
-        logger.debug('fetched dynamic configuration', extra={'configuration': my_configuration.model_dump()})
+        with stage_timer.stage('AppConfig'):
+            my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
+        lazy_logger.apply_settings(my_configuration.logging)
+        adaptive_tracer.apply_settings(my_configuration.tracing)
+        lazy_logger.debug('fetched dynamic configuration', extra=lambda: {'configuration': my_configuration.model_dump()})
     except (SchemaValidationError, ConfigurationStoreError) as exc:  # pragma: no cover
         logger.exception(f'dynamic configuration error, error={str(exc)}')
         return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
 
+    # GET /api/orders?customer_name= lists the customer orders instead of getting a single order
+    if 'customer_name' in (event.get('queryStringParameters') or {}):
+        return _list_orders(event, env_vars)
+
     try:
         # we want to extract and parse the HTTP header from the api gw envelope
-        envelope = ApiGatewayEnvelopeExt()
-        get_input: GetOrderRequest = envelope.parseHeader(data=event, model=GetOrderRequest)
+        with stage_timer.stage('ParseEvent'):
+            get_input: GetOrderRequest = parse_headers(event=event, model=GetOrderRequest)
         logger.info('got get order request', extra={'order_id': get_input.order_id})
     except (ValidationError, TypeError) as exc:
         logger.error('event failed input validation', extra={'error': str(exc)})
@@ -56,6 +64,30 @@ def get_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
 
     logger.info('finished handling get order request')
     if response is not None:
-        return build_response(http_status=HTTPStatus.OK, body=response.model_dump())
+        return build_model_response(http_status=HTTPStatus.OK, model=response)
     else:
         return build_response(http_status=HTTPStatus.NOT_FOUND, body={})
+
+
+def _list_orders(event: Dict[str, Any], env_vars: OrderGetHandlerEnvVars) -> Dict[str, Any]:
+    try:
+        # we want to extract and parse the HTTP query string from the api gw envelope
+        with stage_timer.stage('ParseEvent'):
+            list_input: ListOrdersRequest = parse_query_string(event=event, model=ListOrdersRequest)
+        logger.info('got list orders request', extra={'customer_name': list_input.customer_name, 'limit': list_input.limit})
+    except (ValidationError, TypeError) as exc:
+        logger.error('event failed input validation', extra={'error': str(exc)})
+        return build_response(http_status=HTTPStatus.BAD_REQUEST, body={})
+
+    metrics.add_metric(name='ValidListOrdersEvents', unit=MetricUnit.Count, value=1)
+    try:
+        response: ListOrdersOutput = handle_list_request(
+            list_request=list_input,
+            table_name=env_vars.TABLE_NAME,
+        )
+    except InternalServerException:  # pragma: no cover
+        logger.error('finished handling list orders request with internal error')
+        return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
+
+    logger.info('finished handling list orders request')
+    return build_model_response(http_status=HTTPStatus.OK, model=response)
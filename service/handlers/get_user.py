@@ -9,10 +9,10 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from service.handlers.schemas.dynamic_configuration import MyConfiguration
 from service.handlers.schemas.env_vars import UserGetHandlerEnvVars
-from service.handlers.utils.apigw_parser import ApiGatewayEnvelopeExt
+from service.handlers.utils.apigw_parser import parse_headers
 from service.handlers.utils.dynamic_configuration import parse_configuration
-from service.handlers.utils.http_responses import build_response
-from service.handlers.utils.observability import logger, metrics, tracer
+from service.handlers.utils.http_responses import build_model_response, build_response
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, metrics, stage_timer
 from service.logic.users.handle_get_request import handle_get_request
 from service.schemas.exceptions import InternalServerException
 from service.schemas.input import GetUserRequest
@@ -21,24 +21,27 @@ from service.schemas.output import GetUserOutput
 
 @init_environment_variables(model=UserGetHandlerEnvVars)
 @metrics.log_metrics
-@tracer.capture_lambda_handler(capture_response=False)
+@adaptive_tracer.capture_lambda_handler
 def get_user(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     logger.set_correlation_id(context.aws_request_id)
 
     env_vars: UserGetHandlerEnvVars = get_environment_variables(model=UserGetHandlerEnvVars)
-    logger.debug('environment variables', extra=env_vars.model_dump())
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
 
     try:
-        my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
-        logger.debug('fetched dynamic configuration', extra={'configuration': my_configuration.model_dump()})
+        with stage_timer.stage('AppConfig'):
+            my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
+        lazy_logger.apply_settings(my_configuration.logging)
+        adaptive_tracer.apply_settings(my_configuration.tracing)
+        lazy_logger.debug('fetched dynamic configuration', extra=lambda: {'configuration': my_configuration.model_dump()})
     except (SchemaValidationError, ConfigurationStoreError) as exc:  # pragma: no cover
         logger.exception(f'dynamic configuration error, error={str(exc)}')
         return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
 
     try:
         # we want to extract and parse the HTTP header from the api gw envelope
-        envelope = ApiGatewayEnvelopeExt()
-        get_input: GetUserRequest = envelope.parseHeader(data=event, model=GetUserRequest)
+        with stage_timer.stage('ParseEvent'):
+            get_input: GetUserRequest = parse_headers(event=event, model=GetUserRequest)
         logger.info('got get user request', extra={'user_id': get_input.user_id})
     except (ValidationError, TypeError) as exc:
         logger.error('event failed input validation', extra={'error': str(exc)})
@@ -56,6 +59,6 @@ def get_user(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
 
     logger.info('finished handling get user request')
     if response is not None:
-        return build_response(http_status=HTTPStatus.OK, body=response.model_dump())
+        return build_model_response(http_status=HTTPStatus.OK, model=response)
     else:
         return build_response(http_status=HTTPStatus.NOT_FOUND, body={})
@@ -1,34 +1,84 @@
 from typing import Any, Dict
 
 from aws_lambda_env_modeler import get_environment_variables, init_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.batch import BatchProcessor, EventType, process_partial_response
+from aws_lambda_powertools.utilities.batch.types import PartialItemFailureResponse
+from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.feature_flags.exceptions import ConfigurationStoreError, SchemaValidationError
 from aws_lambda_powertools.utilities.parser import ValidationError
+from aws_lambda_powertools.utilities.parser.models import SnsNotificationModel
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from service.handlers.schemas.dynamic_configuration import MyConfiguration
 from service.handlers.schemas.env_vars import NotifyEmailHandlerEnvVars
 from service.handlers.utils.dynamic_configuration import parse_configuration
-from service.handlers.utils.observability import logger, metrics, tracer
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, metrics, stage_timer
+
+# SQS records of the notification queue, failed records are reported back as partial batch failures
+processor = BatchProcessor(event_type=EventType.SQS)
 
 
 @init_environment_variables(model=NotifyEmailHandlerEnvVars)
 @metrics.log_metrics
-@tracer.capture_lambda_handler(capture_response=False)
+@adaptive_tracer.capture_lambda_handler
 def email_on_order_create(event: Dict[str, Any], context: LambdaContext) -> None:
     logger.set_correlation_id(context.aws_request_id)
 
     env_vars: NotifyEmailHandlerEnvVars = get_environment_variables(model=NotifyEmailHandlerEnvVars)
-    logger.debug('environment variables', extra=env_vars.model_dump())
-
-    try:
-        my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
-        logger.debug('fetched dynamic configuration', extra={'configuration': my_configuration.model_dump()})
-    except (SchemaValidationError, ConfigurationStoreError) as exc:  # pragma: no cover
-        logger.exception(f'dynamic configuration error, error={str(exc)}')
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
+    _apply_dynamic_configuration()
 
     try:
-        logger.debug(f'Event from SNS: {event}')
+        lazy_logger.debug('event from SNS', extra=lambda: {'event': event})
     except (ValidationError, TypeError) as exc:
         logger.error('event failed input validation', extra={'error': str(exc)})
 
     logger.info('finished email notification of Order Creation event')
+
+
+@init_environment_variables(model=NotifyEmailHandlerEnvVars)
+@metrics.log_metrics
+@adaptive_tracer.capture_lambda_handler
+def email_on_order_create_batch(event: Dict[str, Any], context: LambdaContext) -> PartialItemFailureResponse:
+    """ email_on_order_create for a batch of OrderCreated SNS notifications buffered in the notification SQS queue
+
+        The configuration is fetched once per batch. Records that fail are returned as partial batch failures, SQS delivers
+        only them again and moves them to the dead letter queue after the maximum receive count. When every record of the
+        batch fails the whole batch is retried.
+    """
+    logger.set_correlation_id(context.aws_request_id)
+
+    env_vars: NotifyEmailHandlerEnvVars = get_environment_variables(model=NotifyEmailHandlerEnvVars)
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
+    _apply_dynamic_configuration()
+
+    response = process_partial_response(event=event, record_handler=_email_order_created, processor=processor, context=context)
+    failed_count = len(response['batchItemFailures'])
+    metrics.add_metric(name='OrderCreatedEmails', unit=MetricUnit.Count, value=len(processor.success_messages))
+    if failed_count:
+        metrics.add_metric(name='FailedOrderCreatedEmails', unit=MetricUnit.Count, value=failed_count)
+    logger.info('finished email notification of Order Creation events batch', extra={
+        'record_count': len(event.get('Records', [])),
+        'failed_count': failed_count
+    })
+    return response
+
+
+def _apply_dynamic_configuration() -> None:
+    try:
+        with stage_timer.stage('AppConfig'):
+            my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
+        lazy_logger.apply_settings(my_configuration.logging)
+        adaptive_tracer.apply_settings(my_configuration.tracing)
+        lazy_logger.debug('fetched dynamic configuration', extra=lambda: {'configuration': my_configuration.model_dump()})
+    except (SchemaValidationError, ConfigurationStoreError) as exc:  # pragma: no cover
+        logger.exception(f'dynamic configuration error, error={str(exc)}')
+
+
+def _email_order_created(record: SQSRecord) -> None:
+    """ Raises:
+            ValidationError: the record body is not an SNS notification, it fails alone
+    """
+    notification = SnsNotificationModel.model_validate_json(record.body)
+    logger.info('sending order created email', extra={'message_id': notification.MessageId, 'subject': notification.Subject})
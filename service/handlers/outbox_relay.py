@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Tuple
+
+from aws_lambda_env_modeler import get_environment_variables, init_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.data_classes.dynamo_db_stream_event import DynamoDBRecordEventName, DynamoDBStreamEvent
+from aws_lambda_powertools.utilities.parser import ValidationError
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from service.dal.schemas.outbox_db import OrderCreatedOutboxRecord
+from service.handlers.schemas.env_vars import OutboxRelayHandlerEnvVars
+from service.handlers.utils.aws_clients import get_client
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, metrics
+from service.handlers.utils.order_events import publish_orders_created
+
+
+@init_environment_variables(model=OutboxRelayHandlerEnvVars)
+@metrics.log_metrics
+@adaptive_tracer.capture_lambda_handler
+def relay_order_events(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """ publish the OrderCreated outbox records of a DynamoDB stream batch with SNS PublishBatch
+
+        Returns the sequence number of the first record that failed to publish as a partial batch failure,
+        so Lambda retries the stream from that record on. Events are published at least once.
+    """
+    logger.set_correlation_id(context.aws_request_id)
+
+    env_vars: OutboxRelayHandlerEnvVars = get_environment_variables(model=OutboxRelayHandlerEnvVars)
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
+
+    records: List[Tuple[str, OrderCreatedOutboxRecord]] = []
+    for record in DynamoDBStreamEvent(event).records:
+        # records removed by the TTL and anything but inserts are of no interest
+        if record.event_name != DynamoDBRecordEventName.INSERT or record.dynamodb is None:
+            continue
+        try:
+            records.append((record.dynamodb.sequence_number or '', OrderCreatedOutboxRecord.model_validate(record.dynamodb.new_image)))
+        except ValidationError as exc:
+            # a malformed record will never publish, retrying it would block the shard
+            logger.exception('skipping invalid outbox record', extra={'exception': str(exc), 'sequence_number': record.dynamodb.sequence_number})
+
+    logger.info('relaying order created events', extra={'event_count': len(records)})
+    failed_order_ids = set(
+        publish_orders_created(
+            client=get_client('sns'),
+            topic_arn=env_vars.ORDER_CREATED_TOPIC_ARN,
+            orders=[outbox_record.model_dump() for _, outbox_record in records],
+        ))
+    metrics.add_metric(name='OutboxRelayedEvents', unit=MetricUnit.Count, value=len(records) - len(failed_order_ids))
+    if not failed_order_ids:
+        return {'batchItemFailures': []}
+
+    metrics.add_metric(name='OutboxFailedEvents', unit=MetricUnit.Count, value=len(failed_order_ids))
+    first_failed = next(sequence_number for sequence_number, outbox_record in records if outbox_record.order_id in failed_order_ids)
+    return {'batchItemFailures': [{'itemIdentifier': first_failed}]}
@@ -0,0 +1,50 @@
+import importlib
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from service.handlers.utils.http_responses import build_response
+from service.handlers.utils.observability import logger
+
+Route = Tuple[str, str]  # (HTTP method, API Gateway resource path)
+
+# handlers are referenced by name and imported on their first request, a container only loads the handlers it serves
+ORDERS_ROUTES: Dict[Route, str] = {
+    ('POST', '/api/orders'): 'service.handlers.create_order.create_order',
+    ('GET', '/api/orders'): 'service.handlers.get_order.get_order',
+    ('PATCH', '/api/orders'): 'service.handlers.update_order.update_order',
+    ('DELETE', '/api/orders'): 'service.handlers.delete_order.delete_order',
+    ('POST', '/api/orders/batch'): 'service.handlers.create_orders_batch.create_orders_batch',
+    ('GET', '/api/orders/batch'): 'service.handlers.get_orders_batch.get_orders_batch',
+}
+
+USERS_ROUTES: Dict[Route, str] = {
+    ('POST', '/api/users'): 'service.handlers.create_user.create_user',
+    ('GET', '/api/users'): 'service.handlers.get_user.get_user',
+    ('DELETE', '/api/users'): 'service.handlers.delete_user.delete_user',
+}
+
+
+def resolve_handler(handler_path: str) -> Callable[[Dict[str, Any], LambdaContext], Dict[str, Any]]:
+    """ import 'package.module.function' and return the function, modules already imported are served from sys.modules """
+    module_name, _, function_name = handler_path.rpartition('.')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def dispatch(event: Dict[str, Any], context: LambdaContext, routes: Mapping[Route, str]) -> Dict[str, Any]:
+    """ call the handler of the event method and resource, the handler keeps its own env vars, metrics and tracing decorators """
+    route: Route = (event.get('httpMethod', ''), event.get('resource', ''))
+    handler_path = routes.get(route)
+    if handler_path is None:
+        logger.error('no handler for route', extra={'http_method': route[0], 'resource': route[1]})
+        return build_response(http_status=HTTPStatus.NOT_FOUND, body={})
+    return resolve_handler(handler_path)(event, context)
+
+
+def orders_router(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    return dispatch(event, context, ORDERS_ROUTES)
+
+
+def users_router(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    return dispatch(event, context, USERS_ROUTES)
@@ -1,12 +1,28 @@
 from enum import Enum
-from typing import List
+from typing import Annotated, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PositiveInt
+
+
+class LoggingConfiguration(BaseModel):
+    # None keeps the level of the LOG_LEVEL environment variable
+    log_level: Optional[Literal['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']] = None
+    # share of the invocations that emit debug records
+    debug_sample_rate: Annotated[float, Field(ge=0, le=1)] = 1.0
+
+
+class TracingConfiguration(BaseModel):
+    # share of the invocations traced with a subsegment per logic and DAL method, the others keep only the handler subsegment
+    full_trace_sample_rate: Annotated[float, Field(ge=0, le=1)] = 1.0
+    # invocations that fail or run longer are traced fully whether sampled or not
+    slow_request_threshold_ms: PositiveInt = 1000
 
 
 # does not include feature flags part of the JSON
 class MyConfiguration(BaseModel):
     countries: List[str]
+    logging: LoggingConfiguration = Field(default_factory=LoggingConfiguration)
+    tracing: TracingConfiguration = Field(default_factory=TracingConfiguration)
 
 
 class FeatureFlagsNames(Enum):
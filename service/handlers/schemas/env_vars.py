@@ -1,6 +1,6 @@
-from typing import Annotated, Literal
+from typing import Annotated, Literal, Optional
 
-from pydantic import BaseModel, Field, HttpUrl, PositiveInt
+from pydantic import BaseModel, Field, HttpUrl, NonNegativeInt, PositiveInt
 
 
 class Observability(BaseModel):
@@ -10,6 +10,38 @@ class Observability(BaseModel):
 
 class Idempotency(BaseModel):
     IDEMPOTENCY_TABLE_NAME: Annotated[str, Field(min_length=1)]
+    # 'key': a create order or user request with an Idempotency-Key header creates its entity with an id derived from the key in one conditional
+    # put and skips the idempotency table, requests without the header still use the table
+    IDEMPOTENCY_MODE: Literal['table', 'key'] = 'table'
+
+
+class IdempotencyCache(BaseModel):
+    IDEMPOTENCY_CACHE_MAX_ITEMS: NonNegativeInt = 256  # completed records kept per container, 0 disables the local cache
+
+
+class DalCache(BaseModel):
+    DAL_CACHE_MAX_ITEMS: NonNegativeInt = 0  # read-through cache is disabled by default
+    DAL_CACHE_TTL_SECONDS: PositiveInt = 60
+    DAL_CACHE_NEGATIVE_TTL_SECONDS: PositiveInt = 5  # not found entries
+
+
+class DalBackend(BaseModel):
+    DAL_BACKEND: Literal['dynamodb', 'memory', 'sqlite'] = 'dynamodb'  # memory is for benchmarks and local load tests
+    SQLITE_DB_PATH: Annotated[str, Field(min_length=1)] = 'ninja_toast.sqlite3'  # sqlite backend database file
+
+
+class DynamoDal(BaseModel):
+    # 'client' uses the low-level DynamoDB client with the hand specialised item codec
+    DYNAMODB_DAL_MODE: Literal['resource', 'client'] = 'resource'
+
+
+class ApiGatewayParsing(BaseModel):
+    # validate the whole API Gateway event model instead of only the body, headers or query string the handler reads
+    APIGW_FULL_VALIDATION: bool = False
+
+
+class FeatureFlagsEvaluation(BaseModel):
+    FEATURE_FLAGS_MEMO_MAX_ITEMS: PositiveInt = 1024  # (flag, context) results kept per configuration version
 
 
 class DynamicConfiguration(BaseModel):
@@ -36,6 +68,12 @@ class GetHandlerEnvVars(DeleteHandlerEnvVars):
 
 class OrderCreateHandlerEnvVars(CreateHandlerEnvVars):
     ORDER_CREATED_TOPIC_ARN: Annotated[str, Field(min_length=20, max_length=2048)]
+    # transactional outbox table, when set OrderCreated events are published by the outbox relay instead of the request
+    OUTBOX_TABLE_NAME: Optional[Annotated[str, Field(min_length=1)]] = None
+
+
+class OutboxRelayHandlerEnvVars(Observability):
+    ORDER_CREATED_TOPIC_ARN: Annotated[str, Field(min_length=20, max_length=2048)]
 
 
 class OrderDeleteHandlerEnvVars(DeleteHandlerEnvVars):
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+from typing import Any, Dict, Optional
+
+from aws_lambda_env_modeler import get_environment_variables, init_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.feature_flags.exceptions import ConfigurationStoreError, SchemaValidationError
+from aws_lambda_powertools.utilities.parser import ValidationError
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from service.handlers.schemas.dynamic_configuration import MyConfiguration
+from service.handlers.schemas.env_vars import OrderGetHandlerEnvVars
+from service.handlers.utils.apigw_parser import parse_body
+from service.handlers.utils.dynamic_configuration import parse_configuration
+from service.handlers.utils.http_responses import build_model_response, build_response
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, metrics, stage_timer
+from service.logic.orders.handle_update_request import handle_update_request
+from service.schemas.exceptions import InternalServerException
+from service.schemas.input import UpdateOrderRequest
+from service.schemas.output import UpdateOrderOutput
+
+
+@init_environment_variables(model=OrderGetHandlerEnvVars)
+@metrics.log_metrics
+@adaptive_tracer.capture_lambda_handler
+def update_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    logger.set_correlation_id(context.aws_request_id)
+
+    env_vars: OrderGetHandlerEnvVars = get_environment_variables(model=OrderGetHandlerEnvVars)
+    lazy_logger.debug('environment variables', extra=env_vars.model_dump)
+
+    try:
+        with stage_timer.stage('AppConfig'):
+            my_configuration: MyConfiguration = parse_configuration(model=MyConfiguration)  # type: ignore
+        lazy_logger.apply_settings(my_configuration.logging)
+        adaptive_tracer.apply_settings(my_configuration.tracing)
+        lazy_logger.debug('fetched dynamic configuration', extra=lambda: {'configuration': my_configuration.model_dump()})
+    except (SchemaValidationError, ConfigurationStoreError) as exc:  # pragma: no cover
+        logger.exception(f'dynamic configuration error, error={str(exc)}')
+        return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
+
+    try:
+        # we want to extract and parse the HTTP body from the api gw envelope
+        with stage_timer.stage('ParseEvent'):
+            update_input: UpdateOrderRequest = parse_body(event=event, model=UpdateOrderRequest)
+        logger.info('got update order request', extra={'order_id': update_input.order_id})
+    except (ValidationError, TypeError) as exc:
+        logger.error('event failed input validation', extra={'error': str(exc)})
+        return build_response(http_status=HTTPStatus.BAD_REQUEST, body={})
+
+    metrics.add_metric(name='ValidUpdateOrderEvents', unit=MetricUnit.Count, value=1)
+    try:
+        response: Optional[UpdateOrderOutput] = handle_update_request(
+            update_request=update_input,
+            table_name=env_vars.TABLE_NAME,
+        )
+    except InternalServerException:  # pragma: no cover
+        logger.error('finished handling update order request with internal error')
+        return build_response(http_status=HTTPStatus.INTERNAL_SERVER_ERROR, body={})
+
+    logger.info('finished handling update order request')
+    if response is not None:
+        return build_model_response(http_status=HTTPStatus.OK, model=response, exclude_none=True)
+    else:
+        return build_response(http_status=HTTPStatus.NOT_FOUND, body={})
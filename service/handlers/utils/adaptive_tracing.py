@@ -0,0 +1,146 @@
+import contextlib
+import contextvars
+import functools
+import inspect
+import random
+import time
+import traceback
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from aws_lambda_powertools.shared.functions import sanitize_xray_segment_name
+from aws_lambda_powertools.tracing.tracer import Tracer
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from service.handlers.schemas.dynamic_configuration import TracingConfiguration
+
+AnyCallable = TypeVar('AnyCallable', bound=Callable[..., Any])
+Handler = Callable[[Dict[str, Any], LambdaContext], Any]
+
+
+class _MethodCall:
+    """ a method call of an invocation that is not sampled, sent as a subsegment only if the invocation turns out slow or failed """
+
+    __slots__ = ('name', 'parent', 'start', 'end', 'error')
+
+    def __init__(self, name: str, parent: Optional['_MethodCall'], start: float) -> None:
+        self.name = name
+        self.parent = parent
+        self.start = start
+        self.end = start
+        self.error: Optional[BaseException] = None
+
+
+# the innermost recorded call, the parent of the next one, a context variable so concurrent coroutines nest correctly
+_current_call: contextvars.ContextVar[Optional[_MethodCall]] = contextvars.ContextVar('current_call', default=None)
+
+
+class AdaptiveTracer:
+    """ powertools tracer that creates logic and DAL method subsegments for a sampled share of the invocations
+
+        An invocation that is not sampled keeps only the handler subsegment and records its method calls in memory. When it
+        fails, answers 5xx or runs longer than the threshold, the recorded calls are sent as subsegments with their original
+        start and end times, so slow and failed requests are always traced in full. The sample rate and the threshold come
+        from the 'tracing' section of the dynamic configuration, every call is traced until a handler applies them.
+    """
+
+    def __init__(self, tracer: Tracer) -> None:
+        self._tracer = tracer
+        self._settings = TracingConfiguration()
+        self._sampled = True
+        self._calls: List[_MethodCall] = []
+
+    def apply_settings(self, settings: TracingConfiguration) -> None:
+        """ draw the sample of this invocation with the settings of the dynamic configuration """
+        self._settings = settings
+        self._sampled = settings.full_trace_sample_rate >= 1 or random.random() < settings.full_trace_sample_rate
+
+    def capture_lambda_handler(self, handler: Handler) -> Handler:
+        """ tracer.capture_lambda_handler(capture_response=False) that sends the recorded calls of a slow or failed invocation """
+
+        @functools.wraps(handler)
+        def wrapper(event: Dict[str, Any], context: LambdaContext) -> Any:
+            self._sampled = True
+            self._calls = []
+            start = time.time()
+            failed = True
+            try:
+                response = handler(event, context)
+                failed = isinstance(response, dict) and response.get('statusCode', HTTPStatus.OK) >= HTTPStatus.INTERNAL_SERVER_ERROR
+                return response
+            finally:
+                if not self._sampled and self._calls:
+                    self._send_if_slow_or_failed(failed=failed, duration_ms=(time.time() - start) * 1000)
+                self._calls = []
+                self._sampled = True
+
+        return self._tracer.capture_lambda_handler(wrapper, capture_response=False)
+
+    def capture_method(self, method: AnyCallable) -> AnyCallable:
+        """ tracer.capture_method(capture_response=False) for sampled invocations, a recorded call for the others
+
+            Generator methods are not recorded, invocations that are not sampled send no subsegment for them.
+        """
+        traced = self._tracer.capture_method(capture_response=False)(method)
+        name = f'## {sanitize_xray_segment_name(f"{method.__module__}.{method.__qualname__}")}'
+
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def async_wrapper(*args, **kwargs):
+                if self._sampled:
+                    return await traced(*args, **kwargs)
+                with self._record(name):
+                    return await method(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if self._sampled:
+                return traced(*args, **kwargs)
+            if inspect.isgeneratorfunction(method):
+                return method(*args, **kwargs)
+            with self._record(name):
+                return method(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    @contextlib.contextmanager
+    def _record(self, name: str) -> Iterator[None]:
+        call = _MethodCall(name=name, parent=_current_call.get(), start=time.time())
+        self._calls.append(call)
+        token = _current_call.set(call)
+        try:
+            yield
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            call.end = time.time()
+            _current_call.reset(token)
+
+    def _send_if_slow_or_failed(self, failed: bool, duration_ms: float) -> None:
+        if failed or any(call.error is not None for call in self._calls):
+            reason = 'failed'
+        elif duration_ms > self._settings.slow_request_threshold_ms:
+            reason = 'slow'
+        else:
+            return
+        if self._tracer.disabled:
+            return
+        self._tracer.put_annotation(key='full_trace_reason', value=reason)
+        children: Dict[Optional[int], List[_MethodCall]] = {}
+        for call in self._calls:  # in start order
+            children.setdefault(None if call.parent is None else id(call.parent), []).append(call)
+        self._send_calls(children, parent_id=None)
+
+    def _send_calls(self, children: Dict[Optional[int], List[_MethodCall]], parent_id: Optional[int]) -> None:
+        provider = self._tracer.provider
+        for call in children.get(parent_id, []):
+            subsegment = provider.begin_subsegment(call.name)  # type: ignore[attr-defined]
+            subsegment.start_time = call.start
+            if call.error is not None:
+                subsegment.add_exception(call.error, traceback.extract_tb(call.error.__traceback__))
+            self._send_calls(children, parent_id=id(call))
+            provider.end_subsegment(end_time=call.end)  # type: ignore[attr-defined]
@@ -1,16 +1,19 @@
 import logging
-from typing import Any, Dict, Optional, Type, Union
+from typing import Any, Dict, Optional, Tuple, Type, Union
 
+from aws_lambda_env_modeler import get_environment_variables
 from aws_lambda_powertools.utilities.parser.envelopes import ApiGatewayEnvelope
 from aws_lambda_powertools.utilities.parser.exceptions import InvalidEnvelopeError
 from aws_lambda_powertools.utilities.parser.models import APIGatewayProxyEventModel
 from aws_lambda_powertools.utilities.parser.types import Model
 
+from service.handlers.schemas.env_vars import ApiGatewayParsing
+
 logger = logging.getLogger(__name__)
 
 
 class ApiGatewayEnvelopeExt(ApiGatewayEnvelope):
-    """Extension to API Gateway envelope to extract data within body key OR header key"""
+    """Extension to API Gateway envelope to extract data within body key, header key OR query string parameters key"""
 
     def parseHeader(self, data: Optional[Union[Dict[str, Any], Any]], model: Type[Model]) -> Model:
         """Parses data found in envelope's header with model provided
@@ -28,10 +31,88 @@ class ApiGatewayEnvelopeExt(ApiGatewayEnvelope):
             Parsed detail payload with model provided
         """
         try:
-            logger.debug(f'Parsing and validating event model with envelope={self.__class__}')
-            logger.debug(f'Parsing incoming data with Api Gateway model {APIGatewayProxyEventModel}')
+            logger.debug('Parsing and validating event model with envelope=%s', self.__class__)
+            logger.debug('Parsing incoming data with Api Gateway model %s', APIGatewayProxyEventModel)
             parsed_envelope: APIGatewayProxyEventModel = APIGatewayProxyEventModel.model_validate(data)
-            logger.debug(f'Parsing event payload in `detail` with {model}')
+            logger.debug('Parsing event payload in `headers` with %s', model)
             return model.model_validate(parsed_envelope.headers)
         except AttributeError:
             raise InvalidEnvelopeError(f'Envelope must implement BaseEnvelope, envelope={self.__class__}')
+
+    def parseQueryString(self, data: Optional[Union[Dict[str, Any], Any]], model: Type[Model]) -> Model:
+        """Parses data found in envelope's query string parameters with model provided
+
+        Parameters
+        ----------
+        data : Dict
+            Lambda event to be parsed
+        model : Type[Model]
+            Data model provided to parse after extracting data using envelope
+
+        Returns
+        -------
+        Any
+            Parsed query string parameters with model provided
+        """
+        try:
+            logger.debug('Parsing and validating event model with envelope=%s', self.__class__)
+            logger.debug('Parsing incoming data with Api Gateway model %s', APIGatewayProxyEventModel)
+            parsed_envelope: APIGatewayProxyEventModel = APIGatewayProxyEventModel.model_validate(data)
+            logger.debug('Parsing event payload in `queryStringParameters` with %s', model)
+            return model.model_validate(parsed_envelope.queryStringParameters or {})
+        except AttributeError:
+            raise InvalidEnvelopeError(f'Envelope must implement BaseEnvelope, envelope={self.__class__}')
+
+
+# fast path: only the event field the handler reads is extracted and validated with the handler model.
+# APIGatewayProxyEventModel validates the whole event (requestContext, identity, multi value maps...) on every request,
+# setting APIGW_FULL_VALIDATION=true brings that back. Both paths raise ValidationError or TypeError on bad input.
+
+
+def _full_validation() -> bool:
+    return get_environment_variables(model=ApiGatewayParsing).APIGW_FULL_VALIDATION
+
+
+def _event_field(event: Any, field: str) -> Any:
+    if not isinstance(event, dict):
+        raise TypeError(f'API Gateway event must be a dict, got {type(event).__name__}')
+    return event.get(field)
+
+
+# (body, model, parsed request) of the last body parsed, the idempotency layer and the handler both ask for the same body.
+# The cache holds a reference to the body string, so an identity check cannot match the body of another event
+_last_parsed_body: Tuple[Optional[str], Optional[type], Any] = (None, None, None)
+
+
+def parse_body(event: Dict[str, Any], model: Type[Model]) -> Model:
+    """ parse the JSON body of an API Gateway proxy event with the model
+
+        The raw JSON string is validated with model_validate_json, there is no intermediate dict. Parsing the same event body with
+        the same model again returns the request parsed the first time.
+    """
+    global _last_parsed_body
+    cached_body, cached_model, parsed = _last_parsed_body
+    if cached_body is not None and model is cached_model and isinstance(event, dict) and event.get('body') is cached_body:
+        return parsed
+    if _full_validation():
+        APIGatewayProxyEventModel.model_validate(event)
+    body = _event_field(event, 'body')
+    if not isinstance(body, str):
+        return model.model_validate(body)  # a missing body fails the model validation
+    parsed = model.model_validate_json(body)
+    _last_parsed_body = (body, model, parsed)
+    return parsed
+
+
+def parse_headers(event: Dict[str, Any], model: Type[Model]) -> Model:
+    """ parse the headers of an API Gateway proxy event with the model """
+    if _full_validation():
+        return ApiGatewayEnvelopeExt().parseHeader(data=event, model=model)
+    return model.model_validate(_event_field(event, 'headers'))
+
+
+def parse_query_string(event: Dict[str, Any], model: Type[Model]) -> Model:
+    """ parse the query string parameters of an API Gateway proxy event with the model, no parameters is an empty dict """
+    if _full_validation():
+        return ApiGatewayEnvelopeExt().parseQueryString(data=event, model=model)
+    return model.model_validate(_event_field(event, 'queryStringParameters') or {})
@@ -0,0 +1,77 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict
+
+import boto3
+from aws_lambda_powertools.metrics import MetricUnit
+from botocore.config import Config
+
+from service.handlers.utils.observability import lazy_logger, metrics
+
+# shared by every client of the container, keeps connections warm between invocations and fails fast instead of
+# waiting out the Lambda timeout on a stuck connection
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=32,  # room for the batch and prefetch threads, botocore default is 10
+    tcp_keepalive=True,
+    connect_timeout=2,
+    read_timeout=5,
+    retries={
+        'mode': 'standard',
+        'max_attempts': 3
+    },
+)
+
+_SESSION_LOCK = threading.Lock()  # boto3 sessions are not thread safe while creating clients
+_CREATION_TIMES_MS: Dict[str, float] = {}
+
+
+@lru_cache(maxsize=1)
+def _get_session() -> boto3.session.Session:
+    return boto3.session.Session()
+
+
+def _record_creation(name: str, start: float) -> None:
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    _CREATION_TIMES_MS[name] = elapsed_ms
+    lazy_logger.debug('created aws client', extra={'client': name, 'creation_ms': elapsed_ms})
+    metrics.add_metric(name='AwsClientCreationTime', unit=MetricUnit.Milliseconds, value=elapsed_ms)
+
+
+@lru_cache(maxsize=None)
+def get_client(service_name: str) -> Any:
+    """ shared low-level client of a service, created once per container with AWS_CLIENT_CONFIG
+
+        Args:
+            service_name (str): boto3 service name, i.e. 'sns'
+    """
+    start = time.perf_counter()
+    with _SESSION_LOCK:
+        client = _get_session().client(service_name, config=AWS_CLIENT_CONFIG)
+    _record_creation(f'{service_name}_client', start)
+    return client
+
+
+@lru_cache(maxsize=None)
+def get_resource(service_name: str) -> Any:
+    """ shared resource of a service, created once per container with AWS_CLIENT_CONFIG
+
+        A resource owns a separate client since it registers its own (de)serialization hooks on it.
+    """
+    start = time.perf_counter()
+    with _SESSION_LOCK:
+        resource = _get_session().resource(service_name, config=AWS_CLIENT_CONFIG)
+    _record_creation(f'{service_name}_resource', start)
+    return resource
+
+
+def get_creation_times() -> Dict[str, float]:
+    """ creation time in milliseconds of every client and resource created so far, keyed by '<service>_client|resource' """
+    return dict(_CREATION_TIMES_MS)
+
+
+def clear_clients() -> None:
+    """ drop the shared clients, the next get_client/get_resource call creates new ones (tests and endpoint changes) """
+    get_client.cache_clear()
+    get_resource.cache_clear()
+    _get_session.cache_clear()
@@ -1,16 +1,23 @@
-from typing import Any, Dict, Type, TypeVar, Union
+import hashlib
+import json
+from typing import Any, Dict, Tuple, Type, TypeVar, Union
 
 from aws_lambda_env_modeler import get_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.feature_flags import AppConfigStore, FeatureFlags
 from aws_lambda_powertools.utilities.feature_flags.exceptions import SchemaValidationError
 from pydantic import BaseModel, ValidationError
 
 from service.handlers.schemas.env_vars import DynamicConfiguration
+from service.handlers.utils.aws_clients import get_client
+from service.handlers.utils.observability import metrics
 
 Model = TypeVar('Model', bound=BaseModel)
 
 _DYNAMIC_CONFIGURATION: Union[FeatureFlags, None] = None
 _DEFAULT_FEATURE_FLAGS_ROOT = 'features'  # all feature flags reside in the JSON under this key
+# model class -> (raw configuration, content hash, parsed model) of the last configuration parsed with the model
+_PARSED_CONFIGURATIONS: Dict[type, Tuple[Any, str, BaseModel]] = {}
 
 
 def get_dynamic_configuration_store() -> FeatureFlags:
@@ -29,6 +36,7 @@ def get_dynamic_configuration_store() -> FeatureFlags:
             name=env_vars.CONFIGURATION_NAME,
             max_age=env_vars.CONFIGURATION_MAX_AGE_MINUTES,
             envelope=_DEFAULT_FEATURE_FLAGS_ROOT,
+            boto3_client=get_client('appconfigdata'),
         )
         _DYNAMIC_CONFIGURATION = FeatureFlags(store=conf_store)
 
@@ -46,6 +54,33 @@ def parse_configuration(model: Type[Model]) -> Type[BaseModel]:
     """
     try:
         conf_json: Dict[str, Any] = get_dynamic_configuration_store().store.get_raw_configuration
-        return model.model_validate(conf_json)  # type: ignore
+        return _parse_cached(model, conf_json)  # type: ignore
     except (ValidationError, TypeError) as exc:
         raise SchemaValidationError(f'appconfig schema failed pydantic validation, exception={str(exc)}') from exc
+
+
+def _parse_cached(model: Type[Model], conf_json: Dict[str, Any]) -> Model:
+    """ validate the configuration only when AppConfig delivered a new document
+
+        The store returns the same dict until its max age expires, so an identity check covers most calls. A refetched
+        document is hashed and validated only when its content changed. 'DynamicConfigurationCacheHit' and
+        'DynamicConfigurationCacheMiss' metrics count the calls that did not and did validate.
+    """
+    cached = _PARSED_CONFIGURATIONS.get(model)
+    if cached is not None and cached[0] is conf_json:
+        metrics.add_metric(name='DynamicConfigurationCacheHit', unit=MetricUnit.Count, value=1)
+        return cached[2]  # type: ignore[return-value]
+    content_hash = configuration_hash(conf_json)
+    if cached is not None and cached[1] == content_hash:
+        _PARSED_CONFIGURATIONS[model] = (conf_json, content_hash, cached[2])
+        metrics.add_metric(name='DynamicConfigurationCacheHit', unit=MetricUnit.Count, value=1)
+        return cached[2]  # type: ignore[return-value]
+    parsed = model.model_validate(conf_json)
+    _PARSED_CONFIGURATIONS[model] = (conf_json, content_hash, parsed)
+    metrics.add_metric(name='DynamicConfigurationCacheMiss', unit=MetricUnit.Count, value=1)
+    return parsed
+
+
+def configuration_hash(conf_json: Dict[str, Any]) -> str:
+    """ content hash of a configuration document, AppConfig data does not expose the deployed version number """
+    return hashlib.sha256(json.dumps(conf_json, sort_keys=True).encode()).hexdigest()
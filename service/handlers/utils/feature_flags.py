@@ -0,0 +1,166 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from aws_lambda_env_modeler import get_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.feature_flags import schema
+from aws_lambda_powertools.utilities.feature_flags.exceptions import ConfigurationStoreError
+from aws_lambda_powertools.utilities.feature_flags.feature_flags import RULE_ACTION_MAPPING
+from cachetools import LRUCache
+
+from service.handlers.schemas.env_vars import FeatureFlagsEvaluation
+from service.handlers.utils.dynamic_configuration import configuration_hash, get_dynamic_configuration_store
+from service.handlers.utils.observability import lazy_logger, metrics
+
+Context = Dict[str, Any]
+Predicate = Callable[[Context], bool]
+
+# time based actions compare the current time, the condition key names the clock (CURRENT_TIME) and not a context key
+_TIME_ACTIONS = frozenset({
+    schema.RuleAction.SCHEDULE_BETWEEN_TIME_RANGE.value,
+    schema.RuleAction.SCHEDULE_BETWEEN_DATETIME_RANGE.value,
+    schema.RuleAction.SCHEDULE_BETWEEN_DAYS_OF_WEEK.value,
+})
+
+# (raw features document, content hash, compiled flags) of the last document compiled
+_COMPILED: Optional[Tuple[Any, str, 'CompiledFeatureFlags']] = None
+
+
+class _CompiledFeature(NamedTuple):
+    evaluate: Callable[[Context], Any]
+    context_keys: Tuple[str, ...]  # the context values the result depends on, the memo key
+    time_based: bool  # results change with the clock and are not memoized
+
+
+def _compile_condition(condition: Dict[str, Any]) -> Predicate:
+    action = condition.get(schema.CONDITION_ACTION, '')
+    compare = RULE_ACTION_MAPPING.get(action, lambda a, b: False)
+    key = condition.get(schema.CONDITION_KEY, '')
+    value = condition.get(schema.CONDITION_VALUE)
+
+    def predicate(context: Context) -> bool:
+        try:
+            return compare(key if action in _TIME_ACTIONS else context.get(key), value)
+        except Exception:  # same as powertools, a condition that can not be compared does not match
+            return False
+
+    return predicate
+
+
+def _compile_feature(feature: Dict[str, Any]) -> _CompiledFeature:
+    """ closure with the powertools FeatureFlags.evaluate result: the first matching rule's when_match, otherwise the feature default """
+    feature_default = feature.get(schema.FEATURE_DEFAULT_VAL_KEY)
+    boolean_feature = feature.get(schema.FEATURE_DEFAULT_VAL_TYPE_KEY, True)
+    rules: List[Tuple[List[Predicate], Any]] = []
+    context_keys: List[str] = []
+    time_based = False
+    for rule in (feature.get(schema.RULES_KEY) or {}).values():
+        conditions = rule.get(schema.CONDITIONS_KEY) or []
+        if not conditions:  # a rule without conditions never matches
+            continue
+        for condition in conditions:
+            if condition.get(schema.CONDITION_ACTION) in _TIME_ACTIONS:
+                time_based = True
+            elif condition.get(schema.CONDITION_KEY, '') not in context_keys:
+                context_keys.append(condition.get(schema.CONDITION_KEY, ''))
+        when_match = rule.get(schema.RULE_MATCH_VALUE)
+        rules.append(([_compile_condition(condition) for condition in conditions], bool(when_match) if boolean_feature else when_match))
+
+    if not feature.get(schema.RULES_KEY):
+        value = bool(feature_default) if boolean_feature else feature_default
+        return _CompiledFeature(evaluate=lambda context: value, context_keys=(), time_based=False)
+
+    def evaluate(context: Context) -> Any:
+        for predicates, when_match in rules:
+            if all(predicate(context) for predicate in predicates):
+                return when_match
+        return feature_default
+
+    return _CompiledFeature(evaluate=evaluate, context_keys=tuple(context_keys), time_based=time_based)
+
+
+class CompiledFeatureFlags:
+    """ the features document of one configuration version compiled into a closure per flag
+
+        Results are memoized per (flag, context values the flag's rules read) in a bounded LRU, flags with time based rules
+        are evaluated on every call. Memo hits and misses are emitted as 'FeatureFlagsCacheHit' and 'FeatureFlagsCacheMiss' metrics.
+    """
+
+    def __init__(self, features: Dict[str, Any], memo_max_items: int) -> None:
+        self._features: Dict[str, _CompiledFeature] = {name: _compile_feature(feature) for name, feature in features.items()}
+        self._memo: LRUCache = LRUCache(maxsize=memo_max_items)
+
+    def evaluate(self, context: Context) -> Tuple[Dict[str, Any], int, int]:
+        """ Returns (value of every flag for the context, memo hits, memo misses) """
+        values: Dict[str, Any] = {}
+        hits = misses = 0
+        for name, feature in self._features.items():
+            if feature.time_based:
+                values[name] = feature.evaluate(context)
+                continue
+            key = (name, tuple(context.get(context_key) for context_key in feature.context_keys))
+            try:
+                values[name] = self._memo[key]
+                hits += 1
+                continue
+            except KeyError:
+                misses += 1
+            except TypeError:  # unhashable context value, e.g. a list for ANY_IN_VALUE
+                values[name] = feature.evaluate(context)
+                continue
+            values[name] = self._memo[key] = feature.evaluate(context)
+        return values, hits, misses
+
+
+def get_compiled_feature_flags() -> CompiledFeatureFlags:
+    """ compiled flags of the current features document, compiled again only when AppConfig delivered a new document
+
+        Raises:
+            ConfigurationStoreError, SchemaValidationError, StoreClientError: appconfig error or a document that fails the feature flags schema
+    """
+    global _COMPILED
+    store = get_dynamic_configuration_store()
+    features: Dict[str, Any] = store.store.get_configuration()
+    if _COMPILED is not None and _COMPILED[0] is features:
+        return _COMPILED[2]
+    content_hash = configuration_hash(features)
+    if _COMPILED is not None and _COMPILED[1] == content_hash:
+        _COMPILED = (features, content_hash, _COMPILED[2])
+        return _COMPILED[2]
+    schema.SchemaValidator(schema=features, logger=store.logger).validate()
+    compiled = CompiledFeatureFlags(features, memo_max_items=get_environment_variables(model=FeatureFlagsEvaluation).FEATURE_FLAGS_MEMO_MAX_ITEMS)
+    _COMPILED = (features, content_hash, compiled)
+    lazy_logger.debug('compiled feature flags', extra={'flag_count': len(features)})
+    return compiled
+
+
+def evaluate_feature_flags(context: Context, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """ value of every feature flag for the context in one pass over the compiled flags
+
+        Args:
+            context (Context): attributes the flag rules match against, for example {'customer_name': 'RanTheBuilder'}
+            defaults (Dict[str, Any]): flag name -> value used when the flag is not in the configuration or the store is unavailable
+        Raises:
+            SchemaValidationError, StoreClientError: same as powertools FeatureFlags.evaluate
+    """
+    return evaluate_feature_flags_batch([context], defaults)[0]
+
+
+def evaluate_feature_flags_batch(contexts: Sequence[Context], defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """ evaluate_feature_flags of many contexts with a single configuration fetch, for bulk endpoints """
+    try:
+        compiled = get_compiled_feature_flags()
+    except ConfigurationStoreError as exc:
+        lazy_logger.debug('failed to fetch feature flags from store, returning defaults', extra={'reason': str(exc)})
+        return [dict(defaults) for _ in contexts]
+    results: List[Dict[str, Any]] = []
+    hits = misses = 0
+    for context in contexts:
+        values, context_hits, context_misses = compiled.evaluate(context)
+        results.append({**defaults, **values})
+        hits += context_hits
+        misses += context_misses
+    if hits:
+        metrics.add_metric(name='FeatureFlagsCacheHit', unit=MetricUnit.Count, value=hits)
+    if misses:
+        metrics.add_metric(name='FeatureFlagsCacheMiss', unit=MetricUnit.Count, value=misses)
+    return results
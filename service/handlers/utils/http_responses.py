@@ -2,6 +2,13 @@ import json
 from http import HTTPStatus
 from typing import Any, Dict
 
+from pydantic import BaseModel
+
 
 def build_response(http_status: HTTPStatus, body: Dict[str, Any]) -> Dict[str, Any]:
     return {'statusCode': http_status, 'headers': {'Content-Type': 'application/json'}, 'body': json.dumps(body)}
+
+
+def build_model_response(http_status: HTTPStatus, model: BaseModel, exclude_none: bool = False) -> Dict[str, Any]:
+    """ same as build_response for an output model, serialized straight to JSON by pydantic without an intermediate dict """
+    return {'statusCode': http_status, 'headers': {'Content-Type': 'application/json'}, 'body': model.model_dump_json(exclude_none=exclude_none)}
@@ -1,14 +1,136 @@
+import functools
+import hashlib
+import uuid
+from typing import Any, Callable, Dict, Optional, Type
+
 from aws_lambda_env_modeler import get_environment_variables
-from aws_lambda_powertools.utilities.idempotency import DynamoDBPersistenceLayer, IdempotencyConfig
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.shared.cache_dict import LRUDict
+from aws_lambda_powertools.utilities.idempotency import DynamoDBPersistenceLayer, IdempotencyConfig, idempotent
+from aws_lambda_powertools.utilities.idempotency.persistence.datarecord import DataRecord
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from pydantic import BaseModel, ValidationError
+
+from service.handlers.schemas.env_vars import Idempotency, IdempotencyCache
+from service.handlers.utils.apigw_parser import parse_body
+from service.handlers.utils.aws_clients import get_client
+from service.handlers.utils.observability import metrics, stage_timer
+
+Handler = Callable[[Dict[str, Any], LambdaContext], Dict[str, Any]]
+
+# event key that idempotent_handler sets to the parsed request body, the JMESPath expressions select the key fields from it
+# instead of parsing the JSON body again with powertools_json(body)
+IDEMPOTENCY_REQUEST_KEY = 'idempotency_request'
 
-from service.handlers.schemas.env_vars import Idempotency
+IDEMPOTENCY_KEY_HEADER = 'idempotency-key'  # header names are matched case insensitively
 
-IDEMPOTENCY_LAYER = DynamoDBPersistenceLayer(table_name=get_environment_variables(model=Idempotency).IDEMPOTENCY_TABLE_NAME)
 IDEMPOTENCY_ORDERS_CONFIG = IdempotencyConfig(
     expires_after_seconds=5 * 60,  # 5 minutes
-    event_key_jmespath='powertools_json(body).[customer_name, order_item_count]',
+    event_key_jmespath=f'{IDEMPOTENCY_REQUEST_KEY}.[customer_name, order_item_count]',
+)
+IDEMPOTENCY_ORDERS_BATCH_CONFIG = IdempotencyConfig(
+    expires_after_seconds=5 * 60,  # 5 minutes
+    event_key_jmespath=f'{IDEMPOTENCY_REQUEST_KEY}.orders',
 )
 IDEMPOTENCY_USERS_CONFIG = IdempotencyConfig(
     expires_after_seconds=5 * 60,  # 5 minutes
-    event_key_jmespath='powertools_json(body).[user_name, email]',
+    event_key_jmespath=f'{IDEMPOTENCY_REQUEST_KEY}.[user_name, email]',
 )
+
+
+class _TimedDynamoDBPersistenceLayer(DynamoDBPersistenceLayer):
+    """ records the idempotency table reads and writes around the handler as the 'Idempotency' stage
+
+        Completed records are also kept in a bounded in-container LRU until their expiry, a retry that lands on the same warm
+        container is answered without the conditional put and the get. Every lookup the cache answers saves one DynamoDB round
+        trip and is emitted as an 'IdempotencyCacheHit' metric, lookups that go to the table as 'IdempotencyCacheMiss'.
+    """
+
+    def configure(self, config: IdempotencyConfig, function_name: Optional[str] = None) -> None:
+        configured = self.configured
+        super().configure(config, function_name)
+        if configured:
+            return
+        max_items = get_environment_variables(model=IdempotencyCache).IDEMPOTENCY_CACHE_MAX_ITEMS
+        self.use_local_cache = max_items > 0
+        if self.use_local_cache:
+            self._cache = LRUDict(max_items=max_items)
+
+    def _retrieve_from_cache(self, idempotency_key: str) -> Optional[DataRecord]:
+        if not self.use_local_cache:
+            return None
+        record = super()._retrieve_from_cache(idempotency_key)
+        metrics.add_metric(name='IdempotencyCacheMiss' if record is None else 'IdempotencyCacheHit', unit=MetricUnit.Count, value=1)
+        return record
+
+    def save_inprogress(self, data: Dict[str, Any], remaining_time_in_millis: Optional[int] = None) -> None:
+        with stage_timer.stage('Idempotency'):
+            super().save_inprogress(data, remaining_time_in_millis)
+
+    def save_success(self, data: Dict[str, Any], result: dict) -> None:
+        with stage_timer.stage('Idempotency'):
+            super().save_success(data, result)
+
+    def get_record(self, data: Dict[str, Any]) -> Optional[DataRecord]:
+        with stage_timer.stage('Idempotency'):
+            return super().get_record(data)
+
+
+@functools.lru_cache(maxsize=None)
+def get_idempotency_layer(config: IdempotencyConfig) -> DynamoDBPersistenceLayer:
+    """ persistence layer of the idempotency table with the shared DynamoDB client, one per config
+
+        A powertools persistence layer keeps the first config it is used with, handlers served by the same router lambda
+        need a layer each.
+    """
+    return _TimedDynamoDBPersistenceLayer(
+        table_name=get_environment_variables(model=Idempotency).IDEMPOTENCY_TABLE_NAME,
+        boto3_client=get_client('dynamodb'),
+    )
+
+
+def get_idempotency_key(event: Dict[str, Any]) -> Optional[str]:
+    """ Idempotency-Key header of the request in the 'key' IDEMPOTENCY_MODE, None in the 'table' mode or without the header """
+    if get_environment_variables(model=Idempotency).IDEMPOTENCY_MODE != 'key':
+        return None
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == IDEMPOTENCY_KEY_HEADER and value:
+            return value
+    return None
+
+
+def id_from_idempotency_key(idempotency_key: str, entity: str) -> str:
+    """ entity id in UUID v4 format derived from the client's idempotency key, retries of a request name the same entity
+
+        The entity name keeps the ids of an order and a user created with the same key apart.
+    """
+    digest = hashlib.sha256(f'{entity}#{idempotency_key}'.encode()).digest()
+    return str(uuid.UUID(bytes=digest[:16], version=4))
+
+
+def idempotent_handler(config: IdempotencyConfig, model: Type[BaseModel], key_mode: bool = False) -> Callable[[Handler], Handler]:
+    """ powertools idempotent decorator that builds its persistence layer and DynamoDB client on the first call
+
+        The client takes ~150ms to create, building it when the handler module is imported made it part of every INIT.
+        The body is parsed once with the request model, the idempotency key is selected from that parse and the handler's own
+        parse_body call of the same body returns it. Requests that fail validation go straight to the handler, which answers 400,
+        and are not recorded. With key_mode, for handlers that derive the entity id from the key, requests with an Idempotency-Key
+        header in the 'key' IDEMPOTENCY_MODE go straight to the handler as well, the entity write itself is idempotent.
+    """
+
+    def decorator(handler: Handler) -> Handler:
+
+        @functools.wraps(handler)
+        def wrapper(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+            try:
+                request = parse_body(event=event, model=model)
+            except (ValidationError, TypeError):
+                return handler(event, context)
+            if key_mode and get_idempotency_key(event) is not None:
+                return handler(event, context)
+            keyed_event = {**event, IDEMPOTENCY_REQUEST_KEY: request.model_dump(mode='json')}
+            return idempotent(handler, persistence_store=get_idempotency_layer(config), config=config)(keyed_event, context)
+
+        return wrapper
+
+    return decorator
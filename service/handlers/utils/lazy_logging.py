@@ -0,0 +1,42 @@
+import logging
+import random
+from typing import Any, Callable, Mapping, Optional, Union
+
+from aws_lambda_powertools.logging.logger import Logger
+
+from service.handlers.schemas.dynamic_configuration import LoggingConfiguration
+
+# an extra payload, or a callable that builds it, e.g. env_vars.model_dump
+Extra = Union[Mapping[str, Any], Callable[[], Mapping[str, Any]]]
+
+
+class LazyLogger:
+    """ facade over the powertools logger that builds extra payloads only for records that are emitted
+
+        Debug records are sampled per invocation: apply_settings draws the sample when the invocation starts, so a sampled
+        invocation keeps all its debug records and the others skip them without building their payloads.
+    """
+
+    def __init__(self, logger: Logger) -> None:
+        self._logger = logger
+        self._environment_level = logger.log_level  # LOG_LEVEL environment variable
+        self._debug_sampled = True
+
+    def apply_settings(self, settings: LoggingConfiguration) -> None:
+        """ log level and debug sample rate of this invocation from the dynamic configuration, changes need no redeploy """
+        level = self._environment_level if settings.log_level is None else logging.getLevelName(settings.log_level)
+        if level != self._logger.log_level:
+            self._logger.setLevel(level)
+        self._debug_sampled = settings.debug_sample_rate >= 1 or random.random() < settings.debug_sample_rate
+
+    def debug(self, msg: str, extra: Optional[Extra] = None) -> None:
+        if self._debug_sampled and self._logger.log_level <= logging.DEBUG:
+            self._logger.debug(msg, extra=_build_extra(extra), stacklevel=3)
+
+    def info(self, msg: str, extra: Optional[Extra] = None) -> None:
+        if self._logger.log_level <= logging.INFO:
+            self._logger.info(msg, extra=_build_extra(extra), stacklevel=3)
+
+
+def _build_extra(extra: Optional[Extra]) -> Optional[Mapping[str, Any]]:
+    return extra() if callable(extra) else extra
@@ -2,13 +2,26 @@ from aws_lambda_powertools.logging.logger import Logger
 from aws_lambda_powertools.metrics.metrics import Metrics
 from aws_lambda_powertools.tracing.tracer import Tracer
 
+from service.handlers.utils.adaptive_tracing import AdaptiveTracer
+from service.handlers.utils.lazy_logging import LazyLogger
+from service.handlers.utils.stage_timer import StageTimer
+
 METRICS_NAMESPACE = 'my_product_kpi'
 
 # JSON output format, service name can be set by environment variable "POWERTOOLS_SERVICE_NAME"
 logger: Logger = Logger()
 
+# debug and costly log records, extras are built only when the record is emitted
+lazy_logger = LazyLogger(logger)
+
 # service name can be set by environment variable "POWERTOOLS_SERVICE_NAME". Disabled by setting POWERTOOLS_TRACE_DISABLED to "True"
 tracer: Tracer = Tracer()
 
+# handler and method decorators, method subsegments only for a sampled share of the invocations and for slow or failed ones
+adaptive_tracer = AdaptiveTracer(tracer)
+
 # namespace and service name can be set by environment variable "POWERTOOLS_METRICS_NAMESPACE" and "POWERTOOLS_SERVICE_NAME" accordingly
 metrics = Metrics(namespace=METRICS_NAMESPACE)
+
+# per stage latency of an invocation, e.g. "with stage_timer.stage('DynamoDB'):", emitted with the metrics above
+stage_timer = StageTimer(metrics)
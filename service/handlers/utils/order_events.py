@@ -0,0 +1,50 @@
+from typing import Any, Dict, List, Sequence
+
+from botocore.exceptions import ClientError
+
+from service.dal.batch_utils import chunks
+from service.handlers.utils.observability import logger
+
+SNS_PUBLISH_BATCH_MAX_ENTRIES = 10  # SNS PublishBatch limit per call
+
+
+def order_created_subject(order_id: str) -> str:
+    return f'Order {order_id} created'
+
+
+def order_created_message(order_id: str, customer_name: str, order_item_count: int) -> str:
+    return f"""
+Order Id: [{order_id}]
+Customer Name: [{customer_name}]
+Qty: [{order_item_count}]
+    """
+
+
+def publish_orders_created(client: Any, topic_arn: str, orders: Sequence[Dict[str, Any]]) -> List[str]:
+    """ Publish OrderCreated events with SNS PublishBatch, up to 10 orders per call
+
+        Args:
+            client: boto3 SNS client
+            topic_arn (str): OrderCreated topic ARN
+            orders (Sequence[Dict[str, Any]]): orders with order_id, customer_name and order_item_count keys
+        Returns:
+            List[str]: ids of the orders whose event failed to publish, a failed call fails its whole chunk
+    """
+    failed_order_ids: List[str] = []
+    for chunk in chunks(orders, SNS_PUBLISH_BATCH_MAX_ENTRIES):
+        entries = [{
+            'Id': order['order_id'],
+            'Subject': order_created_subject(order['order_id']),
+            'Message': order_created_message(order['order_id'], order['customer_name'], order['order_item_count']),
+        } for order in chunk]
+        try:
+            response = client.publish_batch(TopicArn=topic_arn, PublishBatchRequestEntries=entries)
+        except ClientError as exc:
+            logger.exception('failed to publish order created events batch', extra={'exception': str(exc)})
+            failed_order_ids.extend(entry['Id'] for entry in entries)
+            continue
+        failed_order_ids.extend(failure['Id'] for failure in response.get('Failed', []))
+
+    if failed_order_ids:
+        logger.error('failed to publish order created events', extra={'order_ids': failed_order_ids})
+    return failed_order_ids
@@ -0,0 +1,58 @@
+from typing import List
+
+from service.dal.factory import get_orders_dal_handler
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.schemas.orders_db import OrderBatchWriteResult
+from service.handlers.schemas.dynamic_configuration import FeatureFlagsNames
+from service.handlers.utils.feature_flags import evaluate_feature_flags_batch
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, stage_timer
+from service.logic.orders.handle_create_request import apply_premium_user_discount, handle_campaign
+from service.schemas.input import CreateOrdersBatchRequest
+from service.schemas.output import CreateOrdersBatchItemOutput, CreateOrdersBatchOutput
+
+
+@adaptive_tracer.capture_method
+def handle_create_batch_request(batch_request: CreateOrdersBatchRequest, table_name: str) -> CreateOrdersBatchOutput:
+    logger.info('starting to handle create batch request', extra={'order_count': len(batch_request.orders)})
+
+    # feature flags example, same flags as a single order create, evaluated for every customer of the batch at once
+    # the first context is the batch itself, without a customer
+    customer_names = sorted({order.customer_name for order in batch_request.orders})
+    with stage_timer.stage('FeatureFlags'):
+        batch_flags, *customer_flags = evaluate_feature_flags_batch(
+            contexts=[{}] + [{
+                'customer_name': customer_name
+            } for customer_name in customer_names],
+            defaults={
+                FeatureFlagsNames.TEN_PERCENT_CAMPAIGN.value: False,
+                FeatureFlagsNames.PREMIUM.value: False
+            },
+        )
+
+    # discount campaign flag - does not depend on the order, applied once per batch
+    if batch_flags[FeatureFlagsNames.TEN_PERCENT_CAMPAIGN.value]:
+        handle_campaign()
+    else:
+        lazy_logger.debug('campaign is off')
+
+    # premium users flag - changes according to customer name
+    for customer_name, flags in zip(customer_names, customer_flags):
+        premium = flags[FeatureFlagsNames.PREMIUM.value]
+        lazy_logger.debug('premium feature flag value', extra={'premium': premium, 'customer_name': customer_name})
+        if premium:
+            apply_premium_user_discount()
+
+    dal_handler: OrdersDalHandler = get_orders_dal_handler(table_name)
+    with stage_timer.stage('Database'):
+        results: List[OrderBatchWriteResult] = dal_handler.create_orders_in_db([
+            (order.customer_name, order.order_item_count) for order in batch_request.orders
+        ])
+    # convert from db entries to output, failed orders are reported without an id
+    return CreateOrdersBatchOutput.model_construct(orders=[
+        CreateOrdersBatchItemOutput.model_construct(
+            customer_name=result.entry.customer_name,
+            order_item_count=result.entry.order_item_count,
+            order_id=result.entry.order_id if result.created else None,
+            created=result.created,
+        ) for result in results
+    ])
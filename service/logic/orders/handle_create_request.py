@@ -1,56 +1,80 @@
-from service.dal.dynamo_orders_dal_handler import get_dal_handler
+from typing import Optional
+
+from service.dal.factory import get_orders_dal_handler
 from service.dal.orders_db_handler import OrdersDalHandler
 from service.dal.schemas.orders_db import OrderEntry
 from service.handlers.schemas.dynamic_configuration import FeatureFlagsNames
-from service.handlers.utils.dynamic_configuration import get_dynamic_configuration_store
-from service.handlers.utils.observability import logger, tracer
+from service.handlers.utils.feature_flags import evaluate_feature_flags
+from service.handlers.utils.idempotency import id_from_idempotency_key
+from service.handlers.utils.observability import adaptive_tracer, lazy_logger, logger, stage_timer
+from service.schemas.exceptions import IdempotencyKeyReusedException
 from service.schemas.input import CreateOrderRequest
 from service.schemas.output import CreateOrderOutput
 
 
-@tracer.capture_method(capture_response=False)
-def handle_create_request(order_request: CreateOrderRequest, table_name: str) -> CreateOrderOutput:
+@adaptive_tracer.capture_method
+def handle_create_request(order_request: CreateOrderRequest, table_name: str, outbox_table_name: Optional[str] = None,
+                          idempotency_key: Optional[str] = None) -> CreateOrderOutput:
+    """ with an idempotency key the order id is derived from it and a retry returns the order the first request created
+
+        Raises:
+            IdempotencyKeyReusedException: the key already created an order from a different request
+    """
     logger.info('starting to handle create request', extra={
         'order_item_count': order_request.order_item_count,
         'customer_name': order_request.customer_name
     })
 
-    # feature flags example
-    config_store = get_dynamic_configuration_store()
+    # feature flags example, both flags resolved in one pass over the compiled configuration
+    with stage_timer.stage('FeatureFlags'):
+        flags = evaluate_feature_flags(
+            context={'customer_name': order_request.customer_name},
+            defaults={
+                FeatureFlagsNames.TEN_PERCENT_CAMPAIGN.value: False,
+                FeatureFlagsNames.PREMIUM.value: False
+            },
+        )
 
     # discount campaign flag
-    campaign = config_store.evaluate(
-        name=FeatureFlagsNames.TEN_PERCENT_CAMPAIGN.value,
-        context={},
-        default=False,
-    )
-    if campaign:
+    if flags[FeatureFlagsNames.TEN_PERCENT_CAMPAIGN.value]:
         handle_campaign()
     else:
-        logger.debug('campaign is off')
+        lazy_logger.debug('campaign is off')
 
     # premium users flag - changes according to customer name
-    premium = config_store.evaluate(
-        name=FeatureFlagsNames.PREMIUM.value,
-        context={'customer_name': order_request.customer_name},
-        default=False,
-    )
-
-    logger.debug('premium feature flag value', extra={'premium': premium})
+    premium = flags[FeatureFlagsNames.PREMIUM.value]
+    lazy_logger.debug('premium feature flag value', extra={'premium': premium})
     if premium:
         apply_premium_user_discount()
 
-    dal_handler: OrdersDalHandler = get_dal_handler(table_name)
-    order: OrderEntry = dal_handler.create_order_in_db(order_request.customer_name, order_request.order_item_count)
+    dal_handler: OrdersDalHandler = get_orders_dal_handler(table_name)
+    # with an outbox table the OrderCreated event is written with the order and published by the outbox relay
+    with stage_timer.stage('Database'):
+        if idempotency_key is None:
+            order: OrderEntry = dal_handler.create_order_in_db(order_request.customer_name, order_request.order_item_count, outbox_table_name)
+        else:
+            order = _create_order_once(dal_handler, order_request, outbox_table_name, idempotency_key)
     # convert from db entry to output, they won't always be the same
-    return CreateOrderOutput(customer_name=order.customer_name, order_item_count=order.order_item_count, order_id=order.order_id)
+    return CreateOrderOutput.model_construct(customer_name=order.customer_name, order_item_count=order.order_item_count, order_id=order.order_id)
+
+
+def _create_order_once(dal_handler: OrdersDalHandler, order_request: CreateOrderRequest, outbox_table_name: Optional[str],
+                       idempotency_key: str) -> OrderEntry:
+    order_id = id_from_idempotency_key(idempotency_key, entity='order')
+    result = dal_handler.create_order_with_id_in_db(order_id, order_request.customer_name, order_request.order_item_count, outbox_table_name)
+    if result.created:
+        return result.entry
+    if (result.entry.customer_name, result.entry.order_item_count) != (order_request.customer_name, order_request.order_item_count):
+        raise IdempotencyKeyReusedException(f'idempotency key of order {order_id} was reused with a different request')
+    logger.info('order was created by an earlier request with the same idempotency key', extra={'order_id': order_id})
+    return result.entry
 
 
 def handle_campaign():
-    logger.debug('campaign feature flag is on')
+    lazy_logger.debug('campaign feature flag is on')
     return
 
 
 def apply_premium_user_discount():
-    logger.debug('premium user detected')
+    lazy_logger.debug('premium user detected')
     return
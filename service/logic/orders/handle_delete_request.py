@@ -1,18 +1,24 @@
-from service.dal.dynamo_orders_dal_handler import get_dal_handler
+from typing import Optional
+
+from service.dal.factory import get_orders_dal_handler
 from service.dal.orders_db_handler import OrdersDalHandler
-from service.dal.schemas.orders_db import OrderBase
-from service.handlers.utils.observability import logger, tracer
+from service.dal.schemas.orders_db import OrderEntry
+from service.handlers.utils.observability import adaptive_tracer, logger, stage_timer
 from service.schemas.input import DeleteOrderRequest
 from service.schemas.output import DeleteOrderOutput
 
 
-@tracer.capture_method(capture_response=False)
-def handle_delete_request(delete_request: DeleteOrderRequest, table_name: str) -> DeleteOrderOutput:
+@adaptive_tracer.capture_method
+def handle_delete_request(delete_request: DeleteOrderRequest, table_name: str) -> Optional[DeleteOrderOutput]:
     logger.info('starting to handle delete request', extra={
         'order_id': delete_request.order_id,
     })
 
-    dal_handler: OrdersDalHandler = get_dal_handler(table_name)
-    order: OrderBase = dal_handler.delete_order_in_db(delete_request.order_id)
-    # convert from db entry to output; might be already deleted or never existed
-    return DeleteOrderOutput(order_id=order.order_id)
+    dal_handler: OrdersDalHandler = get_orders_dal_handler(table_name)
+    with stage_timer.stage('Database'):
+        order: Optional[OrderEntry] = dal_handler.delete_order_in_db(delete_request.order_id)
+    if order is None:
+        # already deleted or never existed
+        return None
+    # convert from db entry to output;
+    return DeleteOrderOutput.model_construct(customer_name=order.customer_name, order_item_count=order.order_item_count, order_id=order.order_id)
@@ -0,0 +1,25 @@
+from service.dal.factory import get_orders_dal_handler
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.schemas.orders_db import OrdersBatchGetResult
+from service.handlers.utils.observability import adaptive_tracer, logger, stage_timer
+from service.schemas.input import GetOrdersBatchRequest
+from service.schemas.output import GetOrderOutput, GetOrdersBatchOutput
+
+
+@adaptive_tracer.capture_method
+def handle_get_batch_request(get_request: GetOrdersBatchRequest, table_name: str) -> GetOrdersBatchOutput:
+    logger.info('starting to handle get batch request', extra={
+        'order_count': len(get_request.order_ids),
+    })
+
+    dal_handler: OrdersDalHandler = get_orders_dal_handler(table_name)
+    with stage_timer.stage('Database'):
+        result: OrdersBatchGetResult = dal_handler.get_orders_in_db(get_request.order_ids)
+    # convert from db entries to output;
+    return GetOrdersBatchOutput.model_construct(
+        orders=[
+            GetOrderOutput.model_construct(customer_name=order.customer_name, order_item_count=order.order_item_count, order_id=order.order_id)
+            for order in result.found
+        ],
+        missing_order_ids=result.missing_order_ids,
+    )
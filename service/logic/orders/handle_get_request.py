@@ -1,23 +1,24 @@
 from typing import Optional
 
-from service.dal.dynamo_orders_dal_handler import get_dal_handler
+from service.dal.factory import get_orders_dal_handler
 from service.dal.orders_db_handler import OrdersDalHandler
 from service.dal.schemas.orders_db import OrderEntry
-from service.handlers.utils.observability import logger, tracer
+from service.handlers.utils.observability import adaptive_tracer, logger, stage_timer
 from service.schemas.input import GetOrderRequest
 from service.schemas.output import GetOrderOutput
 
 
-@tracer.capture_method(capture_response=False)
+@adaptive_tracer.capture_method
 def handle_get_request(get_request: GetOrderRequest, table_name: str) -> Optional[GetOrderOutput]:
     logger.info('starting to handle get request', extra={
         'order_id': get_request.order_id,
     })
 
-    dal_handler: OrdersDalHandler = get_dal_handler(table_name)
-    order: Optional[OrderEntry] = dal_handler.get_order_in_db(get_request.order_id)
+    dal_handler: OrdersDalHandler = get_orders_dal_handler(table_name)
+    with stage_timer.stage('Database'):
+        order: Optional[OrderEntry] = dal_handler.get_order_in_db(get_request.order_id)
     if order is not None:
         # convert from db entry to output;
-        return GetOrderOutput(customer_name=order.customer_name, order_item_count=order.order_item_count, order_id=order.order_id)
+        return GetOrderOutput.model_construct(customer_name=order.customer_name, order_item_count=order.order_item_count, order_id=order.order_id)
     else:
         return None
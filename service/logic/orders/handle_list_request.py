@@ -0,0 +1,26 @@
+from service.dal.factory import get_orders_dal_handler
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.schemas.orders_db import OrdersPage
+from service.handlers.utils.observability import adaptive_tracer, logger
+from service.schemas.input import ListOrdersRequest
+from service.schemas.output import GetOrderOutput, ListOrdersOutput
+
+
+@adaptive_tracer.capture_method
+def handle_list_request(list_request: ListOrdersRequest, table_name: str) -> ListOrdersOutput:
+    logger.info('starting to handle list request', extra={
+        'customer_name': list_request.customer_name,
+        'limit': list_request.limit,
+    })
+
+    dal_handler: OrdersDalHandler = get_orders_dal_handler(table_name)
+    # one page per API call, the client asks for the next one with the returned cursor so there is nothing to prefetch
+    page: OrdersPage = next(dal_handler.list_orders_by_customer(list_request.customer_name, list_request.limit, list_request.cursor, prefetch=False))
+    # convert from db entries to output;
+    return ListOrdersOutput.model_construct(
+        orders=[
+            GetOrderOutput.model_construct(customer_name=order.customer_name, order_item_count=order.order_item_count, order_id=order.order_id)
+            for order in page.orders
+        ],
+        cursor=page.cursor,
+    )
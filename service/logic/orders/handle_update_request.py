@@ -0,0 +1,28 @@
+from typing import Optional
+
+from service.dal.factory import get_orders_dal_handler
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.schemas.orders_db import OrderChanges
+from service.handlers.utils.observability import adaptive_tracer, logger, stage_timer
+from service.schemas.input import UpdateOrderRequest
+from service.schemas.output import UpdateOrderOutput
+
+
+@adaptive_tracer.capture_method
+def handle_update_request(update_request: UpdateOrderRequest, table_name: str) -> Optional[UpdateOrderOutput]:
+    logger.info('starting to handle update request', extra={
+        'order_id': update_request.order_id,
+    })
+
+    dal_handler: OrdersDalHandler = get_orders_dal_handler(table_name)
+    with stage_timer.stage('Database'):
+        changes: Optional[OrderChanges] = dal_handler.update_order_in_db(
+            update_request.order_id,
+            customer_name=update_request.customer_name,
+            order_item_count=update_request.order_item_count,
+        )
+    if changes is None:
+        return None
+    # convert from db changes to output;
+    return UpdateOrderOutput.model_construct(order_id=changes.order_id, customer_name=changes.customer_name,
+                                             order_item_count=changes.order_item_count)
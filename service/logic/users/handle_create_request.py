@@ -1,19 +1,43 @@
-from service.dal.dynamo_users_dal_handler import get_dal_handler
+from typing import Optional
+
+from service.dal.factory import get_users_dal_handler
 from service.dal.schemas.users_db import UserEntry
 from service.dal.users_db_handler import UsersDalHandler
-from service.handlers.utils.observability import logger, tracer
+from service.handlers.utils.idempotency import id_from_idempotency_key
+from service.handlers.utils.observability import adaptive_tracer, logger, stage_timer
+from service.schemas.exceptions import IdempotencyKeyReusedException
 from service.schemas.input import CreateUserRequest
 from service.schemas.output import CreateUserOutput
 
 
-@tracer.capture_method(capture_response=False)
-def handle_create_request(user_request: CreateUserRequest, table_name: str) -> CreateUserOutput:
+@adaptive_tracer.capture_method
+def handle_create_request(user_request: CreateUserRequest, table_name: str, idempotency_key: Optional[str] = None) -> CreateUserOutput:
+    """ with an idempotency key the user id is derived from it and a retry returns the user the first request created
+
+        Raises:
+            IdempotencyKeyReusedException: the key already created a user from a different request
+    """
     logger.info('starting to handle create user request', extra={
         'user_name': user_request.user_name,
         'email': user_request.email,
     })
 
-    dal_handler: UsersDalHandler = get_dal_handler(table_name)
-    user: UserEntry = dal_handler.create_user_in_db(user_name=user_request.user_name, email=user_request.email)
+    dal_handler: UsersDalHandler = get_users_dal_handler(table_name)
+    with stage_timer.stage('Database'):
+        if idempotency_key is None:
+            user: UserEntry = dal_handler.create_user_in_db(user_name=user_request.user_name, email=user_request.email)
+        else:
+            user = _create_user_once(dal_handler, user_request, idempotency_key)
     # convert from db entry to output, they won't always be the same
-    return CreateUserOutput(user_name=user.user_name, email=user.email, user_id=user.user_id)
+    return CreateUserOutput.model_construct(user_name=user.user_name, email=user.email, user_id=user.user_id)
+
+
+def _create_user_once(dal_handler: UsersDalHandler, user_request: CreateUserRequest, idempotency_key: str) -> UserEntry:
+    user_id = id_from_idempotency_key(idempotency_key, entity='user')
+    result = dal_handler.create_user_with_id_in_db(user_id=user_id, user_name=user_request.user_name, email=user_request.email)
+    if result.created:
+        return result.entry
+    if (result.entry.user_name, result.entry.email) != (user_request.user_name, user_request.email):
+        raise IdempotencyKeyReusedException(f'idempotency key of user {user_id} was reused with a different request')
+    logger.info('user was created by an earlier request with the same idempotency key', extra={'user_id': user_id})
+    return result.entry
@@ -1,18 +1,24 @@
-from service.dal.dynamo_users_dal_handler import get_dal_handler
-from service.dal.schemas.users_db import UserBase
+from typing import Optional
+
+from service.dal.factory import get_users_dal_handler
+from service.dal.schemas.users_db import UserEntry
 from service.dal.users_db_handler import UsersDalHandler
-from service.handlers.utils.observability import logger, tracer
+from service.handlers.utils.observability import adaptive_tracer, logger, stage_timer
 from service.schemas.input import DeleteUserRequest
 from service.schemas.output import DeleteUserOutput
 
 
-@tracer.capture_method(capture_response=False)
-def handle_delete_request(delete_request: DeleteUserRequest, table_name: str) -> DeleteUserOutput:
+@adaptive_tracer.capture_method
+def handle_delete_request(delete_request: DeleteUserRequest, table_name: str) -> Optional[DeleteUserOutput]:
     logger.info('starting to handle delete user request', extra={
         'user_id': delete_request.user_id,
     })
 
-    dal_handler: UsersDalHandler = get_dal_handler(table_name)
-    user: UserBase = dal_handler.delete_user_in_db(delete_request.user_id)
-    # convert from db entry to output; might be already deleted or never existed
-    return DeleteUserOutput(user_id=user.user_id)
+    dal_handler: UsersDalHandler = get_users_dal_handler(table_name)
+    with stage_timer.stage('Database'):
+        user: Optional[UserEntry] = dal_handler.delete_user_in_db(delete_request.user_id)
+    if user is None:
+        # already deleted or never existed
+        return None
+    # convert from db entry to output;
+    return DeleteUserOutput.model_construct(user_id=user.user_id, user_name=user.user_name, email=user.email)
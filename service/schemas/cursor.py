@@ -0,0 +1,30 @@
+import base64
+import binascii
+import struct
+import uuid
+from typing import Tuple
+
+_CURSOR_FORMAT = '>q16s'  # created_at epoch milliseconds, order_id uuid bytes
+_CURSOR_SIZE = struct.calcsize(_CURSOR_FORMAT)
+
+
+def encode_order_cursor(created_at: int, order_id: str) -> str:
+    """ compact opaque cursor after an order in the orders by customer listing, 32 url safe characters """
+    raw = struct.pack(_CURSOR_FORMAT, created_at, uuid.UUID(order_id).bytes)
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_order_cursor(cursor: str) -> Tuple[int, str]:
+    """ returns (created_at, order_id) of a cursor created by encode_order_cursor
+
+        Raises:
+            ValueError: the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+    except (binascii.Error, UnicodeEncodeError) as exc:
+        raise ValueError('invalid cursor') from exc
+    if len(raw) != _CURSOR_SIZE:
+        raise ValueError('invalid cursor')
+    created_at, order_id = struct.unpack(_CURSOR_FORMAT, raw)
+    return created_at, str(uuid.UUID(bytes=order_id))
@@ -1,2 +1,7 @@
 class InternalServerException(Exception):
     pass
+
+
+class IdempotencyKeyReusedException(Exception):
+    """ the Idempotency-Key of the request already created an entity from a different payload """
+    pass
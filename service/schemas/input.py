@@ -1,7 +1,15 @@
-from typing import Annotated
+from typing import Annotated, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field, PositiveInt, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, PositiveInt, field_validator, model_validator
+
+from service.schemas.cursor import decode_order_cursor
+
+MAX_ORDERS_PER_BATCH = 500
+# order ids of a batch get travel in the query string, 100 uuids keep the URL well under the API Gateway limit
+MAX_ORDER_IDS_PER_GET = 100
+MAX_ORDERS_PER_PAGE = 100
+DEFAULT_ORDERS_PER_PAGE = 25
 
 
 class CreateOrderRequest(BaseModel):
@@ -9,6 +17,10 @@ class CreateOrderRequest(BaseModel):
     order_item_count: PositiveInt
 
 
+class CreateOrdersBatchRequest(BaseModel):
+    orders: Annotated[List[CreateOrderRequest], Field(min_length=1, max_length=MAX_ORDERS_PER_BATCH)]
+
+
 class DeleteOrderRequest(BaseModel):
     order_id: str
 
@@ -25,7 +37,53 @@ class GetOrderRequest(DeleteOrderRequest):
     ...  # pragma: no cover
 
 
+class UpdateOrderRequest(DeleteOrderRequest):
+    customer_name: Optional[Annotated[str, Field(min_length=1, max_length=20)]] = None
+    order_item_count: Optional[PositiveInt] = None
+
+    @model_validator(mode='after')
+    def has_changes(self):
+        if self.customer_name is None and self.order_item_count is None:
+            raise ValueError('customer_name or order_item_count must be set')
+        return self
+
+
+class GetOrdersBatchRequest(BaseModel):
+    order_ids: Annotated[List[str], Field(min_length=1, max_length=MAX_ORDER_IDS_PER_GET)]
+
+    @field_validator('order_ids', mode='before')
+    def split_order_ids(cls, v):
+        # ids arrive as a single comma separated query string parameter
+        if isinstance(v, str):
+            return [order_id.strip() for order_id in v.split(',') if order_id.strip()]
+        return v
+
+    @field_validator('order_ids')
+    def valid_uuids(cls, v):
+        for order_id in v:
+            try:
+                UUID(order_id, version=4)
+            except Exception as exc:
+                raise ValueError(str(exc))
+        return v
+
+
+class ListOrdersRequest(BaseModel):
+    customer_name: Annotated[str, Field(min_length=1, max_length=20)]
+    limit: Annotated[int, Field(ge=1, le=MAX_ORDERS_PER_PAGE)] = DEFAULT_ORDERS_PER_PAGE
+    cursor: Optional[str] = None  # cursor of the previous page, omitted for the first page
+
+    @field_validator('cursor')
+    def valid_cursor(cls, v):
+        if v is not None:
+            decode_order_cursor(v)
+        return v
+
+
 class CreateUserRequest(BaseModel):
+    # EmailStr imports email_validator when the schema is built, defer it to the first validation so the orders handlers never load it
+    model_config = ConfigDict(defer_build=True)
+
     user_name: Annotated[str, Field(min_length=1, max_length=20)]
     email: EmailStr
 
@@ -1,7 +1,10 @@
-from typing import Annotated
+from typing import Annotated, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field, PositiveInt, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, PositiveInt, field_validator
+
+# the logic modules build outputs from DAL entries with model_construct, the entries were validated when written and
+# the validators below are not run again. Handlers serialize them with build_model_response
 
 
 class CreateOrderOutput(BaseModel):
@@ -22,8 +25,41 @@ class GetOrderOutput(CreateOrderOutput):
     ...  # pragma: no cover
 
 
-class DeleteOrderOutput(BaseModel):
+class ListOrdersOutput(BaseModel):
+    orders: List[GetOrderOutput]  # newest first
+    cursor: Optional[str] = None  # pass as the cursor query string parameter to get the next page, None on the last page
+
+
+class CreateOrdersBatchItemOutput(BaseModel):
+    order_item_count: PositiveInt
+    customer_name: Annotated[str, Field(min_length=1, max_length=20)]
+    order_id: Optional[str] = None  # only set when the order was created
+    created: bool
+
+    @field_validator('order_id')
+    def valid_uuid(cls, v):
+        if v is None:
+            return v
+        try:
+            UUID(v, version=4)
+        except Exception as exc:
+            raise ValueError(str(exc))
+        return v
+
+
+class CreateOrdersBatchOutput(BaseModel):
+    orders: List[CreateOrdersBatchItemOutput]  # same order as the request
+
+
+class DeleteOrderOutput(CreateOrderOutput):
+    ...  # pragma: no cover
+
+
+class UpdateOrderOutput(BaseModel):
     order_id: str
+    # only the attributes that were changed are set
+    customer_name: Optional[Annotated[str, Field(min_length=1, max_length=20)]] = None
+    order_item_count: Optional[PositiveInt] = None
 
     @field_validator('order_id')
     def valid_uuid(cls, v):
@@ -35,6 +71,8 @@ class DeleteOrderOutput(BaseModel):
 
 
 class CreateUserOutput(BaseModel):
+    model_config = ConfigDict(defer_build=True)  # same as CreateUserRequest, email_validator is imported on first use
+
     user_name: Annotated[str, Field(min_length=1, max_length=20)]
     email: EmailStr
     user_id: str
@@ -52,13 +90,10 @@ class GetUserOutput(CreateUserOutput):
     ...  # pragma: no cover
 
 
-class DeleteUserOutput(BaseModel):
-    user_id: str
+class DeleteUserOutput(CreateUserOutput):
+    ...  # pragma: no cover
 
-    @field_validator('user_id')
-    def valid_uuid(cls, v):
-        try:
-            UUID(v, version=4)
-        except Exception as exc:
-            raise ValueError(str(exc))
-        return v
+
+class GetOrdersBatchOutput(BaseModel):
+    orders: List[GetOrderOutput]  # in the order of the requested ids
+    missing_order_ids: List[str]
@@ -0,0 +1,42 @@
+import json
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from cdk.service.constants import ORDERS_APIGATEWAY, ORDERS_GW_BATCH_RESOURCE, ORDERS_GW_RESOURCE
+from service.schemas.input import CreateOrderRequest, CreateOrdersBatchRequest
+from tests.utils import generate_random_string, get_stack_output
+
+
+@pytest.fixture(scope='module', autouse=True)
+def api_gw_url():
+    return f'{get_stack_output(ORDERS_APIGATEWAY)}api/{ORDERS_GW_RESOURCE}'
+
+
+def test_handler_200_ok(api_gw_url):
+    customer_name = f'{generate_random_string()}-RanTheBuilder'
+    orders = [CreateOrderRequest(customer_name=customer_name, order_item_count=count) for count in range(1, 31)]
+    body = CreateOrdersBatchRequest(orders=orders)
+    response = requests.post(f'{api_gw_url}/{ORDERS_GW_BATCH_RESOURCE}', data=body.model_dump_json())
+    assert response.status_code == HTTPStatus.OK
+    body_dict = json.loads(response.text)
+    assert len(body_dict['orders']) == 30
+    for count, order in enumerate(body_dict['orders'], start=1):
+        assert order['created']
+        assert order['order_id']
+        assert order['customer_name'] == customer_name
+        assert order['order_item_count'] == count
+
+    # created orders can be fetched one by one
+    order_id = body_dict['orders'][0]['order_id']
+    response_get = requests.get(api_gw_url, headers={'order_id': order_id})
+    assert response_get.status_code == HTTPStatus.OK
+
+
+def test_handler_bad_request(api_gw_url):
+    body_str = json.dumps({'orders': [{'order_item_count': 5}]})
+    response = requests.post(f'{api_gw_url}/{ORDERS_GW_BATCH_RESOURCE}', data=body_str)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    body_dict = json.loads(response.text)
+    assert body_dict == {}
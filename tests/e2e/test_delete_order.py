@@ -32,11 +32,17 @@ def test_handler_200_ok(api_gw_url):
     body = json.loads(response.text)
     assert body['order_id']
     assert body['order_id'] == order_id
+    assert body['customer_name'] == customer_name
+    assert body['order_item_count'] == 5
 
     # assert failing to get the order
     response_get = requests.get(api_gw_url, headers={'order_id': order_id})
     assert response_get.status_code == HTTPStatus.NOT_FOUND
 
+    # deleting again finds nothing
+    response = requests.delete(api_gw_url, data=inputs.model_dump_json())
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
 
 def test_handler_bad_request(api_gw_url):
     order_id = f'non-uuid-string-{generate_random_string()}'
@@ -33,11 +33,17 @@ def test_handler_200_ok(api_gw_url):
     body = json.loads(response.text)
     assert body['user_id']
     assert body['user_id'] == user_id
+    assert body['user_name'] == user_name
+    assert body['email'] == email
 
     # assert failing to get the user
     response_get = requests.get(api_gw_url, headers={'user_id': user_id})
     assert response_get.status_code == HTTPStatus.NOT_FOUND
 
+    # deleting again finds nothing
+    response = requests.delete(api_gw_url, data=inputs.model_dump_json())
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
 
 def test_handler_bad_request(api_gw_url):
     user_id = f'non-uuid-string-{generate_random_string()}'
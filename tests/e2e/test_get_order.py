@@ -48,3 +48,33 @@ def test_handler_not_found(api_gw_url):
     assert response.status_code == HTTPStatus.NOT_FOUND
     body_dict = json.loads(response.text)
     assert body_dict == {}
+
+
+def test_list_customer_orders(api_gw_url):
+    customer_name = f'{generate_random_string()}-RanTheBuilder'
+    order_ids = []
+    for order_item_count in (1, 2, 3):
+        create_inputs = CreateOrderRequest(customer_name=customer_name, order_item_count=order_item_count)
+        response_create = requests.post(api_gw_url, data=create_inputs.model_dump_json())
+        assert response_create.status_code == HTTPStatus.OK
+        order_ids.append(json.loads(response_create.text)['order_id'])
+
+    # follow the cursors, the index is eventually consistent so listed orders may lag behind the creates
+    listed_ids = []
+    params = {'customer_name': customer_name, 'limit': '2'}
+    while True:
+        response = requests.get(api_gw_url, params=params)
+        assert response.status_code == HTTPStatus.OK
+        body = json.loads(response.text)
+        assert len(body['orders']) <= 2
+        listed_ids += [order['order_id'] for order in body['orders']]
+        if body['cursor'] is None:
+            break
+        params['cursor'] = body['cursor']
+    assert set(listed_ids) <= set(order_ids)
+
+
+def test_list_customer_orders_bad_cursor(api_gw_url):
+    response = requests.get(api_gw_url, params={'customer_name': 'customer', 'cursor': 'not-a-cursor'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert json.loads(response.text) == {}
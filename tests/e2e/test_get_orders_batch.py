@@ -0,0 +1,42 @@
+import json
+import uuid
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from cdk.service.constants import ORDERS_APIGATEWAY, ORDERS_GW_BATCH_RESOURCE, ORDERS_GW_RESOURCE
+from service.schemas.input import CreateOrderRequest
+from tests.utils import generate_random_string, get_stack_output
+
+
+@pytest.fixture(scope='module', autouse=True)
+def api_gw_url():
+    return f'{get_stack_output(ORDERS_APIGATEWAY)}api/{ORDERS_GW_RESOURCE}'
+
+
+def test_handler_200_ok(api_gw_url):
+    customer_name = f'{generate_random_string()}-RanTheBuilder'
+    order_ids = []
+    for order_item_count in (1, 2):
+        create_inputs = CreateOrderRequest(customer_name=customer_name, order_item_count=order_item_count)
+        response_create = requests.post(api_gw_url, data=create_inputs.model_dump_json())
+        assert response_create.status_code == HTTPStatus.OK
+        order_ids.append(json.loads(response_create.text)['order_id'])
+
+    # get both orders and one that does not exist
+    missing_order_id = str(uuid.uuid4())
+    response = requests.get(f'{api_gw_url}/{ORDERS_GW_BATCH_RESOURCE}', params={'order_ids': ','.join(order_ids + [missing_order_id])})
+    assert response.status_code == HTTPStatus.OK
+    body = json.loads(response.text)
+    assert [order['order_id'] for order in body['orders']] == order_ids
+    assert [order['order_item_count'] for order in body['orders']] == [1, 2]
+    assert body['missing_order_ids'] == [missing_order_id]
+
+
+def test_handler_bad_request(api_gw_url):
+    order_id = f'non-uuid-string-{generate_random_string()}'
+    response = requests.get(f'{api_gw_url}/{ORDERS_GW_BATCH_RESOURCE}', params={'order_ids': order_id})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    body_dict = json.loads(response.text)
+    assert body_dict == {}
@@ -0,0 +1,49 @@
+import json
+import uuid
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from cdk.service.constants import ORDERS_APIGATEWAY, ORDERS_GW_RESOURCE
+from service.schemas.input import CreateOrderRequest, UpdateOrderRequest
+from tests.utils import generate_random_string, get_stack_output
+
+
+@pytest.fixture(scope='module', autouse=True)
+def api_gw_url():
+    return f'{get_stack_output(ORDERS_APIGATEWAY)}api/{ORDERS_GW_RESOURCE}'
+
+
+def test_handler_200_ok(api_gw_url):
+    customer_name = f'{generate_random_string()}-RanTheBuilder'
+    create_inputs = CreateOrderRequest(customer_name=customer_name, order_item_count=5)
+    response_create = requests.post(api_gw_url, data=create_inputs.model_dump_json())
+    assert response_create.status_code == HTTPStatus.OK
+    order_id = json.loads(response_create.text)['order_id']
+
+    # update the item count only
+    inputs = UpdateOrderRequest(order_id=order_id, order_item_count=7)
+    response = requests.patch(api_gw_url, data=inputs.model_dump_json(exclude_none=True))
+    assert response.status_code == HTTPStatus.OK
+    assert json.loads(response.text) == {'order_id': order_id, 'order_item_count': 7}
+
+    # the rest of the order is unchanged
+    response_get = requests.get(api_gw_url, headers={'order_id': order_id})
+    assert response_get.status_code == HTTPStatus.OK
+    body = json.loads(response_get.text)
+    assert body['customer_name'] == customer_name
+    assert body['order_item_count'] == 7
+
+
+def test_handler_not_found(api_gw_url):
+    inputs = UpdateOrderRequest(order_id=str(uuid.uuid4()), order_item_count=7)
+    response = requests.patch(api_gw_url, data=inputs.model_dump_json(exclude_none=True))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert json.loads(response.text) == {}
+
+
+def test_handler_bad_request(api_gw_url):
+    response = requests.patch(api_gw_url, data=json.dumps({'order_id': str(uuid.uuid4())}))
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert json.loads(response.text) == {}
@@ -14,4 +14,31 @@ def test_synthesizes_properly():
 
     # verify that we have two API GW - one each for Users and Orders, that is it not deleted by mistake
     template.resource_count_is('AWS::ApiGateway::RestApi', 2)
-    template.resource_count_is('AWS::DynamoDB::Table', 4)  # One main db and one for idempotency for each of Users and Orders
+    template.resource_count_is('AWS::DynamoDB::Table', 5)  # One main db and one for idempotency for each of Users and Orders, and the orders outbox
+
+
+def test_synthesizes_single_function_api():
+    app = App(context={'single_function_api': 'true'})
+
+    service_stack = ServiceStack(app, 'service-test')
+
+    template = Template.from_stack(service_stack)
+
+    # one router lambda per service instead of one lambda per route
+    template.has_resource_properties('AWS::Lambda::Function', {'Handler': 'service.handlers.router.orders_router'})
+    template.has_resource_properties('AWS::Lambda::Function', {'Handler': 'service.handlers.router.users_router'})
+    template.resource_properties_count_is('AWS::Lambda::Function', {'Handler': 'service.handlers.get_order.get_order'}, 0)
+
+
+def test_synthesizes_sqs_buffered_notifications():
+    app = App(context={'sqs_notifications': 'true'})
+
+    service_stack = ServiceStack(app, 'service-test')
+
+    template = Template.from_stack(service_stack)
+
+    # the notification queue and its dead letter queue, consumed in batches with partial batch failures
+    template.resource_count_is('AWS::SQS::Queue', 2)
+    template.has_resource_properties('AWS::SNS::Subscription', {'Protocol': 'sqs'})
+    template.has_resource_properties('AWS::Lambda::EventSourceMapping', {'BatchSize': 10, 'FunctionResponseTypes': ['ReportBatchItemFailures']})
+    template.has_resource_properties('AWS::Lambda::Function', {'Handler': 'service.handlers.notification.email_on_order_create_batch'})
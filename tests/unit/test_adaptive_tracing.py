@@ -0,0 +1,117 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+import pytest
+
+from service.handlers.schemas.dynamic_configuration import TracingConfiguration
+from service.handlers.utils.adaptive_tracing import AdaptiveTracer
+
+NOT_SAMPLED = TracingConfiguration(full_trace_sample_rate=0, slow_request_threshold_ms=1000)
+
+
+@pytest.fixture
+def tracer(mocker):
+    """ powertools tracer double, records the names of the methods called through capture_method """
+    tracer = mocker.MagicMock(disabled=False)
+    tracer.traced_calls = []
+    tracer.capture_lambda_handler.side_effect = lambda handler, capture_response: handler
+
+    def capture_method(capture_response):
+
+        def decorator(method):
+
+            def traced(*args, **kwargs):
+                tracer.traced_calls.append(method.__name__)
+                return method(*args, **kwargs)
+
+            return traced
+
+        return decorator
+
+    tracer.capture_method.side_effect = capture_method
+    return tracer
+
+
+def build_handler(adaptive_tracer: AdaptiveTracer, settings: TracingConfiguration, status_code: int = HTTPStatus.OK, sleep_seconds: float = 0,
+                  fail: bool = False):
+
+    @adaptive_tracer.capture_method
+    def inner():
+        time.sleep(sleep_seconds)
+        if fail:
+            raise ValueError('inner failed')
+
+    @adaptive_tracer.capture_method
+    def outer():
+        inner()
+
+    @adaptive_tracer.capture_lambda_handler
+    def handler(event, context):
+        adaptive_tracer.apply_settings(settings)
+        outer()
+        return {'statusCode': status_code}
+
+    return handler
+
+
+def sent_subsegments(tracer):
+    return [call.args[0].rsplit('.', 1)[-1] for call in tracer.provider.begin_subsegment.call_args_list]
+
+
+def test_sampled_invocation_traces_every_method(tracer):
+    handler = build_handler(AdaptiveTracer(tracer), TracingConfiguration(full_trace_sample_rate=1))
+    handler({}, None)
+    assert tracer.traced_calls == ['outer', 'inner']
+    tracer.provider.begin_subsegment.assert_not_called()
+
+
+def test_fast_invocation_that_is_not_sampled_keeps_only_the_handler_subsegment(tracer):
+    handler = build_handler(AdaptiveTracer(tracer), NOT_SAMPLED)
+    handler({}, None)
+    assert tracer.traced_calls == []
+    tracer.provider.begin_subsegment.assert_not_called()
+
+
+def test_failed_response_sends_the_recorded_calls(tracer):
+    handler = build_handler(AdaptiveTracer(tracer), NOT_SAMPLED, status_code=HTTPStatus.INTERNAL_SERVER_ERROR)
+    handler({}, None)
+    assert tracer.traced_calls == []
+    assert sent_subsegments(tracer) == ['outer', 'inner']
+    assert tracer.provider.end_subsegment.call_count == 2
+    tracer.put_annotation.assert_called_once_with(key='full_trace_reason', value='failed')
+    # inner is sent inside outer, with the times it ran
+    inner_end, outer_end = [call.kwargs['end_time'] for call in tracer.provider.end_subsegment.call_args_list]
+    assert inner_end <= outer_end
+
+
+def test_exception_sends_the_recorded_calls_with_the_error(tracer):
+    handler = build_handler(AdaptiveTracer(tracer), NOT_SAMPLED, fail=True)
+    with pytest.raises(ValueError):
+        handler({}, None)
+    assert sent_subsegments(tracer) == ['outer', 'inner']
+    assert tracer.provider.begin_subsegment.return_value.add_exception.call_count == 2
+
+
+def test_slow_invocation_sends_the_recorded_calls(tracer):
+    handler = build_handler(AdaptiveTracer(tracer), TracingConfiguration(full_trace_sample_rate=0, slow_request_threshold_ms=1), sleep_seconds=0.01)
+    handler({}, None)
+    assert sent_subsegments(tracer) == ['outer', 'inner']
+    tracer.put_annotation.assert_called_once_with(key='full_trace_reason', value='slow')
+
+
+def test_async_methods_are_recorded(tracer):
+    adaptive_tracer = AdaptiveTracer(tracer)
+
+    @adaptive_tracer.capture_method
+    async def fetch():
+        return 'item'
+
+    @adaptive_tracer.capture_lambda_handler
+    def handler(event, context):
+        adaptive_tracer.apply_settings(NOT_SAMPLED)
+        assert asyncio.run(fetch()) == 'item'
+        return {'statusCode': HTTPStatus.BAD_GATEWAY}
+
+    handler({}, None)
+    assert sent_subsegments(tracer) == ['fetch']
@@ -0,0 +1,50 @@
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from service.handlers.utils import apigw_parser
+from service.schemas.input import CreateOrderRequest, GetOrderRequest, ListOrdersRequest
+from tests.utils import generate_api_gw_event
+
+SAMPLES_FOLDER = Path(__file__).parent.parent.parent / 'data_samples'
+ORDER_ID = 'b2f6d3c1-6b4e-4e7a-9d3b-0c2f5d8a1e4f'
+
+
+@pytest.fixture(params=[False, True], ids=['fast', 'full'])
+def full_validation(request, monkeypatch):
+    monkeypatch.setattr(apigw_parser, '_full_validation', lambda: request.param)
+    return request.param
+
+
+def test_parse_body(full_validation):
+    event = generate_api_gw_event({'customer_name': 'customer', 'order_item_count': 5})
+    assert apigw_parser.parse_body(event=event, model=CreateOrderRequest) == CreateOrderRequest(customer_name='customer', order_item_count=5)
+
+
+def test_parse_headers_and_query_string(full_validation):
+    event = generate_api_gw_event(None)
+    event['headers'] = {'order_id': ORDER_ID}
+    event['queryStringParameters'] = {'customer_name': 'customer', 'limit': '10'}
+    assert apigw_parser.parse_headers(event=event, model=GetOrderRequest).order_id == ORDER_ID
+    assert apigw_parser.parse_query_string(event=event, model=ListOrdersRequest).limit == 10
+
+
+def test_parse_invalid_input(full_validation):
+    event = generate_api_gw_event({'customer_name': 'customer', 'order_item_count': 0})
+    with pytest.raises(ValidationError):
+        apigw_parser.parse_body(event=event, model=CreateOrderRequest)
+    event['body'] = 'not json'
+    with pytest.raises(ValidationError):
+        apigw_parser.parse_body(event=event, model=CreateOrderRequest)
+    with pytest.raises(ValidationError):
+        apigw_parser.parse_headers(event=event, model=GetOrderRequest)
+
+
+def test_fast_path_validates_only_the_field_it_reads():
+    # the sample logged with null headers fails APIGatewayProxyEventModel, its body is still a valid create order request
+    event = json.loads((SAMPLES_FOLDER / 'apigw_envelope_event_bad_example.json').read_text())['event']
+    assert apigw_parser.parse_body(event=event, model=CreateOrderRequest).customer_name == 'kk'
+    with pytest.raises(TypeError):
+        apigw_parser.parse_body(event='not an event', model=CreateOrderRequest)
@@ -0,0 +1,27 @@
+from service.handlers.utils import aws_clients
+
+
+def test_clients_are_shared_and_tuned():
+    aws_clients.clear_clients()
+    client = aws_clients.get_client('sns')
+    assert aws_clients.get_client('sns') is client
+    assert client.meta.config.max_pool_connections == aws_clients.AWS_CLIENT_CONFIG.max_pool_connections
+    assert client.meta.config.tcp_keepalive is True
+    assert client.meta.config.retries['mode'] == 'standard'
+
+
+def test_resource_has_its_own_client():
+    resource = aws_clients.get_resource('dynamodb')
+    assert aws_clients.get_resource('dynamodb') is resource
+    assert resource.meta.client is not aws_clients.get_client('dynamodb')
+    assert resource.meta.client.meta.config.connect_timeout == aws_clients.AWS_CLIENT_CONFIG.connect_timeout
+
+
+def test_creation_times_are_recorded(mocker):
+    add_metric = mocker.patch('service.handlers.utils.aws_clients.metrics.add_metric')
+    aws_clients.clear_clients()
+    aws_clients.get_client('sqs')
+    aws_clients.get_client('sqs')
+    assert 'sqs_client' in aws_clients.get_creation_times()
+    add_metric.assert_called_once()
+    assert add_metric.call_args.kwargs['name'] == 'AwsClientCreationTime'
@@ -1,9 +1,12 @@
+import json
 import uuid
+from http import HTTPStatus
 
 import pytest
 from aws_lambda_powertools.utilities.parser import ValidationError
 
-from service.schemas.output import CreateOrderOutput
+from service.handlers.utils.http_responses import build_model_response, build_response
+from service.schemas.output import CreateOrderOutput, UpdateOrderOutput
 
 order_id = str(uuid.uuid4())
 
@@ -30,3 +33,18 @@ def test_invalid_order_id():
 
 def test_valid_output():
     CreateOrderOutput(customer_name='222', order_item_count=4, order_id=order_id)
+
+
+def test_model_response_matches_dict_response():
+    output = CreateOrderOutput.model_construct(order_id=order_id, customer_name='3333', order_item_count=2)
+    response = build_model_response(http_status=HTTPStatus.OK, model=output)
+    expected = build_response(http_status=HTTPStatus.OK, body=output.model_dump())
+    assert response['statusCode'] == expected['statusCode']
+    assert response['headers'] == expected['headers']
+    assert json.loads(response['body']) == json.loads(expected['body'])
+
+
+def test_model_response_exclude_none():
+    output = UpdateOrderOutput.model_construct(order_id=order_id, customer_name=None, order_item_count=4)
+    response = build_model_response(http_status=HTTPStatus.OK, model=output, exclude_none=True)
+    assert json.loads(response['body']) == {'order_id': order_id, 'order_item_count': 4}
@@ -0,0 +1,24 @@
+import pytest
+from aws_lambda_powertools.utilities.parser import ValidationError
+
+from service.schemas.input import MAX_ORDERS_PER_BATCH, CreateOrdersBatchRequest
+
+
+def test_empty_batch():
+    with pytest.raises(ValidationError):
+        CreateOrdersBatchRequest(orders=[])
+
+
+def test_batch_too_large():
+    with pytest.raises(ValidationError):
+        CreateOrdersBatchRequest(orders=[{'customer_name': 'a', 'order_item_count': 1}] * (MAX_ORDERS_PER_BATCH + 1))
+
+
+def test_invalid_order_in_batch():
+    with pytest.raises(ValidationError):
+        CreateOrdersBatchRequest(orders=[{'customer_name': 'a', 'order_item_count': 1}, {'customer_name': 'a', 'order_item_count': -1}])
+
+
+def test_valid_batch():
+    batch = CreateOrdersBatchRequest(orders=[{'customer_name': 'a', 'order_item_count': 1}, {'customer_name': 'b', 'order_item_count': 2}])
+    assert [order.customer_name for order in batch.orders] == ['a', 'b']
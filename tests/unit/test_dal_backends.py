@@ -0,0 +1,168 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Tuple
+
+import pytest
+
+from service.dal import factory
+from service.dal.memory_orders_dal_handler import MemoryOrdersDalHandler
+from service.dal.memory_users_dal_handler import MemoryUsersDalHandler
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.schemas.orders_db import OrdersPage
+from service.dal.sqlite_connections import get_sqlite_connections
+from service.dal.sqlite_orders_dal_handler import SqliteOrdersDalHandler
+from service.dal.sqlite_users_dal_handler import SqliteUsersDalHandler
+from service.dal.users_db_handler import UsersDalHandler
+from service.handlers.schemas.env_vars import DalBackend
+from service.logic.users.handle_create_request import handle_create_request
+from service.schemas.exceptions import IdempotencyKeyReusedException, InternalServerException
+from service.schemas.input import CreateUserRequest
+
+BACKENDS = {
+    'memory': (MemoryOrdersDalHandler, MemoryUsersDalHandler),
+    'sqlite': (SqliteOrdersDalHandler, SqliteUsersDalHandler),
+}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def dal_handlers(request, mocker, tmp_path) -> Iterator[Tuple[OrdersDalHandler, UsersDalHandler]]:
+    """ the handlers of each non DynamoDB backend, built through the factory the logic layer uses """
+    settings = DalBackend(DAL_BACKEND=request.param, SQLITE_DB_PATH=str(tmp_path / 'dal.sqlite3'))
+    mocker.patch('service.dal.factory.get_environment_variables', return_value=settings)
+    factory.get_orders_dal_handler.cache_clear()
+    factory.get_users_dal_handler.cache_clear()
+    orders, users = factory.get_orders_dal_handler('orders'), factory.get_users_dal_handler('users')
+    assert (type(orders), type(users)) == BACKENDS[request.param]
+    yield orders, users
+    get_sqlite_connections(settings.SQLITE_DB_PATH).close()
+    for handler_class in BACKENDS[request.param]:
+        handler_class._instances = {}
+    factory.get_orders_dal_handler.cache_clear()
+    factory.get_users_dal_handler.cache_clear()
+
+
+def test_order_create_get_delete(dal_handlers):
+    orders, _ = dal_handlers
+    entry = orders.create_order_in_db(customer_name='customer', order_item_count=3)
+    assert orders.get_order_in_db(entry.order_id) == entry
+    assert orders.delete_order_in_db(entry.order_id) == entry
+    assert orders.get_order_in_db(entry.order_id) is None
+    assert orders.delete_order_in_db(entry.order_id) is None
+
+
+def test_order_create_invalid_input(dal_handlers):
+    orders, _ = dal_handlers
+    with pytest.raises(InternalServerException):
+        orders.create_order_in_db(customer_name='customer', order_item_count=0)
+    # no stream to relay outbox records from
+    with pytest.raises(InternalServerException):
+        orders.create_order_in_db(customer_name='customer', order_item_count=1, outbox_table_name='outbox')
+
+
+def test_orders_batch_create_and_get(dal_handlers):
+    orders, _ = dal_handlers
+    results = orders.create_orders_in_db([('customer', count) for count in range(1, 31)])
+    assert all(result.created for result in results)
+    missing_id = str(uuid.uuid4())
+    order_ids = [result.entry.order_id for result in results]
+    batch = orders.get_orders_in_db([missing_id] + order_ids + order_ids[:2])
+    assert batch.found == [result.entry for result in results]
+    assert batch.missing_order_ids == [missing_id]
+
+
+def test_order_update(dal_handlers):
+    orders, _ = dal_handlers
+    entry = orders.create_order_in_db(customer_name='customer', order_item_count=3)
+    changes = orders.update_order_in_db(entry.order_id, order_item_count=7)
+    assert changes.model_dump(exclude_none=True) == {'order_id': entry.order_id, 'order_item_count': 7}
+    assert orders.get_order_in_db(entry.order_id) == entry.model_copy(update={'order_item_count': 7})
+    assert orders.update_order_in_db(str(uuid.uuid4()), customer_name='other') is None
+    with pytest.raises(InternalServerException):
+        orders.update_order_in_db(entry.order_id)
+
+
+def test_list_orders_by_customer(dal_handlers):
+    orders, _ = dal_handlers
+    # one batch shares created_at, the order id orders them within the same millisecond
+    created = [result.entry for result in orders.create_orders_in_db([('customer', count) for count in range(1, 6)])]
+    created += [orders.create_order_in_db(customer_name='customer', order_item_count=6)]
+    orders.create_order_in_db(customer_name='other', order_item_count=1)
+    expected = sorted(created, key=lambda entry: (entry.created_at, entry.order_id), reverse=True)
+
+    pages = list(orders.list_orders_by_customer('customer', page_size=4))
+    assert [len(page.orders) for page in pages] == [4, 2]
+    assert pages[-1].cursor is None
+    assert [entry for page in pages for entry in page.orders] == expected
+    # resuming from a cursor continues after the last order of its page
+    resumed = list(orders.list_orders_by_customer('customer', page_size=4, cursor=pages[0].cursor, prefetch=False))
+    assert resumed == pages[1:]
+    assert list(orders.list_orders_by_customer('nobody', page_size=4)) == [OrdersPage(orders=[])]
+
+
+def test_user_create_get_delete(dal_handlers):
+    _, users = dal_handlers
+    entry = users.create_user_in_db(user_name='user', email='user@example.com')
+    assert users.get_user_in_db(entry.user_id) == entry
+    assert users.delete_user_in_db(entry.user_id) == entry
+    assert users.get_user_in_db(entry.user_id) is None
+    assert users.delete_user_in_db(entry.user_id) is None
+
+
+def test_create_with_id_writes_once(dal_handlers):
+    orders, users = dal_handlers
+    order_id, user_id = str(uuid.uuid4()), str(uuid.uuid4())
+    first = orders.create_order_with_id_in_db(order_id, customer_name='customer', order_item_count=3)
+    assert first.created
+    # a retry returns the stored order, not the one it asked for
+    retry = orders.create_order_with_id_in_db(order_id, customer_name='customer', order_item_count=4)
+    assert (retry.created, retry.entry) == (False, first.entry)
+    assert orders.get_order_in_db(order_id) == first.entry
+    user = users.create_user_with_id_in_db(user_id, user_name='user', email='user@example.com')
+    assert user.created
+    assert users.create_user_with_id_in_db(user_id, user_name='other', email='other@example.com').entry == user.entry
+
+
+def test_create_user_logic_with_idempotency_key(dal_handlers):
+    request = CreateUserRequest(user_name='user', email='user@example.com')
+    first = handle_create_request(request, table_name='users', idempotency_key='key-1')
+    assert handle_create_request(request, table_name='users', idempotency_key='key-1') == first
+    assert handle_create_request(request, table_name='users', idempotency_key='key-2') != first
+    with pytest.raises(IdempotencyKeyReusedException):
+        handle_create_request(CreateUserRequest(user_name='other', email='user@example.com'), table_name='users', idempotency_key='key-1')
+
+
+def test_concurrent_creates(dal_handlers):
+    orders, _ = dal_handlers
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        entries = list(executor.map(lambda count: orders.create_order_in_db(customer_name='customer', order_item_count=count), range(1, 201)))
+    batch = orders.get_orders_in_db([entry.order_id for entry in entries])
+    assert len(batch.found) == 200
+
+
+def test_sqlite_schema(tmp_path):
+    connections = get_sqlite_connections(str(tmp_path / 'schema.sqlite3'))
+    orders = SqliteOrdersDalHandler('orders', connections)
+    connection = connections.get()
+    assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    plan = connection.execute('EXPLAIN QUERY PLAN SELECT order_id FROM orders WHERE customer_name = ?', ('customer',)).fetchall()
+    assert 'orders_customer_name' in str(plan)
+    entry = orders.create_order_in_db(customer_name='customer', order_item_count=3)
+    assert type(orders.get_order_in_db(entry.order_id).order_item_count) is int
+    connections.close()
+    SqliteOrdersDalHandler._instances = {}
+
+
+def test_sqlite_migrates_a_table_without_created_at(tmp_path):
+    connections = get_sqlite_connections(str(tmp_path / 'migrate.sqlite3'))
+    with connections.get() as connection:  # the schema before orders had a creation time
+        connection.execute('CREATE TABLE orders (order_id TEXT PRIMARY KEY, customer_name TEXT NOT NULL, order_item_count INTEGER NOT NULL)')
+        connection.execute('CREATE INDEX orders_customer_name ON orders (customer_name)')
+        connection.execute("INSERT INTO orders VALUES ('6ba7b810-9dad-41d1-80b4-00c04fd430c8', 'customer', 2)")
+    orders = SqliteOrdersDalHandler('orders', connections)
+    entry = orders.create_order_in_db(customer_name='customer', order_item_count=3)
+    assert orders.get_order_in_db('6ba7b810-9dad-41d1-80b4-00c04fd430c8').created_at is None
+    # older orders are not listed, as with the sparse DynamoDB index
+    assert [page.orders for page in orders.list_orders_by_customer(customer_name='customer', page_size=10)] == [[entry]]
+    indexes = {row[1] for row in connections.get().execute('PRAGMA index_list(orders)')}
+    assert 'orders_customer_name_created_at' in indexes and 'orders_customer_name' not in indexes
+    connections.close()
@@ -0,0 +1,283 @@
+import asyncio
+import inspect
+import uuid
+from typing import Any, AsyncIterator, Callable, Iterator, List, Tuple, Union
+
+import boto3
+import pytest
+
+pytest.importorskip('aiobotocore')
+moto_server = pytest.importorskip('moto.server')
+
+from service.dal.aio_client import AioDynamoClient  # noqa: E402
+from service.dal.aio_dynamo_orders_dal_handler import AioDynamoOrdersDalHandler  # noqa: E402
+from service.dal.aio_dynamo_users_dal_handler import AioDynamoUsersDalHandler  # noqa: E402
+from service.dal.dynamo_orders_dal_handler import ORDERS_BY_CUSTOMER_INDEX, DynamoClientOrdersDalHandler, DynamoOrdersDalHandler  # noqa: E402
+from service.dal.dynamo_users_dal_handler import DynamoClientUsersDalHandler, DynamoUsersDalHandler  # noqa: E402
+from service.dal.schemas.orders_db import OrdersPage  # noqa: E402
+from service.handlers.utils.aws_clients import clear_clients  # noqa: E402
+from service.schemas.exceptions import InternalServerException  # noqa: E402
+
+ORDERS_TABLE = 'orders'
+OUTBOX_TABLE = 'orders_outbox'
+USERS_TABLE = 'users'
+
+Runner = Callable[[Any], Any]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def dynamodb_server() -> Iterator[str]:
+    # moto server stand-in for DynamoDB, every handler flavour talks to it over HTTP
+    server = moto_server.ThreadedMotoServer(ip_address='127.0.0.1', port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint_url = f'http://{host}:{port}'
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv('AWS_ENDPOINT_URL_DYNAMODB', endpoint_url)
+        monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+        monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+        clear_clients()  # the shared clients pick up the moto endpoint
+        client = boto3.client('dynamodb', region_name='us-east-1')
+        client.create_table(
+            TableName=ORDERS_TABLE,
+            KeySchema=[{
+                'AttributeName': 'order_id',
+                'KeyType': 'HASH'
+            }],
+            AttributeDefinitions=[{
+                'AttributeName': 'order_id',
+                'AttributeType': 'S'
+            }, {
+                'AttributeName': 'customer_name',
+                'AttributeType': 'S'
+            }, {
+                'AttributeName': 'created_at',
+                'AttributeType': 'N'
+            }],
+            GlobalSecondaryIndexes=[{
+                'IndexName': ORDERS_BY_CUSTOMER_INDEX,
+                'KeySchema': [{
+                    'AttributeName': 'customer_name',
+                    'KeyType': 'HASH'
+                }, {
+                    'AttributeName': 'created_at',
+                    'KeyType': 'RANGE'
+                }],
+                'Projection': {
+                    'ProjectionType': 'ALL'
+                },
+            }],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        client.create_table(
+            TableName=OUTBOX_TABLE,
+            KeySchema=[{
+                'AttributeName': 'event_id',
+                'KeyType': 'HASH'
+            }],
+            AttributeDefinitions=[{
+                'AttributeName': 'event_id',
+                'AttributeType': 'S'
+            }],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        client.create_table(
+            TableName=USERS_TABLE,
+            KeySchema=[{
+                'AttributeName': 'user_id',
+                'KeyType': 'HASH'
+            }],
+            AttributeDefinitions=[{
+                'AttributeName': 'user_id',
+                'AttributeType': 'S'
+            }],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        yield endpoint_url
+    clear_clients()
+    server.stop()
+
+
+def _sync_runner(value: Any) -> Any:
+    return value
+
+
+@pytest.fixture(params=['resource', 'client', 'aio'])
+def dal_handlers(request) -> Iterator[Tuple[Any, Any, Runner]]:
+    """ (orders handler, users handler, run) - run resolves a handler result, awaiting it for the async handlers """
+    if request.param == 'aio':
+        loop = asyncio.new_event_loop()
+        client = AioDynamoClient()
+        yield AioDynamoOrdersDalHandler(ORDERS_TABLE, client), AioDynamoUsersDalHandler(USERS_TABLE, client), loop.run_until_complete
+        loop.run_until_complete(client.close())
+        loop.close()
+        return
+    orders_class, users_class = {
+        'resource': (DynamoOrdersDalHandler, DynamoUsersDalHandler),
+        'client': (DynamoClientOrdersDalHandler, DynamoClientUsersDalHandler),
+    }[request.param]
+    yield orders_class(ORDERS_TABLE), users_class(USERS_TABLE), _sync_runner
+    orders_class._instances = {}
+    users_class._instances = {}
+
+
+def test_async_handlers_are_coroutines():
+    assert inspect.iscoroutinefunction(AioDynamoOrdersDalHandler.get_order_in_db)
+    assert inspect.iscoroutinefunction(AioDynamoUsersDalHandler.get_user_in_db)
+
+
+def test_order_create_get_delete(dal_handlers):
+    orders, _, run = dal_handlers
+    entry = run(orders.create_order_in_db(customer_name='customer', order_item_count=3))
+    rec = run(orders.get_order_in_db(entry.order_id))
+    assert rec == entry
+    assert type(rec.order_item_count) is int
+    # ALL_OLD returns the deleted order in the same call
+    assert run(orders.delete_order_in_db(entry.order_id)) == entry
+    assert run(orders.get_order_in_db(entry.order_id)) is None
+    assert run(orders.delete_order_in_db(entry.order_id)) is None
+
+
+def test_get_missing_order(dal_handlers):
+    orders, _, run = dal_handlers
+    assert run(orders.get_order_in_db(str(uuid.uuid4()))) is None
+
+
+def test_orders_batch_create_and_get(dal_handlers):
+    orders, _, run = dal_handlers
+    results = run(orders.create_orders_in_db([('customer', count) for count in range(1, 31)]))
+    assert all(result.created for result in results)
+    missing_id = str(uuid.uuid4())
+    order_ids = [result.entry.order_id for result in results]
+    batch = run(orders.get_orders_in_db(order_ids + [missing_id]))
+    assert batch.found == [result.entry for result in results]
+    assert batch.missing_order_ids == [missing_id]
+
+
+def test_create_order_with_outbox(dal_handlers):
+    orders, _, run = dal_handlers
+    entry = run(orders.create_order_in_db(customer_name='customer', order_item_count=3, outbox_table_name=OUTBOX_TABLE))
+    assert run(orders.get_order_in_db(entry.order_id)) == entry
+    client = boto3.client('dynamodb', region_name='us-east-1')
+    record = client.get_item(TableName=OUTBOX_TABLE, Key={'event_id': {'S': f'OrderCreated#{entry.order_id}'}})['Item']
+    assert record['event_type'] == {'S': 'OrderCreated'}
+    assert record['order_item_count'] == {'N': '3'}
+
+
+def test_create_order_with_outbox_is_atomic(dal_handlers):
+    orders, _, run = dal_handlers
+    customer_name = uuid.uuid4().hex[:20]
+    # the outbox put fails, so the order put of the same transaction must not be applied either
+    with pytest.raises(InternalServerException):
+        run(orders.create_order_in_db(customer_name=customer_name, order_item_count=3, outbox_table_name='missing_outbox'))
+    client = boto3.client('dynamodb', region_name='us-east-1')
+    scanned = client.scan(TableName=ORDERS_TABLE, FilterExpression='customer_name = :name', ExpressionAttributeValues={':name': {'S': customer_name}})
+    assert scanned['Items'] == []
+
+
+def test_create_order_with_id_is_a_single_conditional_put(dal_handlers):
+    orders, _, run = dal_handlers
+    order_id = str(uuid.uuid4())
+    first = run(orders.create_order_with_id_in_db(order_id, customer_name='customer', order_item_count=3))
+    assert first.created
+    # the stored order comes back with the failed condition, no GET
+    retry = run(orders.create_order_with_id_in_db(order_id, customer_name='customer', order_item_count=4))
+    assert (retry.created, retry.entry) == (False, first.entry)
+    assert run(orders.get_order_in_db(order_id)) == first.entry
+
+
+def test_create_order_with_id_and_outbox(dal_handlers):
+    orders, _, run = dal_handlers
+    order_id = str(uuid.uuid4())
+    first = run(orders.create_order_with_id_in_db(order_id, customer_name='customer', order_item_count=3, outbox_table_name=OUTBOX_TABLE))
+    assert first.created
+    # the cancelled transaction does not write a second outbox record either
+    retry = run(orders.create_order_with_id_in_db(order_id, customer_name='customer', order_item_count=3, outbox_table_name=OUTBOX_TABLE))
+    assert (retry.created, retry.entry) == (False, first.entry)
+    with pytest.raises(InternalServerException):
+        run(orders.create_order_with_id_in_db(str(uuid.uuid4()), customer_name='customer', order_item_count=3, outbox_table_name='missing_outbox'))
+
+
+def test_create_user_with_id(dal_handlers):
+    _, users, run = dal_handlers
+    user_id = str(uuid.uuid4())
+    first = run(users.create_user_with_id_in_db(user_id, user_name='user', email='user@example.com'))
+    assert first.created
+    retry = run(users.create_user_with_id_in_db(user_id, user_name='user', email='user@example.com'))
+    assert (retry.created, retry.entry) == (False, first.entry)
+
+
+def test_order_update(dal_handlers):
+    orders, _, run = dal_handlers
+    entry = run(orders.create_order_in_db(customer_name='customer', order_item_count=3))
+    changes = run(orders.update_order_in_db(entry.order_id, customer_name='renamed'))
+    # UPDATED_NEW returns the changed attribute only
+    assert changes.model_dump(exclude_none=True) == {'order_id': entry.order_id, 'customer_name': 'renamed'}
+    assert run(orders.get_order_in_db(entry.order_id)) == entry.model_copy(update={'customer_name': 'renamed'})
+    # the existence condition keeps the update from creating an order
+    missing_id = str(uuid.uuid4())
+    assert run(orders.update_order_in_db(missing_id, order_item_count=2)) is None
+    assert run(orders.get_order_in_db(missing_id)) is None
+
+
+def _list_pages(orders: Any, run: Runner, **kwargs: Any) -> List[OrdersPage]:
+    pages: Union[Iterator[OrdersPage], AsyncIterator[OrdersPage]] = orders.list_orders_by_customer(**kwargs)
+    if isinstance(pages, AsyncIterator):
+        async_pages = pages
+
+        async def collect() -> List[OrdersPage]:
+            return [page async for page in async_pages]
+
+        return run(collect())
+    return list(pages)
+
+
+def test_list_orders_by_customer(dal_handlers):
+    orders, _, run = dal_handlers
+    customer_name = uuid.uuid4().hex[:20]
+    created = [run(orders.create_order_in_db(customer_name=customer_name, order_item_count=count)) for count in range(1, 6)]
+    pages = _list_pages(orders, run, customer_name=customer_name, page_size=2)
+    assert [len(page.orders) for page in pages] == [2, 2, 1]
+    assert pages[-1].cursor is None
+    listed = [entry for page in pages for entry in page.orders]
+    assert sorted(listed, key=lambda entry: entry.order_id) == sorted(created, key=lambda entry: entry.order_id)
+    assert [entry.created_at for entry in listed] == sorted((entry.created_at for entry in created), reverse=True)
+    # the cursor is a valid ExclusiveStartKey for the next Query
+    resumed = _list_pages(orders, run, customer_name=customer_name, page_size=2, cursor=pages[1].cursor, prefetch=False)
+    assert resumed == pages[2:]
+
+
+def test_user_create_get_delete(dal_handlers):
+    _, users, run = dal_handlers
+    entry = run(users.create_user_in_db(user_name='user', email='user@example.com'))
+    assert run(users.get_user_in_db(entry.user_id)) == entry
+    assert run(users.delete_user_in_db(entry.user_id)) == entry
+    assert run(users.get_user_in_db(entry.user_id)) is None
+    assert run(users.delete_user_in_db(entry.user_id)) is None
+
+
+def test_aio_handlers_overlap_requests():
+    orders = AioDynamoOrdersDalHandler(ORDERS_TABLE, AioDynamoClient())
+    in_flight = max_in_flight = 0
+
+    async def create_and_read() -> list:
+        async with orders.client:
+            client = await orders.client.get()
+            make_api_call = client._make_api_call
+
+            async def counted_api_call(*args: Any, **kwargs: Any) -> Any:
+                nonlocal in_flight, max_in_flight
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                try:
+                    return await make_api_call(*args, **kwargs)
+                finally:
+                    in_flight -= 1
+
+            client._make_api_call = counted_api_call
+            entries = await asyncio.gather(*(orders.create_order_in_db(customer_name='customer', order_item_count=1) for _ in range(10)))
+            return await asyncio.gather(*(orders.get_order_in_db(entry.order_id) for entry in entries))
+
+    assert len({rec.order_id for rec in asyncio.run(create_and_read())}) == 10
+    # the requests of the gathered coroutines were on the shared client at the same time, not one after the other
+    assert max_in_flight > 1
@@ -1,10 +1,19 @@
+import uuid
+from decimal import Decimal
+
 import pytest
 from botocore.stub import Stubber
 
-from service.dal.dynamo_orders_dal_handler import DynamoOrdersDalHandler
+from service.dal.batch_utils import UNPROCESSED_MAX_ATTEMPTS
+from service.dal.dynamo_orders_dal_handler import DynamoClientOrdersDalHandler, DynamoOrdersDalHandler
 from service.schemas.exceptions import InternalServerException
 
 
+@pytest.fixture
+def no_backoff(mocker):
+    return mocker.patch('service.dal.dynamo_orders_dal_handler.backoff')
+
+
 def test_raise_exception():
     db_handler: DynamoOrdersDalHandler = DynamoOrdersDalHandler('table')
     table = db_handler._get_db_handler()
@@ -15,3 +24,238 @@ def test_raise_exception():
         db_handler.create_order_in_db(customer_name='customer', order_item_count=5)
     stubber.deactivate()
     DynamoOrdersDalHandler._instances = {}
+
+
+def test_create_orders_batch_chunks(no_backoff):
+    db_handler: DynamoOrdersDalHandler = DynamoOrdersDalHandler('table')
+    table = db_handler._get_db_handler()
+    stubber = Stubber(table.meta.client)
+    # 30 orders are written with two BatchWriteItem calls of 25 and 5 items
+    stubber.add_response(method='batch_write_item', service_response={'UnprocessedItems': {}})
+    stubber.add_response(method='batch_write_item', service_response={'UnprocessedItems': {}})
+    stubber.activate()
+    results = db_handler.create_orders_in_db([('customer', 1)] * 30)
+    stubber.assert_no_pending_responses()
+    stubber.deactivate()
+    assert len(results) == 30
+    assert all(result.created for result in results)
+    assert len({result.entry.order_id for result in results}) == 30
+    no_backoff.assert_not_called()
+    DynamoOrdersDalHandler._instances = {}
+
+
+def test_create_orders_batch_retries_unprocessed_items(mocker, no_backoff):
+    order_ids = [uuid.UUID('c8a5d1ba-1ba3-4e55-9b4f-0ba6b2d0a3b1'), uuid.UUID('0f8e3f7e-5f0c-4b8e-9e55-0a1e2c3d4b5a')]
+    mocker.patch('service.dal.dynamo_orders_dal_handler.uuid.uuid4', side_effect=order_ids)
+    mocker.patch('service.dal.dynamo_orders_dal_handler.epoch_ms_now', return_value=1700000000000)
+    db_handler: DynamoOrdersDalHandler = DynamoOrdersDalHandler('table')
+    table = db_handler._get_db_handler()
+    stubber = Stubber(table.meta.client)
+    # first call leaves the second order unprocessed, the retry resubmits only that order
+    unprocessed_item = {
+        'order_id': {
+            'S': str(order_ids[1])
+        },
+        'customer_name': {
+            'S': 'other'
+        },
+        'order_item_count': {
+            'N': '2'
+        },
+        'created_at': {
+            'N': '1700000000000'
+        },
+    }
+    stubber.add_response(method='batch_write_item', service_response={'UnprocessedItems': {'table': [{'PutRequest': {'Item': unprocessed_item}}]}})
+    retried_item = {'order_id': str(order_ids[1]), 'customer_name': 'other', 'order_item_count': Decimal('2'), 'created_at': Decimal('1700000000000')}
+    stubber.add_response(method='batch_write_item', service_response={'UnprocessedItems': {}},
+                         expected_params={'RequestItems': {
+                             'table': [{
+                                 'PutRequest': {
+                                     'Item': retried_item
+                                 }
+                             }]
+                         }})
+    stubber.activate()
+    results = db_handler.create_orders_in_db([('customer', 1), ('other', 2)])
+    stubber.assert_no_pending_responses()
+    stubber.deactivate()
+    assert all(result.created for result in results)
+    assert [result.entry.order_id for result in results] == [str(order_id) for order_id in order_ids]
+    no_backoff.assert_called_once()
+    DynamoOrdersDalHandler._instances = {}
+
+
+def test_create_orders_batch_reports_failed_items(no_backoff):
+    db_handler: DynamoOrdersDalHandler = DynamoOrdersDalHandler('table')
+    table = db_handler._get_db_handler()
+    stubber = Stubber(table.meta.client)
+    stubber.add_client_error(method='batch_write_item', service_error_code='ProvisionedThroughputExceededException')
+    stubber.activate()
+    results = db_handler.create_orders_in_db([('customer', 1), ('other', 2)])
+    stubber.deactivate()
+    assert [result.created for result in results] == [False, False]
+    assert [result.entry.customer_name for result in results] == ['customer', 'other']
+    DynamoOrdersDalHandler._instances = {}
+
+
+def test_get_orders_batch_found_and_missing(no_backoff):
+    found_id, missing_id = str(uuid.uuid4()), str(uuid.uuid4())
+    db_handler: DynamoOrdersDalHandler = DynamoOrdersDalHandler('table')
+    table = db_handler._get_db_handler()
+    stubber = Stubber(table.meta.client)
+    item = {'order_id': {'S': found_id}, 'customer_name': {'S': 'customer'}, 'order_item_count': {'N': '3'}}
+    # duplicated ids are requested once
+    stubber.add_response(method='batch_get_item', service_response={
+        'Responses': {
+            'table': [item]
+        },
+        'UnprocessedKeys': {}
+    }, expected_params={'RequestItems': {
+        'table': {
+            'Keys': [{
+                'order_id': missing_id
+            }, {
+                'order_id': found_id
+            }]
+        }
+    }})
+    stubber.activate()
+    result = db_handler.get_orders_in_db([missing_id, found_id, missing_id])
+    stubber.deactivate()
+    assert [order.order_id for order in result.found] == [found_id]
+    assert result.found[0].order_item_count == 3
+    assert result.missing_order_ids == [missing_id]
+    DynamoOrdersDalHandler._instances = {}
+
+
+def test_get_orders_batch_chunks_and_retries_unprocessed_keys(no_backoff):
+    order_ids = [str(uuid.uuid4()) for _ in range(101)]
+    db_handler: DynamoOrdersDalHandler = DynamoOrdersDalHandler('table')
+    table = db_handler._get_db_handler()
+    stubber = Stubber(table.meta.client)
+    unprocessed_keys = {'table': {'Keys': [{'order_id': {'S': order_ids[0]}}]}}
+    stubber.add_response(method='batch_get_item', service_response={'Responses': {'table': []}, 'UnprocessedKeys': unprocessed_keys})
+    stubber.add_response(method='batch_get_item', service_response={
+        'Responses': {
+            'table': []
+        },
+        'UnprocessedKeys': {}
+    }, expected_params={'RequestItems': {
+        'table': {
+            'Keys': [{
+                'order_id': order_ids[0]
+            }]
+        }
+    }})
+    stubber.add_response(method='batch_get_item', service_response={'Responses': {'table': []}, 'UnprocessedKeys': {}})
+    stubber.activate()
+    result = db_handler.get_orders_in_db(order_ids)
+    stubber.assert_no_pending_responses()
+    stubber.deactivate()
+    assert result.found == []
+    assert result.missing_order_ids == order_ids
+    no_backoff.assert_called_once()
+    DynamoOrdersDalHandler._instances = {}
+
+
+def test_get_orders_batch_unprocessed_keys_exhausted(no_backoff):
+    order_id = str(uuid.uuid4())
+    db_handler: DynamoOrdersDalHandler = DynamoOrdersDalHandler('table')
+    table = db_handler._get_db_handler()
+    stubber = Stubber(table.meta.client)
+    for _ in range(UNPROCESSED_MAX_ATTEMPTS):
+        unprocessed_keys = {'table': {'Keys': [{'order_id': {'S': order_id}}]}}
+        stubber.add_response(method='batch_get_item', service_response={'Responses': {'table': []}, 'UnprocessedKeys': unprocessed_keys})
+    stubber.activate()
+    with pytest.raises(InternalServerException):
+        db_handler.get_orders_in_db([order_id])
+    stubber.deactivate()
+    DynamoOrdersDalHandler._instances = {}
+
+
+def test_client_mode_get_order_decodes_wire_item():
+    order_id = str(uuid.uuid4())
+    db_handler: DynamoClientOrdersDalHandler = DynamoClientOrdersDalHandler('table')
+    stubber = Stubber(db_handler._get_db_client())
+    item = {'order_id': {'S': order_id}, 'customer_name': {'S': 'customer'}, 'order_item_count': {'N': '3'}}
+    stubber.add_response(method='get_item', service_response={'Item': item}, expected_params={
+        'TableName': 'table',
+        'Key': {
+            'order_id': {
+                'S': order_id
+            }
+        }
+    })
+    stubber.add_response(method='get_item', service_response={})
+    stubber.activate()
+    rec = db_handler.get_order_in_db(order_id)
+    assert db_handler.get_order_in_db(order_id) is None
+    stubber.deactivate()
+    assert rec is not None
+    assert rec.order_id == order_id
+    assert rec.customer_name == 'customer'
+    assert rec.order_item_count == 3
+    DynamoClientOrdersDalHandler._instances = {}
+
+
+def test_client_mode_create_order_writes_wire_item(mocker):
+    order_id = uuid.UUID('c8a5d1ba-1ba3-4e55-9b4f-0ba6b2d0a3b1')
+    mocker.patch('service.dal.dynamo_orders_dal_handler.uuid.uuid4', return_value=order_id)
+    mocker.patch('service.dal.dynamo_orders_dal_handler.epoch_ms_now', return_value=1700000000000)
+    db_handler: DynamoClientOrdersDalHandler = DynamoClientOrdersDalHandler('table')
+    stubber = Stubber(db_handler._get_db_client())
+    item = {
+        'order_id': {
+            'S': str(order_id)
+        },
+        'customer_name': {
+            'S': 'customer'
+        },
+        'order_item_count': {
+            'N': '5'
+        },
+        'created_at': {
+            'N': '1700000000000'
+        }
+    }
+    stubber.add_response(method='put_item', service_response={}, expected_params={'TableName': 'table', 'Item': item})
+    stubber.add_client_error(method='put_item', service_error_code='ValidationException')
+    stubber.activate()
+    entry = db_handler.create_order_in_db(customer_name='customer', order_item_count=5)
+    with pytest.raises(InternalServerException):
+        db_handler.create_order_in_db(customer_name='customer', order_item_count=5)
+    stubber.deactivate()
+    assert entry.order_id == str(order_id)
+    DynamoClientOrdersDalHandler._instances = {}
+
+
+def test_client_mode_get_orders_batch(no_backoff):
+    found_id, missing_id = str(uuid.uuid4()), str(uuid.uuid4())
+    db_handler: DynamoClientOrdersDalHandler = DynamoClientOrdersDalHandler('table')
+    stubber = Stubber(db_handler._get_db_client())
+    item = {'order_id': {'S': found_id}, 'customer_name': {'S': 'customer'}, 'order_item_count': {'N': '3'}}
+    stubber.add_response(method='batch_get_item', service_response={
+        'Responses': {
+            'table': [item]
+        },
+        'UnprocessedKeys': {}
+    }, expected_params={'RequestItems': {
+        'table': {
+            'Keys': [{
+                'order_id': {
+                    'S': found_id
+                }
+            }, {
+                'order_id': {
+                    'S': missing_id
+                }
+            }]
+        }
+    }})
+    stubber.activate()
+    result = db_handler.get_orders_in_db([found_id, missing_id])
+    stubber.deactivate()
+    assert [order.order_id for order in result.found] == [found_id]
+    assert result.missing_order_ids == [missing_id]
+    DynamoClientOrdersDalHandler._instances = {}
@@ -0,0 +1,167 @@
+import copy
+import os
+from typing import Any, Dict
+
+import pytest
+from aws_lambda_powertools.utilities.feature_flags import FeatureFlags
+from aws_lambda_powertools.utilities.feature_flags.exceptions import ConfigurationStoreError, SchemaValidationError
+
+from cdk.service.constants import CONFIGURATION_NAME, ENVIRONMENT, SERVICE_NAME
+from service.handlers.utils import feature_flags
+from service.handlers.utils.dynamic_configuration import get_dynamic_configuration_store
+
+MOCKED_SCHEMA = {
+    'features': {
+        'premium_features': {
+            'default': False,
+            'rules': {
+                'enable premium features for this specific customer name': {
+                    'when_match': True,
+                    'conditions': [{
+                        'action': 'EQUALS',
+                        'key': 'customer_name',
+                        'value': 'RanTheBuilder'
+                    }]
+                }
+            }
+        },
+        'ten_percent_off_campaign': {
+            'default': True
+        },
+        'tier_discount': {
+            'default': 0,
+            'boolean_type': False,
+            'rules': {
+                'gold customers': {
+                    'when_match':
+                        20,
+                    'conditions': [{
+                        'action': 'STARTSWITH',
+                        'key': 'customer_name',
+                        'value': 'gold-'
+                    }, {
+                        'action': 'KEY_GREATER_THAN_VALUE',
+                        'key': 'order_item_count',
+                        'value': 3
+                    }]
+                },
+                'listed customers': {
+                    'when_match': 10,
+                    'conditions': [{
+                        'action': 'ANY_IN_VALUE',
+                        'key': 'groups',
+                        'value': ['beta', 'staff']
+                    }]
+                }
+            }
+        },
+    },
+}
+
+DEFAULTS = {'premium_features': False, 'ten_percent_off_campaign': False, 'not_in_configuration': 'default'}
+
+CONTEXTS = [
+    {},
+    {
+        'customer_name': 'RanTheBuilder'
+    },
+    {
+        'customer_name': 'gold-customer',
+        'order_item_count': 5
+    },
+    {
+        'customer_name': 'gold-customer',
+        'order_item_count': 1
+    },
+    {
+        'customer_name': 'gold-customer',
+        'order_item_count': 'not a number'
+    },
+    {
+        'customer_name': 'someone',
+        'groups': ['staff']
+    },
+    {
+        'customer_name': 'someone',
+        'groups': 'not a list'
+    },
+]
+
+
+def mock_dynamic_configuration(mocker, mock_schema: Dict[str, Any]) -> None:
+    """Mock AppConfig Store get_configuration method to use mock schema instead"""
+    mocked_get_conf = mocker.patch('aws_lambda_powertools.utilities.parameters.AppConfigProvider.get')
+    mocked_get_conf.return_value = mock_schema
+
+
+@pytest.fixture(scope='module', autouse=True)
+def init():
+    os.environ['CONFIGURATION_APP'] = SERVICE_NAME
+    os.environ['CONFIGURATION_ENV'] = ENVIRONMENT
+    os.environ['CONFIGURATION_NAME'] = CONFIGURATION_NAME
+    os.environ['CONFIGURATION_MAX_AGE_MINUTES'] = '5'
+
+
+@pytest.mark.parametrize('context', CONTEXTS)
+def test_evaluation_matches_powertools(mocker, context):
+    mock_dynamic_configuration(mocker, MOCKED_SCHEMA)
+    powertools_flags = FeatureFlags(store=get_dynamic_configuration_store().store)
+    expected = {name: powertools_flags.evaluate(name=name, context=context, default=DEFAULTS.get(name)) for name in MOCKED_SCHEMA['features']}
+    # evaluated twice, the second evaluation is served from the memo
+    for _ in range(2):
+        assert feature_flags.evaluate_feature_flags(context=context, defaults=DEFAULTS) == {**DEFAULTS, **expected}
+
+
+def test_batch_evaluation(mocker):
+    mock_dynamic_configuration(mocker, MOCKED_SCHEMA)
+    expected = [feature_flags.evaluate_feature_flags(context, DEFAULTS) for context in CONTEXTS]
+    assert feature_flags.evaluate_feature_flags_batch(CONTEXTS, DEFAULTS) == expected
+
+
+def test_compiled_once_per_configuration(mocker, monkeypatch):
+    monkeypatch.setattr(feature_flags, '_COMPILED', None)
+    compile_spy = mocker.spy(feature_flags, 'CompiledFeatureFlags')
+    mock_dynamic_configuration(mocker, copy.deepcopy(MOCKED_SCHEMA))
+    feature_flags.evaluate_feature_flags(context={'customer_name': 'RanTheBuilder'}, defaults=DEFAULTS)
+    feature_flags.evaluate_feature_flags(context={'customer_name': 'someone'}, defaults=DEFAULTS)
+    # refetched after the max age, same content
+    mock_dynamic_configuration(mocker, copy.deepcopy(MOCKED_SCHEMA))
+    feature_flags.evaluate_feature_flags(context={'customer_name': 'RanTheBuilder'}, defaults=DEFAULTS)
+    assert compile_spy.call_count == 1
+
+    # a new document
+    campaign_off = copy.deepcopy(MOCKED_SCHEMA)
+    campaign_off['features']['ten_percent_off_campaign']['default'] = False
+    mock_dynamic_configuration(mocker, campaign_off)
+    flags = feature_flags.evaluate_feature_flags(context={'customer_name': 'RanTheBuilder'}, defaults=DEFAULTS)
+    assert flags['ten_percent_off_campaign'] is False
+    assert flags['premium_features'] is True
+    assert compile_spy.call_count == 2
+
+
+def test_memo_key_is_the_context_values_the_rules_read():
+    compiled = feature_flags.CompiledFeatureFlags(MOCKED_SCHEMA['features'], memo_max_items=100)
+    _, hits, misses = compiled.evaluate({'customer_name': 'RanTheBuilder', 'request_id': '1'})
+    assert (hits, misses) == (0, 3)
+    # premium_features and ten_percent_off_campaign do not read request_id, tier_discount reads an unhashable value
+    _, hits, misses = compiled.evaluate({'customer_name': 'RanTheBuilder', 'request_id': '2', 'groups': ['staff']})
+    assert (hits, misses) == (2, 0)
+
+
+def test_memo_is_bounded():
+    compiled = feature_flags.CompiledFeatureFlags({'premium_features': MOCKED_SCHEMA['features']['premium_features']}, memo_max_items=2)
+    for customer_name in ('a', 'b', 'c'):
+        compiled.evaluate({'customer_name': customer_name})
+    assert compiled.evaluate({'customer_name': 'a'})[1:] == (0, 1)
+    assert compiled.evaluate({'customer_name': 'c'})[1:] == (1, 0)
+
+
+def test_store_error_returns_defaults(mocker):
+    mocker.patch('aws_lambda_powertools.utilities.feature_flags.AppConfigStore.get_configuration', side_effect=ConfigurationStoreError('unavailable'))
+    assert feature_flags.evaluate_feature_flags_batch([{}, {'customer_name': 'RanTheBuilder'}], DEFAULTS) == [DEFAULTS, DEFAULTS]
+
+
+def test_invalid_schema(mocker):
+    mock_dynamic_configuration(mocker, {'features': {'premium_features': {'rules': {}}}})
+    with pytest.raises(SchemaValidationError):
+        feature_flags.evaluate_feature_flags(context={}, defaults=DEFAULTS)
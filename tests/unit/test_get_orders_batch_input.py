@@ -0,0 +1,37 @@
+import uuid
+
+import pytest
+from aws_lambda_powertools.utilities.parser import ValidationError
+
+from service.schemas.input import MAX_ORDER_IDS_PER_GET, GetOrdersBatchRequest
+
+
+def test_comma_separated_ids():
+    order_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+    request = GetOrdersBatchRequest.model_validate({'order_ids': f'{order_ids[0]}, {order_ids[1]},'})
+    assert request.order_ids == order_ids
+
+
+def test_missing_ids():
+    with pytest.raises(ValidationError):
+        GetOrdersBatchRequest.model_validate({})
+
+
+def test_empty_ids():
+    with pytest.raises(ValidationError):
+        GetOrdersBatchRequest.model_validate({'order_ids': ''})
+
+
+def test_invalid_id():
+    with pytest.raises(ValidationError):
+        GetOrdersBatchRequest.model_validate({'order_ids': f'{uuid.uuid4()},2'})
+
+
+def test_max_ids():
+    request = GetOrdersBatchRequest.model_validate({'order_ids': ','.join(str(uuid.uuid4()) for _ in range(MAX_ORDER_IDS_PER_GET))})
+    assert len(request.order_ids) == MAX_ORDER_IDS_PER_GET
+
+
+def test_too_many_ids():
+    with pytest.raises(ValidationError):
+        GetOrdersBatchRequest.model_validate({'order_ids': ','.join(str(uuid.uuid4()) for _ in range(MAX_ORDER_IDS_PER_GET + 1))})
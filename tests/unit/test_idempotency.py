@@ -0,0 +1,208 @@
+import uuid
+
+import jmespath
+import pytest
+
+from service.handlers.utils.apigw_parser import parse_body
+from service.handlers.utils.idempotency import (
+    IDEMPOTENCY_ORDERS_BATCH_CONFIG,
+    IDEMPOTENCY_ORDERS_CONFIG,
+    get_idempotency_key,
+    get_idempotency_layer,
+    id_from_idempotency_key,
+    idempotent_handler,
+)
+from service.handlers.utils.observability import metrics
+from service.schemas.input import CreateOrderRequest, CreateOrdersBatchRequest
+from service.schemas.output import CreateOrdersBatchItemOutput, CreateOrdersBatchOutput
+from tests.utils import generate_api_gw_event, generate_context
+
+
+def test_layer_per_config(monkeypatch):
+    monkeypatch.setenv('IDEMPOTENCY_TABLE_NAME', 'idempotency')
+    get_idempotency_layer.cache_clear()
+    orders_layer = get_idempotency_layer(IDEMPOTENCY_ORDERS_CONFIG)
+    # a layer keeps the first config it is configured with, two handlers of the same router lambda must not share one
+    assert get_idempotency_layer(IDEMPOTENCY_ORDERS_BATCH_CONFIG) is not orders_layer
+    assert get_idempotency_layer(IDEMPOTENCY_ORDERS_CONFIG) is orders_layer
+    assert orders_layer.table_name == 'idempotency'
+    get_idempotency_layer.cache_clear()
+
+
+@pytest.mark.filterwarnings('ignore:Disabling idempotency')
+def test_idempotent_handler_builds_the_layer_on_first_call(monkeypatch):
+    monkeypatch.setenv('POWERTOOLS_IDEMPOTENCY_DISABLED', 'true')
+    monkeypatch.delenv('IDEMPOTENCY_TABLE_NAME', raising=False)
+    get_idempotency_layer.cache_clear()
+
+    # decorating does not read the table name or create the client
+    @idempotent_handler(config=IDEMPOTENCY_ORDERS_CONFIG, model=CreateOrderRequest)
+    def handler(event, context):
+        return {'statusCode': 200}
+
+    assert get_idempotency_layer.cache_info().currsize == 0
+    monkeypatch.setenv('IDEMPOTENCY_TABLE_NAME', 'idempotency')
+    assert handler(generate_api_gw_event({'customer_name': 'a', 'order_item_count': 1}), generate_context()) == {'statusCode': 200}
+    assert get_idempotency_layer.cache_info().currsize == 1
+    get_idempotency_layer.cache_clear()
+
+
+@pytest.mark.filterwarnings('ignore:Disabling idempotency')
+def test_body_is_parsed_once(monkeypatch):
+    monkeypatch.setenv('POWERTOOLS_IDEMPOTENCY_DISABLED', 'true')
+    monkeypatch.setenv('IDEMPOTENCY_TABLE_NAME', 'idempotency')
+    parsed = []
+    model_validate_json = CreateOrderRequest.model_validate_json
+    monkeypatch.setattr(CreateOrderRequest, 'model_validate_json', lambda body: parsed.append(body) or model_validate_json(body))
+
+    @idempotent_handler(config=IDEMPOTENCY_ORDERS_CONFIG, model=CreateOrderRequest)
+    def handler(event, context):
+        # the key fields are selected from the request the decorator parsed
+        assert jmespath.search(IDEMPOTENCY_ORDERS_CONFIG.event_key_jmespath, event) == ['customer', 5]
+        return {'statusCode': 200, 'body': parse_body(event=event, model=CreateOrderRequest).customer_name}
+
+    response = handler(generate_api_gw_event({'customer_name': 'customer', 'order_item_count': 5}), generate_context())
+    assert response == {'statusCode': 200, 'body': 'customer'}
+    assert len(parsed) == 1
+    get_idempotency_layer.cache_clear()
+
+
+def test_invalid_body_skips_idempotency(monkeypatch):
+    get_idempotency_layer.cache_clear()
+
+    @idempotent_handler(config=IDEMPOTENCY_ORDERS_CONFIG, model=CreateOrderRequest)
+    def handler(event, context):
+        return {'statusCode': 400}
+
+    assert handler(generate_api_gw_event({'customer_name': 'customer', 'order_item_count': 0}), generate_context()) == {'statusCode': 400}
+    assert get_idempotency_layer.cache_info().currsize == 0
+
+
+def _stubbed_table_handler(monkeypatch, mocker, config=IDEMPOTENCY_ORDERS_CONFIG, model=CreateOrderRequest, key_mode=True):
+    """ handler with the idempotency table calls of its layer mocked, returns (handler, calls of the handler, layer) """
+    monkeypatch.setenv('IDEMPOTENCY_TABLE_NAME', 'idempotency')
+    get_idempotency_layer.cache_clear()
+    layer = get_idempotency_layer(config)
+    for table_call in ('_put_record', '_update_record', '_get_record'):
+        mocker.patch.object(layer, table_call)
+    calls = []
+
+    @idempotent_handler(config=config, model=model, key_mode=key_mode)
+    def handler(event, context):
+        calls.append(event)
+        return {'statusCode': 200, 'body': f'order {len(calls)}'}
+
+    return handler, calls, layer
+
+
+def test_retry_is_answered_from_the_local_cache(monkeypatch, mocker):
+    handler, calls, layer = _stubbed_table_handler(monkeypatch, mocker)
+    add_metric = mocker.spy(metrics, 'add_metric')
+    event = generate_api_gw_event({'customer_name': 'customer', 'order_item_count': 5})
+
+    assert handler(event, generate_context()) == {'statusCode': 200, 'body': 'order 1'}
+    assert handler(event, generate_context()) == {'statusCode': 200, 'body': 'order 1'}
+    assert len(calls) == 1
+    # the retry neither puts the in progress record nor gets the completed one
+    layer._put_record.assert_called_once()
+    layer._update_record.assert_called_once()
+    layer._get_record.assert_not_called()
+    cache_metrics = [call.kwargs['name'] for call in add_metric.call_args_list if call.kwargs['name'].startswith('IdempotencyCache')]
+    assert cache_metrics == ['IdempotencyCacheMiss', 'IdempotencyCacheHit', 'IdempotencyCacheHit']
+
+    # an expired record goes back to the table
+    for record in layer._cache.values():
+        record.expiry_timestamp = 1
+    assert handler(event, generate_context()) == {'statusCode': 200, 'body': 'order 2'}
+    assert layer._put_record.call_count == 2
+    get_idempotency_layer.cache_clear()
+
+
+def test_local_cache_can_be_disabled(monkeypatch, mocker):
+    monkeypatch.setenv('LAMBDA_ENV_MODELER_DISABLE_CACHE', 'true')
+    monkeypatch.setenv('IDEMPOTENCY_CACHE_MAX_ITEMS', '0')
+    handler, calls, layer = _stubbed_table_handler(monkeypatch, mocker)
+    event = generate_api_gw_event({'customer_name': 'customer', 'order_item_count': 5})
+    handler(event, generate_context())
+    handler(event, generate_context())
+    assert layer.use_local_cache is False
+    assert layer._put_record.call_count == 2
+    get_idempotency_layer.cache_clear()
+
+
+def test_id_from_idempotency_key():
+    order_id = id_from_idempotency_key('key-1', entity='order')
+    assert order_id == id_from_idempotency_key('key-1', entity='order')
+    assert uuid.UUID(order_id).version == 4
+    assert order_id != id_from_idempotency_key('key-2', entity='order')
+    assert order_id != id_from_idempotency_key('key-1', entity='user')
+
+
+def test_idempotency_key_header(monkeypatch):
+    monkeypatch.setenv('LAMBDA_ENV_MODELER_DISABLE_CACHE', 'true')
+    monkeypatch.setenv('IDEMPOTENCY_TABLE_NAME', 'idempotency')
+    event = generate_api_gw_event({'customer_name': 'customer', 'order_item_count': 5})
+    event['headers'] = {'Idempotency-Key': 'key-1'}
+    # the header is ignored in the default 'table' mode
+    assert get_idempotency_key(event) is None
+    monkeypatch.setenv('IDEMPOTENCY_MODE', 'key')
+    assert get_idempotency_key(event) == 'key-1'
+    assert get_idempotency_key({**event, 'headers': {'idempotency-key': 'key-2'}}) == 'key-2'
+    assert get_idempotency_key({**event, 'headers': None}) is None
+
+
+def test_key_mode_skips_the_idempotency_table(monkeypatch, mocker):
+    monkeypatch.setenv('LAMBDA_ENV_MODELER_DISABLE_CACHE', 'true')
+    monkeypatch.setenv('IDEMPOTENCY_MODE', 'key')
+    handler, calls, layer = _stubbed_table_handler(monkeypatch, mocker)
+    event = generate_api_gw_event({'customer_name': 'customer', 'order_item_count': 5})
+    handler({**event, 'headers': {'Idempotency-Key': 'key-1'}}, generate_context())
+    handler({**event, 'headers': {'Idempotency-Key': 'key-1'}}, generate_context())
+    assert len(calls) == 2  # the entity write deduplicates
+    layer._put_record.assert_not_called()
+    # without the header the table is used
+    handler(event, generate_context())
+    layer._put_record.assert_called_once()
+    get_idempotency_layer.cache_clear()
+
+
+def test_key_mode_keeps_the_table_for_handlers_without_key_ids(monkeypatch, mocker):
+    monkeypatch.setenv('LAMBDA_ENV_MODELER_DISABLE_CACHE', 'true')
+    monkeypatch.setenv('IDEMPOTENCY_MODE', 'key')
+    # as create_orders_batch, whose order ids are not derived from the key
+    handler, calls, layer = _stubbed_table_handler(monkeypatch, mocker, config=IDEMPOTENCY_ORDERS_BATCH_CONFIG, model=CreateOrdersBatchRequest,
+                                                   key_mode=False)
+    event = generate_api_gw_event({'orders': [{'customer_name': 'customer', 'order_item_count': 5}]})
+    event['headers'] = {'Idempotency-Key': 'key-1'}
+    assert handler(event, generate_context()) == {'statusCode': 200, 'body': 'order 1'}
+    # the retry is answered from the idempotency layer, the orders are not written again
+    assert handler(event, generate_context()) == {'statusCode': 200, 'body': 'order 1'}
+    assert len(calls) == 1
+    layer._put_record.assert_called_once()
+    get_idempotency_layer.cache_clear()
+
+
+def test_batch_retry_with_key_is_answered_from_the_idempotency_layer(monkeypatch, mocker):
+    monkeypatch.setenv('LAMBDA_ENV_MODELER_DISABLE_CACHE', 'true')
+    monkeypatch.setenv('IDEMPOTENCY_MODE', 'key')
+    for name, value in (('POWERTOOLS_SERVICE_NAME', 'service'), ('LOG_LEVEL', 'INFO'), ('CONFIGURATION_APP', 'service'), ('CONFIGURATION_ENV', 'dev'),
+                        ('CONFIGURATION_NAME', 'my_conf'), ('CONFIGURATION_MAX_AGE_MINUTES', '5'), ('REST_API', 'https://www.example.com/api'),
+                        ('ROLE_ARN', 'arn:partition:service:region:account-id:resource-type:resource-id'), ('TABLE_NAME', 'orders'),
+                        ('ORDER_CREATED_TOPIC_ARN', 'arn:aws:sns:us-east-1:123456789012:NinjaOrderCreated')):
+        monkeypatch.setenv(name, value)
+    mocker.patch('aws_lambda_powertools.utilities.parameters.AppConfigProvider.get', return_value={'countries': ['ISRAEL'], 'features': {}})
+    _, _, layer = _stubbed_table_handler(monkeypatch, mocker, config=IDEMPOTENCY_ORDERS_BATCH_CONFIG, model=CreateOrdersBatchRequest)
+    from service.handlers import create_orders_batch
+    order = CreateOrdersBatchItemOutput(order_id=str(uuid.uuid4()), customer_name='customer', order_item_count=5, created=True)
+    create = mocker.patch.object(create_orders_batch, 'handle_create_batch_request', return_value=CreateOrdersBatchOutput(orders=[order]))
+    publish = mocker.patch.object(create_orders_batch, 'publish_orders_created', return_value=[])
+    event = generate_api_gw_event({'orders': [{'customer_name': 'customer', 'order_item_count': 5}]})
+    event['headers'] = {'Idempotency-Key': 'key-1'}
+
+    first = create_orders_batch.create_orders_batch(event, generate_context())
+    # batch order ids are not derived from the key, the retry is answered from the idempotency layer and writes nothing
+    assert create_orders_batch.create_orders_batch(event, generate_context()) == first
+    create.assert_called_once()
+    publish.assert_called_once()
+    layer._put_record.assert_called_once()
+    get_idempotency_layer.cache_clear()
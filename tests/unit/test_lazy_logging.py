@@ -0,0 +1,58 @@
+import logging
+import uuid
+
+import pytest
+from aws_lambda_powertools.logging.logger import Logger
+
+from service.handlers.schemas.dynamic_configuration import LoggingConfiguration, MyConfiguration
+from service.handlers.utils.lazy_logging import LazyLogger
+
+
+@pytest.fixture
+def powertools_logger() -> Logger:
+    # a new logger name per test, powertools loggers of the same service share the level
+    return Logger(service=f'lazy-logging-{uuid.uuid4()}', level='INFO')
+
+
+def test_extra_is_built_only_when_emitted(mocker, powertools_logger):
+    lazy_logger = LazyLogger(powertools_logger)
+    emit = mocker.spy(powertools_logger, 'debug')
+    build_extra = mocker.Mock(return_value={'key': 'value'})
+
+    lazy_logger.debug('not emitted at INFO', extra=build_extra)
+    build_extra.assert_not_called()
+    emit.assert_not_called()
+
+    lazy_logger.apply_settings(LoggingConfiguration(log_level='DEBUG'))
+    lazy_logger.debug('emitted at DEBUG', extra=build_extra)
+    build_extra.assert_called_once()
+    assert emit.call_args.kwargs['extra'] == {'key': 'value'}
+
+
+def test_log_level_from_dynamic_configuration(powertools_logger):
+    lazy_logger = LazyLogger(powertools_logger)
+    lazy_logger.apply_settings(LoggingConfiguration(log_level='DEBUG'))
+    assert powertools_logger.log_level == logging.DEBUG
+    lazy_logger.apply_settings(LoggingConfiguration(log_level='ERROR'))
+    assert powertools_logger.log_level == logging.ERROR
+    # no log level in the configuration restores the LOG_LEVEL environment variable
+    lazy_logger.apply_settings(LoggingConfiguration())
+    assert powertools_logger.log_level == logging.INFO
+
+
+@pytest.mark.parametrize('sample_rate, random_value, emitted', [(0.1, 0.05, True), (0.1, 0.5, False), (0, 0.0, False), (1, 0.99, True)])
+def test_debug_records_are_sampled_per_invocation(mocker, powertools_logger, sample_rate, random_value, emitted):
+    mocker.patch('service.handlers.utils.lazy_logging.random.random', return_value=random_value)
+    lazy_logger = LazyLogger(powertools_logger)
+    emit = mocker.spy(powertools_logger, 'debug')
+    lazy_logger.apply_settings(LoggingConfiguration(log_level='DEBUG', debug_sample_rate=sample_rate))
+    lazy_logger.debug('first record')
+    lazy_logger.debug('second record')
+    assert emit.call_count == (2 if emitted else 0)
+
+
+def test_configuration_without_logging_section():
+    configuration = MyConfiguration.model_validate({'countries': ['ISRAEL']})
+    assert configuration.logging == LoggingConfiguration(log_level=None, debug_sample_rate=1.0)
+    with pytest.raises(ValueError):
+        MyConfiguration.model_validate({'countries': ['ISRAEL'], 'logging': {'debug_sample_rate': 2}})
@@ -0,0 +1,37 @@
+import uuid
+
+import pytest
+from aws_lambda_powertools.utilities.parser import ValidationError
+
+from service.schemas.cursor import encode_order_cursor
+from service.schemas.input import DEFAULT_ORDERS_PER_PAGE, MAX_ORDERS_PER_PAGE, ListOrdersRequest
+
+
+def test_query_string_values():
+    cursor = encode_order_cursor(1700000000000, str(uuid.uuid4()))
+    request = ListOrdersRequest.model_validate({'customer_name': 'customer', 'limit': '10', 'cursor': cursor})
+    assert request.limit == 10
+    assert request.cursor == cursor
+
+
+def test_default_limit():
+    request = ListOrdersRequest.model_validate({'customer_name': 'customer'})
+    assert request.limit == DEFAULT_ORDERS_PER_PAGE
+    assert request.cursor is None
+
+
+def test_invalid_limit():
+    for limit in ('0', str(MAX_ORDERS_PER_PAGE + 1), 'ten'):
+        with pytest.raises(ValidationError):
+            ListOrdersRequest.model_validate({'customer_name': 'customer', 'limit': limit})
+
+
+def test_invalid_cursor():
+    for cursor in ('not-a-cursor', 'AAAA', ''):
+        with pytest.raises(ValidationError):
+            ListOrdersRequest.model_validate({'customer_name': 'customer', 'cursor': cursor})
+
+
+def test_missing_customer_name():
+    with pytest.raises(ValidationError):
+        ListOrdersRequest.model_validate({'limit': '10'})
@@ -0,0 +1,87 @@
+import json
+import uuid
+from typing import Any, Dict
+
+import pytest
+from aws_lambda_powertools.utilities.batch.exceptions import BatchProcessingError
+
+from cdk.service.constants import CONFIGURATION_NAME, ENVIRONMENT, SERVICE_NAME
+from tests.utils import generate_context
+
+TOPIC_ARN = 'arn:aws:sns:us-east-1:123456789012:NinjaOrderCreated'
+CONFIGURATION = {'countries': ['ISRAEL'], 'features': {}}
+
+
+@pytest.fixture
+def notification(monkeypatch, mocker):
+    monkeypatch.setenv('POWERTOOLS_SERVICE_NAME', SERVICE_NAME)
+    monkeypatch.setenv('LOG_LEVEL', 'DEBUG')
+    monkeypatch.setenv('CONFIGURATION_APP', SERVICE_NAME)
+    monkeypatch.setenv('CONFIGURATION_ENV', ENVIRONMENT)
+    monkeypatch.setenv('CONFIGURATION_NAME', CONFIGURATION_NAME)
+    monkeypatch.setenv('CONFIGURATION_MAX_AGE_MINUTES', '5')
+    mocker.patch('aws_lambda_powertools.utilities.parameters.AppConfigProvider.get', return_value=CONFIGURATION)
+    from service.handlers import notification
+    return notification
+
+
+def sqs_record(message_id: str, body: str) -> Dict[str, Any]:
+    return {
+        'messageId': message_id,
+        'receiptHandle': f'receipt-{message_id}',
+        'body': body,
+        'attributes': {
+            'ApproximateReceiveCount': '1',
+            'SentTimestamp': '1700000000000',
+            'SenderId': 'AIDAIENQZJOLO23YVJ4VO',
+            'ApproximateFirstReceiveTimestamp': '1700000000001',
+        },
+        'messageAttributes': {},
+        'md5OfBody': '098f6bcd4621d373cade4e832627b4f6',
+        'eventSource': 'aws:sqs',
+        'eventSourceARN': 'arn:aws:sqs:us-east-1:123456789012:NotifyEmailQueue',
+        'awsRegion': 'us-east-1',
+    }
+
+
+def order_created_notification(order_id: str) -> str:
+    """ SNS envelope of an OrderCreated message as SNS delivers it to an SQS subscription """
+    return json.dumps({
+        'Type': 'Notification',
+        'MessageId': str(uuid.uuid4()),
+        'TopicArn': TOPIC_ARN,
+        'Subject': 'OrderCreated',
+        'Message': json.dumps({
+            'order_id': order_id,
+            'customer_name': 'customer',
+            'order_item_count': 2
+        }),
+        'Timestamp': '2023-11-14T22:13:20.000Z',
+        'SignatureVersion': '1',
+        'Signature': 'EXAMPLE',
+        'SigningCertURL': 'https://sns.us-east-1.amazonaws.com/SimpleNotificationService.pem',
+        'UnsubscribeURL': 'https://sns.us-east-1.amazonaws.com/?Action=Unsubscribe',
+    })
+
+
+def test_batch_of_notifications_is_processed(notification):
+    records = [sqs_record(str(index), order_created_notification(str(uuid.uuid4()))) for index in range(10)]
+    response = notification.email_on_order_create_batch({'Records': records}, generate_context())
+    assert response == {'batchItemFailures': []}
+
+
+def test_failed_record_is_reported_alone(notification):
+    records = [
+        sqs_record('1', order_created_notification(str(uuid.uuid4()))),
+        sqs_record('2', 'not an sns notification'),
+        sqs_record('3', order_created_notification(str(uuid.uuid4()))),
+    ]
+    response = notification.email_on_order_create_batch({'Records': records}, generate_context())
+    # only the failed record is delivered again, the others are deleted from the queue
+    assert response == {'batchItemFailures': [{'itemIdentifier': '2'}]}
+
+
+def test_batch_where_every_record_fails_is_retried(notification):
+    records = [sqs_record('1', '{}'), sqs_record('2', 'not an sns notification')]
+    with pytest.raises(BatchProcessingError):
+        notification.email_on_order_create_batch({'Records': records}, generate_context())
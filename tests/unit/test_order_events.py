@@ -0,0 +1,17 @@
+import boto3
+from botocore.stub import ANY, Stubber
+
+from service.handlers.utils.order_events import publish_orders_created
+
+TOPIC_ARN = 'arn:aws:sns:us-east-1:123456789012:NinjaOrderCreated'
+
+
+def test_failed_publish_call_is_reported_and_not_raised():
+    client = boto3.client('sns', region_name='us-east-1')
+    orders = [{'order_id': f'order-{index}', 'customer_name': 'customer', 'order_item_count': 1} for index in range(12)]
+    with Stubber(client) as stubber:
+        stubber.add_response('publish_batch', {'Successful': [], 'Failed': []}, {'TopicArn': TOPIC_ARN, 'PublishBatchRequestEntries': ANY})
+        stubber.add_client_error('publish_batch', service_error_code='ThrottledException', http_status_code=400)
+        # the first chunk of 10 is published, the call of the second chunk fails and fails both of its orders
+        assert publish_orders_created(client=client, topic_arn=TOPIC_ARN, orders=orders) == ['order-10', 'order-11']
+        stubber.assert_no_pending_responses()
@@ -0,0 +1,88 @@
+import uuid
+from typing import Any, Dict
+
+import pytest
+from botocore.stub import ANY, Stubber
+
+from service.handlers.utils.aws_clients import get_client
+from tests.utils import generate_context
+
+TOPIC_ARN = 'arn:aws:sns:us-east-1:123456789012:NinjaOrderCreated'
+
+
+@pytest.fixture
+def relay(monkeypatch):
+    monkeypatch.setenv('POWERTOOLS_SERVICE_NAME', 'service')
+    monkeypatch.setenv('LOG_LEVEL', 'DEBUG')
+    monkeypatch.setenv('ORDER_CREATED_TOPIC_ARN', TOPIC_ARN)
+    from service.handlers import outbox_relay
+    stubber = Stubber(get_client('sns'))
+    stubber.activate()
+    yield outbox_relay, stubber
+    stubber.deactivate()
+
+
+def stream_record(sequence_number: str, order_id: str, event_name: str = 'INSERT') -> Dict[str, Any]:
+    return {
+        'eventName': event_name,
+        'eventSource': 'aws:dynamodb',
+        'dynamodb': {
+            'SequenceNumber': sequence_number,
+            'NewImage': {
+                'event_id': {
+                    'S': f'OrderCreated#{order_id}'
+                },
+                'event_type': {
+                    'S': 'OrderCreated'
+                },
+                'order_id': {
+                    'S': order_id
+                },
+                'customer_name': {
+                    'S': 'customer'
+                },
+                'order_item_count': {
+                    'N': '2'
+                },
+                'expiration': {
+                    'N': '1700000000'
+                },
+            },
+        },
+    }
+
+
+def test_relay_publishes_inserts_in_batches(relay):
+    outbox_relay, stubber = relay
+    order_ids = [str(uuid.uuid4()) for _ in range(12)]
+    records = [stream_record(str(index), order_id) for index, order_id in enumerate(order_ids)]
+    records.append(stream_record('99', str(uuid.uuid4()), event_name='REMOVE'))  # TTL delete of a relayed record
+    for chunk in (order_ids[:10], order_ids[10:]):
+        stubber.add_response(
+            'publish_batch', {
+                'Successful': [],
+                'Failed': []
+            }, expected_params={
+                'TopicArn': TOPIC_ARN,
+                'PublishBatchRequestEntries': [{
+                    'Id': order_id,
+                    'Subject': f'Order {order_id} created',
+                    'Message': ANY
+                } for order_id in chunk]
+            })
+    response = outbox_relay.relay_order_events({'Records': records}, generate_context())
+    stubber.assert_no_pending_responses()
+    assert response == {'batchItemFailures': []}
+
+
+def test_relay_reports_first_failed_record(relay):
+    outbox_relay, stubber = relay
+    order_ids = [str(uuid.uuid4()) for _ in range(12)]
+    records = [stream_record(str(index), order_id) for index, order_id in enumerate(order_ids)]
+    # the first chunk partly fails, the second call fails as a whole
+    stubber.add_response('publish_batch', {'Successful': [], 'Failed': [{'Id': order_ids[3], 'Code': 'InternalError', 'SenderFault': False}]})
+    stubber.add_client_error('publish_batch', service_error_code='InternalError')
+    response = outbox_relay.relay_order_events({'Records': records}, generate_context())
+    stubber.assert_no_pending_responses()
+    # Lambda retries the stream from the first failed record
+    assert response == {'batchItemFailures': [{'itemIdentifier': '3'}]}
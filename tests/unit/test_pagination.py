@@ -0,0 +1,61 @@
+import threading
+import uuid
+from typing import List, Optional
+
+import pytest
+
+from service.dal.pagination import iterate_pages
+from service.dal.schemas.orders_db import OrdersPage
+from service.schemas.cursor import decode_order_cursor, encode_order_cursor
+
+
+def test_cursor_round_trip():
+    order_id = str(uuid.uuid4())
+    cursor = encode_order_cursor(1700000000000, order_id)
+    assert len(cursor) == 32
+    assert decode_order_cursor(cursor) == (1700000000000, order_id)
+
+
+def test_malformed_cursor():
+    for cursor in ('', 'AAAA', '@@@@', encode_order_cursor(1, str(uuid.uuid4())) + 'AAAA'):
+        with pytest.raises(ValueError):
+            decode_order_cursor(cursor)
+
+
+def _pages(count: int, calls: List[Optional[str]]):
+    """ fetch_page over count pages whose cursors are the page numbers """
+
+    def fetch_page(cursor: Optional[str]) -> OrdersPage:
+        calls.append(cursor)
+        number = 0 if cursor is None else int(cursor)
+        return OrdersPage(orders=[], cursor=str(number + 1) if number + 1 < count else None)
+
+    return fetch_page
+
+
+def test_iterate_pages_without_prefetch():
+    calls: List[Optional[str]] = []
+    pages = iterate_pages(_pages(3, calls), cursor=None, prefetch=False)
+    assert next(pages).cursor == '1'
+    assert calls == [None]
+    assert [page.cursor for page in pages] == ['2', None]
+    assert calls == [None, '1', '2']
+
+
+def test_iterate_pages_prefetches_next_page():
+    calls: List[Optional[str]] = []
+    fetched = threading.Event()
+    fetch_page = _pages(3, calls)
+
+    def signalling_fetch_page(cursor: Optional[str]) -> OrdersPage:
+        page = fetch_page(cursor)
+        if cursor == '1':
+            fetched.set()
+        return page
+
+    pages = iterate_pages(signalling_fetch_page, cursor=None, prefetch=True)
+    assert next(pages).cursor == '1'
+    # the second page is requested while the caller still holds the first one
+    assert fetched.wait(timeout=5)
+    assert [page.cursor for page in pages] == ['2', None]
+    assert calls == [None, '1', '2']
@@ -38,3 +38,25 @@ def test_invalid_schema(mocker):
 def test_valid_schema(mocker):
     mock_dynamic_configuration(mocker, MOCKED_SCHEMA)
     parse_configuration(model=MockedSchemaModel)
+
+
+def test_parsed_configuration_is_cached(mocker):
+
+    class CountingSchemaModel(MockedSchemaModel):
+        ...
+
+    validate = mocker.spy(CountingSchemaModel, 'model_validate')
+    mock_dynamic_configuration(mocker, MOCKED_SCHEMA)
+    first = parse_configuration(model=CountingSchemaModel)
+    assert parse_configuration(model=CountingSchemaModel) is first
+    assert validate.call_count == 1
+
+    # refetched after the max age, same content
+    mock_dynamic_configuration(mocker, dict(MOCKED_SCHEMA))
+    assert parse_configuration(model=CountingSchemaModel) is first
+    assert validate.call_count == 1
+
+    # a new document
+    mock_dynamic_configuration(mocker, {'region': 'eu-west-1'})
+    assert parse_configuration(model=CountingSchemaModel).region == 'eu-west-1'
+    assert validate.call_count == 2
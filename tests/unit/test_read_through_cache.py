@@ -0,0 +1,119 @@
+import uuid
+
+import pytest
+
+from service.dal.cached_orders_dal_handler import CachedOrdersDalHandler
+from service.dal.orders_db_handler import OrdersDalHandler
+from service.dal.read_through_cache import ReadThroughCache
+from service.dal.schemas.orders_db import OrderChanges, OrderEntry, OrdersBatchGetResult
+
+
+class FakeTimer:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+@pytest.fixture
+def cache(timer):
+    return ReadThroughCache(name='Orders', max_items=2, ttl_seconds=60, negative_ttl_seconds=5, timer=timer)
+
+
+@pytest.fixture
+def cached_dal_handler(mocker, cache):
+    dal_handler = mocker.create_autospec(OrdersDalHandler, instance=True)
+    yield CachedOrdersDalHandler(dal_handler, cache)
+    CachedOrdersDalHandler._instances = {}
+
+
+def new_entry() -> OrderEntry:
+    return OrderEntry(order_id=str(uuid.uuid4()), customer_name='customer', order_item_count=1)
+
+
+def test_cache_ttl_and_negative_ttl(cache, timer):
+    entry = new_entry()
+    cache.put(entry.order_id, entry)
+    cache.put_missing('missing')
+    assert cache.get(entry.order_id) == (True, entry)
+    assert cache.get('missing') == (True, None)
+    timer.now = 6  # negative entries expire first
+    assert cache.get(entry.order_id) == (True, entry)
+    assert cache.get('missing') == (False, None)
+    timer.now = 61
+    assert cache.get(entry.order_id) == (False, None)
+
+
+def test_cache_is_bounded_lru(cache):
+    entries = [new_entry() for _ in range(3)]
+    cache.put(entries[0].order_id, entries[0])
+    cache.put(entries[1].order_id, entries[1])
+    cache.get(entries[0].order_id)  # entries[1] is now the least recently used
+    cache.put(entries[2].order_id, entries[2])
+    assert cache.get(entries[0].order_id) == (True, entries[0])
+    assert cache.get(entries[1].order_id) == (False, None)
+
+
+def test_cache_records_hit_and_miss_metrics(mocker, cache):
+    add_metric = mocker.patch('service.dal.read_through_cache.metrics.add_metric')
+    entry = new_entry()
+    cache.put(entry.order_id, entry)
+    cache.get_many([entry.order_id, 'other'])
+    assert {call.kwargs['name']: call.kwargs['value'] for call in add_metric.call_args_list} == {'OrdersCacheHit': 1, 'OrdersCacheMiss': 1}
+
+
+def test_get_reads_through_once(cached_dal_handler):
+    entry = new_entry()
+    cached_dal_handler.dal_handler.get_order_in_db.return_value = entry
+    assert cached_dal_handler.get_order_in_db(entry.order_id) == entry
+    assert cached_dal_handler.get_order_in_db(entry.order_id) == entry
+    cached_dal_handler.dal_handler.get_order_in_db.assert_called_once_with(entry.order_id)
+
+
+def test_get_caches_not_found(cached_dal_handler):
+    cached_dal_handler.dal_handler.get_order_in_db.return_value = None
+    order_id = str(uuid.uuid4())
+    assert cached_dal_handler.get_order_in_db(order_id) is None
+    assert cached_dal_handler.get_order_in_db(order_id) is None
+    cached_dal_handler.dal_handler.get_order_in_db.assert_called_once_with(order_id)
+
+
+def test_create_seeds_and_delete_invalidates(cached_dal_handler):
+    entry = new_entry()
+    cached_dal_handler.dal_handler.create_order_in_db.return_value = entry
+    cached_dal_handler.dal_handler.delete_order_in_db.return_value = entry
+    cached_dal_handler.create_order_in_db('customer', 1)
+    assert cached_dal_handler.get_order_in_db(entry.order_id) == entry
+    cached_dal_handler.delete_order_in_db(entry.order_id)
+    assert cached_dal_handler.get_order_in_db(entry.order_id) is None
+    cached_dal_handler.dal_handler.get_order_in_db.assert_not_called()
+
+
+def test_update_invalidates(cached_dal_handler):
+    entry = new_entry()
+    updated = entry.model_copy(update={'order_item_count': 2})
+    cached_dal_handler.dal_handler.create_order_in_db.return_value = entry
+    cached_dal_handler.dal_handler.update_order_in_db.return_value = OrderChanges(order_id=entry.order_id, order_item_count=2)
+    cached_dal_handler.dal_handler.get_order_in_db.return_value = updated
+    cached_dal_handler.create_order_in_db('customer', 1)
+    cached_dal_handler.update_order_in_db(entry.order_id, order_item_count=2)
+    assert cached_dal_handler.get_order_in_db(entry.order_id) == updated
+    cached_dal_handler.dal_handler.get_order_in_db.assert_called_once_with(entry.order_id)
+
+
+def test_get_many_only_fetches_uncached(cached_dal_handler):
+    cached, fetched = new_entry(), new_entry()
+    missing_id = str(uuid.uuid4())
+    cached_dal_handler.cache.put(cached.order_id, cached)
+    cached_dal_handler.dal_handler.get_orders_in_db.return_value = OrdersBatchGetResult(found=[fetched], missing_order_ids=[missing_id])
+    result = cached_dal_handler.get_orders_in_db([missing_id, fetched.order_id, cached.order_id])
+    cached_dal_handler.dal_handler.get_orders_in_db.assert_called_once_with([missing_id, fetched.order_id])
+    assert result.found == [fetched, cached]
+    assert result.missing_order_ids == [missing_id]
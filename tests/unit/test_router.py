@@ -0,0 +1,31 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from service.handlers import router
+from tests.utils import generate_api_gw_event, generate_context
+
+
+@pytest.mark.parametrize('routes', [router.ORDERS_ROUTES, router.USERS_ROUTES])
+def test_every_route_resolves_to_a_handler(routes):
+    for handler_path in routes.values():
+        assert callable(router.resolve_handler(handler_path))
+
+
+def test_dispatch_by_method_and_resource(monkeypatch):
+    from service.handlers import get_orders_batch
+    monkeypatch.setattr(get_orders_batch, 'get_orders_batch', lambda event, context: {'statusCode': HTTPStatus.OK, 'body': event['resource']})
+    event = generate_api_gw_event(None)
+    event['httpMethod'] = 'GET'
+    event['resource'] = '/api/orders/batch'
+    assert router.orders_router(event, generate_context()) == {'statusCode': HTTPStatus.OK, 'body': '/api/orders/batch'}
+
+
+def test_dispatch_unknown_route():
+    event = generate_api_gw_event(None)
+    event['httpMethod'] = 'PATCH'
+    event['resource'] = '/api/users'
+    response = router.users_router(event, generate_context())
+    assert response['statusCode'] == HTTPStatus.NOT_FOUND
+    assert json.loads(response['body']) == {}
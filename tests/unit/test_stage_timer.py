@@ -0,0 +1,33 @@
+import json
+
+import pytest
+from aws_lambda_powertools.metrics.metrics import Metrics
+
+from service.handlers.utils.stage_timer import StageTimer
+
+
+def test_stages_are_emitted_in_one_high_resolution_blob(capsys):
+    metrics = Metrics(namespace='stage_timer_test', service='stage_timer_test')
+    stage_timer = StageTimer(metrics)
+
+    @metrics.log_metrics
+    def handler(event, context):
+        with stage_timer.stage('AppConfig'):
+            pass
+        for _ in range(3):
+            with stage_timer.stage('Database'):
+                pass
+        with pytest.raises(ValueError), stage_timer.stage('SnsPublish'):
+            raise ValueError('failed stages are recorded too')
+
+    handler({}, None)
+
+    blobs = capsys.readouterr().out.strip().splitlines()
+    assert len(blobs) == 1
+    blob = json.loads(blobs[0])
+    definitions = {metric['Name']: metric for metric in blob['_aws']['CloudWatchMetrics'][0]['Metrics']}
+    for stage, count in (('AppConfig', 1), ('Database', 3), ('SnsPublish', 1)):
+        assert definitions[f'{stage}Latency'] == {'Name': f'{stage}Latency', 'Unit': 'Milliseconds', 'StorageResolution': 1}
+        values = blob[f'{stage}Latency']
+        assert len(values) == count
+        assert all(value >= 0 for value in values)
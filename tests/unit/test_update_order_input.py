@@ -0,0 +1,29 @@
+import uuid
+
+import pytest
+from aws_lambda_powertools.utilities.parser import ValidationError
+
+from service.schemas.input import UpdateOrderRequest
+
+
+def test_partial_update():
+    request = UpdateOrderRequest.model_validate({'order_id': str(uuid.uuid4()), 'order_item_count': 3})
+    assert request.order_item_count == 3
+    assert request.customer_name is None
+
+
+def test_nothing_to_update():
+    with pytest.raises(ValidationError):
+        UpdateOrderRequest.model_validate({'order_id': str(uuid.uuid4())})
+
+
+def test_invalid_values():
+    with pytest.raises(ValidationError):
+        UpdateOrderRequest.model_validate({'order_id': str(uuid.uuid4()), 'order_item_count': 0})
+    with pytest.raises(ValidationError):
+        UpdateOrderRequest.model_validate({'order_id': str(uuid.uuid4()), 'customer_name': ''})
+
+
+def test_invalid_order_id():
+    with pytest.raises(ValidationError):
+        UpdateOrderRequest.model_validate({'order_id': 'non-uuid', 'order_item_count': 3})